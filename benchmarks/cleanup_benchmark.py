@@ -0,0 +1,105 @@
+# """
+#     cleanup_benchmark.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+"""
+Reproduces a collector outage: the buffer fills up while every flush fails
+and its events are re-queued with cleanup(batch, need_retry=True).
+Compares InMemoryEventStore with a store that checks for buffered events
+by scanning the buffer, as InMemoryEventStore used to.
+
+    python -m benchmarks.cleanup_benchmark [--buffer 10000] [--batch-size 1000]
+"""
+
+import argparse
+import logging
+import time
+import uuid
+
+from snowplow_tracker.event_store import EventStore, InMemoryEventStore
+from snowplow_tracker.typing import PayloadDict, PayloadDictList
+
+logger = logging.getLogger(__name__)
+
+
+class LinearScanEventStore(object):
+    """
+    A list-based buffer that looks for buffered events by scanning the list
+    """
+
+    def __init__(self, buffer_capacity: int = 10000) -> None:
+        self.event_buffer: PayloadDictList = []
+        self.buffer_capacity = buffer_capacity
+
+    def add_event(self, payload: PayloadDict) -> bool:
+        if len(self.event_buffer) >= self.buffer_capacity:
+            return False
+        self.event_buffer.append(payload)
+        return True
+
+    def get_events_batch(self) -> PayloadDictList:
+        batch = self.event_buffer
+        self.event_buffer = []
+        return batch
+
+    def cleanup(self, batch: PayloadDictList, need_retry: bool) -> None:
+        if not need_retry:
+            return
+
+        for event in batch:
+            if not event in self.event_buffer:
+                if not self.add_event(event):
+                    return
+
+    def size(self) -> int:
+        return len(self.event_buffer)
+
+
+def run(name: str, event_store: EventStore, buffer: int, batch_size: int) -> None:
+    for i in range(buffer - batch_size):
+        event_store.add_event({"eid": str(uuid.uuid4()), "e": "pv", "url": "/%d" % i})
+    failed = [
+        {"eid": str(uuid.uuid4()), "e": "pv", "url": "/failed/%d" % i}
+        for i in range(batch_size)
+    ]
+
+    start = time.perf_counter()
+    event_store.cleanup(failed, True)
+    elapsed = time.perf_counter() - start
+
+    print(
+        "%-22s %8d buffered %6d re-queued %10.2f ms"
+        % (name, buffer - batch_size, batch_size, elapsed * 1e3)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--buffer", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    run(
+        "LinearScanEventStore",
+        LinearScanEventStore(),
+        args.buffer,
+        args.batch_size,
+    )
+    run("InMemoryEventStore", InMemoryEventStore(logger), args.buffer, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
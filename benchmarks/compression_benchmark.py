@@ -0,0 +1,113 @@
+# """
+#     compression_benchmark.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+"""
+Compares bytes on the wire and CPU time per event of POST requests sent
+without compression and with gzip or deflate compression.
+No requests leave the process: the emitter session records the request bodies.
+
+    python -m benchmarks.compression_benchmark [--events 10000] [--batch-size 10]
+"""
+
+import argparse
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from snowplow_tracker import Emitter, Tracker, SelfDescribingJson, SelfDescribing
+from snowplow_tracker.typing import Compression
+
+
+class RecordingSession(object):
+    """
+    Stands in for requests.Session and records the size of each request body
+    """
+
+    def __init__(self) -> None:
+        self.sizes: List[int] = []
+
+    def post(self, url: str, data: Any = None, **kwargs: Any) -> Any:
+        self.sizes.append(len(data))
+        return _Response()
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        return _Response()
+
+
+class _Response(object):
+    status_code = 200
+    headers: Dict[str, str] = {}
+
+
+def track_events(
+    compression: Optional[Compression], events: int, batch_size: int, base64: bool
+) -> None:
+    session = RecordingSession()
+    emitter = Emitter(
+        "localhost",
+        batch_size=batch_size,
+        session=session,  # type: ignore
+        compression=compression,
+        compression_min_bytes=0,
+    )
+    tracker = Tracker("benchmark", emitter, encode_base64=base64)
+    context = SelfDescribingJson(
+        "iglu:com.acme/page_context/jsonschema/1-0-0",
+        {"section": "checkout", "experiment": "variant-b", "ab_group": 3},
+    )
+
+    start = time.process_time()
+    for i in range(events):
+        tracker.track(
+            SelfDescribing(
+                SelfDescribingJson(
+                    "iglu:com.acme/add_to_basket/jsonschema/1-0-0",
+                    {"sku": "SKU-%05d" % (i % 500), "quantity": i % 5 + 1},
+                ),
+                context=[context],
+            )
+        )
+    emitter.flush()
+    cpu = time.process_time() - start
+
+    wire = sum(session.sizes)
+    print(
+        "%-8s %-7s %10d bytes %8.1f bytes/event %8.1f us/event"
+        % (
+            compression or "none",
+            "base64" if base64 else "json",
+            wire,
+            wire / events,
+            cpu / events * 1e6,
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+    logging.getLogger("snowplow_tracker.emitters").setLevel(logging.WARNING)
+
+    for base64 in [True, False]:
+        for compression in [None, "gzip", "deflate"]:
+            track_events(compression, args.events, args.batch_size, base64)  # type: ignore
+
+
+if __name__ == "__main__":
+    main()
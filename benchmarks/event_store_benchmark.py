@@ -0,0 +1,142 @@
+# """
+#     event_store_benchmark.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+"""
+Compares the throughput of the event stores. Each round adds a batch of events,
+takes the batch from the store and removes it as the Emitter does after sending.
+Then compares the overflow policies of the InMemoryEventStore by adding events
+to a full buffer.
+
+    python -m benchmarks.event_store_benchmark [--events 100000] [--batch-size 10] [--capacity 10000]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+from snowplow_tracker.event_store import EventStore, InMemoryEventStore
+from snowplow_tracker.payload import SerializedPayload
+from snowplow_tracker.sqlite_event_store import SQLiteEventStore
+from snowplow_tracker.segment_event_store import SegmentFileEventStore
+
+logger = logging.getLogger(__name__)
+
+
+def make_events(count: int) -> List[SerializedPayload]:
+    return [
+        SerializedPayload(
+            {
+                "e": "se",
+                "eid": "%08d-0000-4000-8000-000000000000" % i,
+                "dtm": "1618358402000",
+                "se_ca": "benchmark",
+                "se_ac": "action-%d" % (i % 100),
+                "cx": "eyJzY2hlbWEiOiAiaWdsdTpjb20uc25vd3Bsb3dhbmFseXRpY3Mi" * 4,
+            }
+        )
+        for i in range(count)
+    ]
+
+
+def run(
+    name: str, event_store: EventStore, events: List[SerializedPayload], batch_size: int
+) -> None:
+    start = time.perf_counter()
+    for i in range(0, len(events), batch_size):
+        for event in events[i : i + batch_size]:
+            event_store.add_event(event)
+        batch = event_store.get_events_batch()
+        event_store.cleanup(batch, False)
+    elapsed = time.perf_counter() - start
+
+    print(
+        "%-30s %10.0f events/s %8.2f us/event"
+        % (name, len(events) / elapsed, elapsed / len(events) * 1e6)
+    )
+
+
+def run_full(
+    name: str, event_store: EventStore, events: List[SerializedPayload]
+) -> None:
+    start = time.perf_counter()
+    for event in events:
+        event_store.add_event(event)
+    elapsed = time.perf_counter() - start
+
+    print(
+        "%-30s %10.0f events/s %8.2f us/event"
+        % (name, len(events) / elapsed, elapsed / len(events) * 1e6)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--capacity", type=int, default=10000)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    with tempfile.TemporaryDirectory() as directory:
+        stores: List[Tuple[str, Callable[[], EventStore]]] = [
+            ("InMemoryEventStore", lambda: InMemoryEventStore(logger)),
+            (
+                "SQLiteEventStore",
+                lambda: SQLiteEventStore(logger, os.path.join(directory, "1.db")),
+            ),
+            (
+                "SQLiteEventStore (batched)",
+                lambda: SQLiteEventStore(
+                    logger,
+                    os.path.join(directory, "2.db"),
+                    insert_batch_size=args.batch_size,
+                ),
+            ),
+            (
+                "SegmentFileEventStore",
+                lambda: SegmentFileEventStore(
+                    logger, os.path.join(directory, "segments")
+                ),
+            ),
+        ]
+        for name, make_store in stores:
+            run(name, make_store(), events, args.batch_size)
+
+    print("\nAdding events to a full buffer of %d events" % args.capacity)
+    # Every added event is dropped or evicts one, which is logged
+    logger.setLevel(logging.CRITICAL)
+    # Page views fill the buffer, later events alternate with higher priority events
+    for event in events[1::2]:
+        event["e"] = "pv"
+    for policy in ("drop_newest", "drop_oldest", "priority"):
+        event_store = InMemoryEventStore(
+            logger,
+            buffer_capacity=args.capacity,
+            overflow_policy=policy,  # type: ignore
+            event_priorities={"se": 1},
+        )
+        for event in make_events(args.capacity):
+            event["e"] = "pv"
+            event_store.add_event(event)
+        run_full("InMemoryEventStore (%s)" % policy, event_store, events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# """
+#     session_pool_benchmark.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+"""
+Measures the latency of flushing small batches to a local stand-in collector.
+Compares the Emitter's pooled session, which keeps the connection open between
+flushes, with module-level requests calls that open a new connection each time.
+
+    python -m benchmarks.session_pool_benchmark [--flushes 500] [--batch-size 5]
+"""
+
+import argparse
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Union
+
+import requests
+
+from snowplow_tracker.emitters import Emitter
+from snowplow_tracker.transports import (
+    CollectorResponse,
+    RequestTimeout,
+    RequestsTransport,
+)
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class UnpooledTransport(RequestsTransport):
+    """
+    Opens a new connection for each request with the module-level requests functions
+    """
+
+    def post(
+        self,
+        url: str,
+        data: Union[str, bytes],
+        headers: Dict[str, str],
+        timeout: RequestTimeout,
+    ) -> CollectorResponse:
+        r = requests.post(url, data=data, headers=headers, timeout=timeout)
+        return CollectorResponse(r.status_code, r.headers)
+
+
+def run(name: str, emitter: Emitter, flushes: int, batch_size: int) -> None:
+    latencies: List[float] = []
+    for i in range(flushes):
+        for j in range(batch_size):
+            emitter.input({"e": "pv", "url": "/%d/%d" % (i, j)})
+        start = time.perf_counter()
+        emitter.flush()
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    print(
+        "%-10s mean %7.3f ms  p50 %7.3f ms  p99 %7.3f ms"
+        % (
+            name,
+            sum(latencies) / len(latencies) * 1e3,
+            latencies[len(latencies) // 2] * 1e3,
+            latencies[int(len(latencies) * 0.99)] * 1e3,
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flushes", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger("snowplow_tracker.emitters").setLevel(logging.WARNING)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CollectorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = "127.0.0.1:%d" % server.server_address[1]
+
+    try:
+        unpooled = Emitter(
+            endpoint,
+            protocol="http",
+            batch_size=args.batch_size + 1,
+            transport=UnpooledTransport(),
+        )
+        run("unpooled", unpooled, args.flushes, args.batch_size)
+
+        pooled = Emitter(endpoint, protocol="http", batch_size=args.batch_size + 1)
+        run("pooled", pooled, args.flushes, args.batch_size)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# """
+#     template_benchmark.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+"""
+Compares the per-event cost of Tracker.track with tracking a compiled EventTemplate.
+The events are a structured event with two contexts and a label that varies.
+Emitters discard the payloads so only the tracker's work is measured.
+
+    python -m benchmarks.template_benchmark [--events 100000]
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from snowplow_tracker import (
+    SelfDescribingJson,
+    StructuredEvent,
+    Subject,
+    Tracker,
+)
+from snowplow_tracker.typing import PayloadDict
+
+CONTEXTS = [
+    SelfDescribingJson(
+        "iglu:com.acme/user/jsonschema/1-0-0", {"id": "user-1", "plan": "premium"}
+    ),
+    SelfDescribingJson(
+        "iglu:com.acme/page/jsonschema/1-0-0",
+        {"section": "checkout", "experiment": "b", "version": 3},
+    ),
+]
+
+
+class NullEmitter(object):
+    def input(self, payload: PayloadDict) -> None:
+        pass
+
+
+def run(name: str, track: Callable[[int], None], events: int) -> None:
+    start = time.perf_counter()
+    for i in range(events):
+        track(i)
+    elapsed = time.perf_counter() - start
+
+    print(
+        "%-16s %10.0f events/s %8.2f us/event"
+        % (name, events / elapsed, elapsed / events * 1e6)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100000)
+    args = parser.parse_args()
+
+    tracker = Tracker(
+        "benchmark",
+        NullEmitter(),  # type: ignore
+        subject=Subject().set_user_id("user-1").set_lang("en"),
+        app_id="benchmark",
+    )
+
+    def track(i: int) -> None:
+        tracker.track(
+            StructuredEvent(
+                category="shop",
+                action="add-to-basket",
+                label="item-%d" % i,
+                context=CONTEXTS,
+            )
+        )
+
+    template = tracker.template(
+        StructuredEvent(category="shop", action="add-to-basket", context=CONTEXTS)
+    )
+
+    def track_template(i: int) -> None:
+        template.track({"se_la": "item-%d" % i})
+
+    run("Tracker.track", track, args.events)
+    run("EventTemplate", track_template, args.events)
+
+
+if __name__ == "__main__":
+    main()
@@ -69,6 +69,12 @@ setup(
         "typing_extensions>=3.7.4",
     ],
     extras_require={
+        "asyncio": [
+            "aiohttp>=3.8,<4.0",
+        ],
+        "http2": [
+            "httpx[http2]>=0.23,<1.0",
+        ],
         "typing": [
             "mypy>=0.971",
             "types-requests>=2.25.1,<3.0",
@@ -1,13 +1,29 @@
 from snowplow_tracker._version import __version__
 from snowplow_tracker.subject import Subject
-from snowplow_tracker.emitters import logger, Emitter, AsyncEmitter
-from snowplow_tracker.self_describing_json import SelfDescribingJson
+from snowplow_tracker.emitters import logger, Emitter, AsyncEmitter, CircuitBreaker
+from snowplow_tracker.asyncio_emitter import AsyncioEmitter
+from snowplow_tracker.multi_collector_emitter import MultiCollectorEmitter
+from snowplow_tracker.self_describing_json import (
+    SelfDescribingJson,
+    FrozenSelfDescribingJson,
+)
+from snowplow_tracker.context_cache import ContextCache
+from snowplow_tracker.event_template import EventTemplate
 from snowplow_tracker.tracker import Tracker
 from snowplow_tracker.emitter_configuration import EmitterConfiguration
 from snowplow_tracker.tracker_configuration import TrackerConfiguration
 from snowplow_tracker.snowplow import Snowplow
 from snowplow_tracker.contracts import disable_contracts, enable_contracts
-from snowplow_tracker.event_store import EventStore
+from snowplow_tracker.event_store import EventStore, BatchLeasingEventStore
+from snowplow_tracker.sqlite_event_store import SQLiteEventStore
+from snowplow_tracker.segment_event_store import SegmentFileEventStore
+from snowplow_tracker.retry_budget import RetryBudget, FileDeadLetterSink
+from snowplow_tracker.transports import (
+    Transport,
+    TransportError,
+    RequestsTransport,
+    HTTP2Transport,
+)
 from snowplow_tracker.events import (
     Event,
     PageView,
@@ -0,0 +1,449 @@
+# """
+#     asyncio_emitter.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, Union, Tuple, Dict, List, Set
+
+from snowplow_tracker.typing import (
+    PayloadDict,
+    PayloadDictList,
+    HttpProtocol,
+    Method,
+    Compression,
+    RetryBackoff,
+    SuccessCallback,
+    FailureCallback,
+)
+from snowplow_tracker.event_store import EventStore
+from snowplow_tracker.retry_budget import RetryBudget
+from snowplow_tracker.emitters import (
+    BaseEmitter,
+    CircuitBreaker,
+    CollectorResponse,
+    REQUEST_NOT_SENT,
+)
+
+_AIOHTTP_OPT = True
+try:
+    import aiohttp
+except ImportError:
+    _AIOHTTP_OPT = False
+
+# logging
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# A batch on the send queue, with its batch ID if it is leased from the event store
+QueuedBatch = Tuple[Optional[str], PayloadDictList]
+
+
+class AsyncioEmitter(BaseEmitter):
+    """
+    Sends Snowplow events to a Snowplow collector from an asyncio event loop.
+    Batches are put on an asyncio.Queue and sent by a background task using
+    a single aiohttp.ClientSession, so no threads are started and connections
+    to the collector are reused.
+    Must be used from code running in the event loop.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        protocol: HttpProtocol = "https",
+        port: Optional[int] = None,
+        method: Method = "post",
+        batch_size: Optional[int] = None,
+        on_success: Optional[SuccessCallback] = None,
+        on_failure: Optional[FailureCallback] = None,
+        byte_limit: Optional[int] = None,
+        request_timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        max_retry_delay_seconds: int = 60,
+        buffer_capacity: Optional[int] = None,
+        custom_retry_codes: Dict[int, bool] = {},
+        event_store: Optional[EventStore] = None,
+        session: Optional["aiohttp.ClientSession"] = None,
+        max_request_bytes: Optional[int] = None,
+        compression: Optional[Compression] = None,
+        compression_min_bytes: int = 1024,
+        get_concurrency: int = 1,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_backoff: RetryBackoff = "exponential",
+    ) -> None:
+        """
+        :param endpoint:    The collector URL. If protocol is not set in endpoint it will automatically set to "https://" - this is done automatically.
+        :type  endpoint:    string
+        :param protocol:    The protocol to use - http or https. Defaults to https.
+        :type  protocol:    protocol
+        :param port:        The collector port to connect to
+        :type  port:        int | None
+        :param method:      The HTTP request method. Defaults to post.
+        :type  method:      method
+        :param batch_size:  The maximum number of queued events before the buffer is flushed. Default is 10.
+        :type  batch_size:  int | None
+        :param on_success:  Callback executed after every HTTP request in a flush has status code 200
+                            Gets passed one argument, an array of dictionaries corresponding to the sent events' payloads
+        :type  on_success:  function | None
+        :param on_failure:  Callback executed if at least one HTTP request in a flush has status code other than 200
+                            Gets passed two arguments:
+                            1) The number of events which were successfully sent
+                            2) An array of dictionaries corresponding to the unsent events' payloads
+        :type  on_failure:  function | None
+        :param byte_limit:  The size event list after reaching which queued events will be flushed
+        :type  byte_limit:  int | None
+        :param request_timeout: Timeout for the HTTP requests. Can be set either as single float value which
+                                 applies to both "connect" AND "read" timeout, or as tuple with two float values
+                                 which specify the "connect" and "read" timeouts separately
+        :type request_timeout:  float | tuple | None
+        :param max_retry_delay_seconds:     Set the maximum time between attempts to send failed events to the collector. Default 60 seconds
+        :type max_retry_delay_seconds:      int
+        :param buffer_capacity: The maximum capacity of the event buffer.
+                                When the buffer is full new events are lost.
+        :type buffer_capacity: int
+        :param  custom_retry_codes: Set custom retry rules for HTTP status codes received in emit responses from the Collector.
+                                    By default, retry will not occur for status codes 400, 401, 403, 410 or 422. This can be overridden here.
+                                    Note that 2xx codes will never retry as they are considered successful.
+        :type   custom_retry_codes: dict
+        :param  event_store:    Stores the event buffer and buffer capacity. Default is an InMemoryEventStore object with buffer_capacity of 10,000 events.
+        :type   event_store:    EventStore | None
+        :param  session:    The aiohttp session used for the requests. If not set, the emitter creates one
+                            on first use and closes it in `aclose`.
+        :type   session:    aiohttp.ClientSession | None
+        :param  max_request_bytes:  The maximum size of a POST request body. A flush is split into
+                                    requests of at most batch_size events and max_request_bytes bytes.
+                                    An event larger than the limit is sent on its own. Default is no limit.
+        :type   max_request_bytes:  int | None
+        :param  compression:    Compress POST request bodies with "gzip" or "deflate" and set the
+                                Content-Encoding header. The collector must accept compressed requests.
+                                Default is no compression.
+        :type   compression:    compression | None
+        :param  compression_min_bytes:  POST request bodies smaller than this are sent uncompressed. Default 1024 bytes.
+        :type   compression_min_bytes:  int
+        :param  get_concurrency:    The maximum number of GET requests sent concurrently in a flush. Default 1.
+        :type   get_concurrency:    int
+        :param  retry_budget:   Limits the failed attempts and the age of retried events.
+                                Expired events are passed to its dead-letter sink instead of the event buffer.
+                                Default is to retry events until they are sent.
+        :type   retry_budget:   RetryBudget | None
+        :param  circuit_breaker:    Stops sending requests to the collector after consecutive failed or slow
+                                    requests and probes it with a single request once the breaker's reset timeout
+                                    has passed. Events are retried when the breaker allows a probe. Default is no circuit breaker.
+        :type   circuit_breaker:    CircuitBreaker | None
+        :param  retry_backoff:  How the delay before retrying failed events grows: "exponential" doubles it and adds
+                                up to a second of noise, "full_jitter" picks it at random up to the exponential delay and
+                                "decorrelated_jitter" picks it at random up to three times the previous delay.
+                                A longer Retry-After header of 429 and 503 responses is respected, up to max_retry_delay_seconds.
+                                Default is "exponential".
+        :type   retry_backoff:  retry_backoff
+        """
+        if not _AIOHTTP_OPT:
+            raise RuntimeError(
+                "AsyncioEmitter is not available. To use: `pip install snowplow-tracker[asyncio]`"
+            )
+
+        super(AsyncioEmitter, self).__init__(
+            endpoint=endpoint,
+            protocol=protocol,
+            port=port,
+            method=method,
+            batch_size=batch_size,
+            on_success=on_success,
+            on_failure=on_failure,
+            byte_limit=byte_limit,
+            request_timeout=request_timeout,
+            max_retry_delay_seconds=max_retry_delay_seconds,
+            buffer_capacity=buffer_capacity,
+            custom_retry_codes=custom_retry_codes,
+            event_store=event_store,
+            max_request_bytes=max_request_bytes,
+            compression=compression,
+            compression_min_bytes=compression_min_bytes,
+            get_concurrency=get_concurrency,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            retry_backoff=retry_backoff,
+        )
+
+        self.session = session
+        self._owns_session = session is None
+
+        # Created lazily so that they are bound to the running event loop
+        self._queue: Optional["asyncio.Queue[QueuedBatch]"] = None
+        self._consumer: Optional["asyncio.Task[None]"] = None
+        self._retry_handle: Optional[asyncio.TimerHandle] = None
+        # The futures returned by flush that are waiting for the queue to be sent
+        self._flush_waiters: Set["asyncio.Future[None]"] = set()
+
+        logger.info("AsyncioEmitter initialized with endpoint " + self.endpoint)
+
+    async def __aenter__(self) -> "AsyncioEmitter":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    def flush(self) -> "asyncio.Future[None]":
+        """
+        Puts all events in the buffer on the send queue.
+        Returns an awaitable which resolves once all queued batches have been sent,
+        so `await emitter.flush()` waits for the requests to finish.
+
+        :rtype: asyncio.Future
+        """
+        queue = self._start_consumer()
+        if self._retry_handle is None:
+            with self.lock:
+                batch_id, evts = self._take_batch()
+                if self.bytes_queued is not None:
+                    self.bytes_queued = 0
+            if len(evts) > 0:
+                queue.put_nowait((batch_id, evts))
+
+        waiter = asyncio.ensure_future(queue.join())
+        self._flush_waiters.add(waiter)
+        waiter.add_done_callback(self._flush_waiters.discard)
+        return waiter
+
+    def sync_flush(self) -> "asyncio.Future[None]":
+        """
+        Blocking the event loop is not possible, so this is the same as `flush`.
+        Await the returned value to wait until the events are sent.
+
+        :rtype: asyncio.Future
+        """
+        return self.flush()
+
+    def async_flush(self) -> None:
+        self.flush()
+
+    async def aclose(self) -> None:
+        """
+        Sends the buffered events, waits until all queued batches are sent,
+        then stops the background task and closes the session if it was
+        created by the emitter. Events that failed and are waiting to be
+        retried stay in the event store.
+        """
+        self._cancel_retry_timer()
+        await self.flush()
+        self._cancel_retry_timer()
+
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+
+        waiters = list(self._flush_waiters)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def http_post(self, data: Union[str, bytes]) -> CollectorResponse:
+        """
+        :param data:  The array of JSONs to be sent
+        :type  data:  string | bytes
+        """
+        logger.info("Sending POST request to %s..." % self.endpoint)
+        logger.debug("Payload: %r", data)
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        if self.compression is not None and len(data) >= self.compression_min_bytes:
+            data = BaseEmitter.compress_body(data, self.compression)
+            headers["Content-Encoding"] = self.compression
+
+        async def post() -> CollectorResponse:
+            async with self._get_session().post(
+                self.endpoint,
+                data=data,
+                headers=headers,
+                timeout=self._client_timeout(),
+            ) as r:
+                return CollectorResponse(r.status, r.headers)
+
+        return await self._guarded_request(post)
+
+    async def http_get(self, payload: PayloadDict) -> CollectorResponse:
+        """
+        :param payload:  The event properties
+        :type  payload:  dict(string:\\*)
+        """
+        logger.info("Sending GET request to %s..." % self.endpoint)
+        logger.debug("Payload: %s" % payload)
+
+        async def get() -> CollectorResponse:
+            async with self._get_session().get(
+                self.endpoint,
+                params={key: str(payload[key]) for key in payload},
+                timeout=self._client_timeout(),
+            ) as r:
+                return CollectorResponse(r.status, r.headers)
+
+        return await self._guarded_request(get)
+
+    async def _guarded_request(
+        self, request: Callable[[], Awaitable[CollectorResponse]]
+    ) -> CollectorResponse:
+        """
+        Sends a request unless the circuit breaker is open and returns the response,
+        with status code -1 if the request failed or REQUEST_NOT_SENT if it was not sent
+
+        :param  request:    Sends the request
+        :type   request:    function
+        :rtype: CollectorResponse
+        """
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow_request():
+            logger.info("Circuit breaker is open, not sending request.")
+            return REQUEST_NOT_SENT
+
+        start = time.monotonic()
+        status_code = CollectorResponse(-1)
+        try:
+            status_code = await request()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(e)
+        finally:
+            if breaker is not None:
+                breaker.record(status_code, time.monotonic() - start)
+        return status_code
+
+    async def send_events(
+        self, evts: PayloadDictList, batch_id: Optional[str] = None
+    ) -> None:
+        """
+        Sends the events in as many requests as needed. Only events of failed
+        requests which should be retried are added back to the buffer.
+        The events are returned to the buffer if sending raises an exception
+        or is cancelled.
+
+        :param evts: Array of events to be sent
+        :type  evts: list(dict(string:\\*))
+        :param batch_id: The batch ID if the events are leased from the event store
+        :type  batch_id: string | None
+        """
+        if len(evts) > 0:
+            logger.info("Attempting to send %s events" % len(evts))
+
+            BaseEmitter.attach_sent_timestamp(evts)
+            try:
+                responses = await self._send_requests(evts)
+            except (Exception, asyncio.CancelledError):
+                self._return_batch(evts, batch_id)
+                raise
+
+            self._complete_send(responses, batch_id)
+        else:
+            logger.info("Skipping flush since buffer is empty")
+
+    async def _send_requests(
+        self, evts: PayloadDictList
+    ) -> List[Tuple[PayloadDictList, int]]:
+        """
+        Sends the events and returns the events of each request with its status code
+
+        :param evts: Array of events to be sent
+        :type  evts: list(dict(string:\\*))
+        :rtype: list(tuple(list(dict(string:\\*)), int))
+        """
+        if self.method == "post":
+            responses: List[Tuple[PayloadDictList, int]] = []
+            for batch, data in BaseEmitter.split_post_batches(
+                evts, self.batch_size, self.max_request_bytes
+            ):
+                responses.append((batch, await self.http_post(data)))
+            return responses
+
+        semaphore = asyncio.Semaphore(self.get_concurrency)
+
+        async def limited_get(evt: PayloadDict) -> CollectorResponse:
+            async with semaphore:
+                return await self.http_get(evt)
+
+        status_codes = await asyncio.gather(*map(limited_get, evts))
+        return [([evt], status_code) for evt, status_code in zip(evts, status_codes)]
+
+    def _start_consumer(self) -> "asyncio.Queue[QueuedBatch]":
+        """
+        Creates the send queue and starts the task consuming it if it is not running
+        """
+        loop = asyncio.get_running_loop()
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._consumer is None or self._consumer.done():
+            self._consumer = loop.create_task(self._consume(self._queue))
+        return self._queue
+
+    async def _consume(self, queue: "asyncio.Queue[QueuedBatch]") -> None:
+        while True:
+            batch_id, evts = await queue.get()
+            try:
+                # A batch that could not be sent is returned to the event store
+                await self.send_events(evts, batch_id)
+            except Exception:
+                logger.exception("Failed to send events")
+            finally:
+                queue.task_done()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    def _client_timeout(self) -> "aiohttp.ClientTimeout":
+        """
+        Converts request_timeout to the aiohttp equivalent of the requests timeout semantics
+        """
+        if self.request_timeout is None:
+            return aiohttp.ClientTimeout()
+        if isinstance(self.request_timeout, tuple):
+            connect, read = self.request_timeout
+            return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(
+            sock_connect=self.request_timeout, sock_read=self.request_timeout
+        )
+
+    def _set_retry_timer(self, timeout: float) -> None:
+        """
+        Schedules a flush to retry failed events unless one is scheduled
+
+        :param timeout:   delay in seconds
+        :type  timeout:   int | float
+        """
+        if self._retry_handle is None:
+            self._retry_handle = asyncio.get_running_loop().call_later(
+                timeout, self._retry
+            )
+
+    def _retry(self) -> None:
+        self._retry_handle = None
+        self.flush()
+
+    def _cancel_retry_timer(self) -> None:
+        """
+        Cancels a scheduled retry
+        """
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
@@ -0,0 +1,113 @@
+# """
+#     context_cache.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from snowplow_tracker import payload
+from snowplow_tracker.constants import CONTEXT_SCHEMA
+from snowplow_tracker.self_describing_json import SelfDescribingJson
+from snowplow_tracker.typing import JsonEncoderFunction, PayloadDict
+
+CacheEntry = Tuple[Tuple[SelfDescribingJson, ...], List[PayloadDict], PayloadDict]
+
+
+class ContextCache(object):
+    """
+    LRU cache of the encoded context envelope ("cx" or "co") of events.
+    Events attaching the same context objects reuse the envelope encoded for
+    the first one instead of serializing and base64 encoding it again.
+
+    Entries are looked up by the identity of the context objects and hold a deep
+    copy of their JSON, which must be equal to the current JSON of the contexts
+    for the entry to be used. A context mutated after it was cached is therefore
+    encoded again. The cache keeps the cached context objects alive.
+    """
+
+    def __init__(self, max_size: int = 128) -> None:
+        """
+        :param  max_size:   The maximum number of cached envelopes. Default 128.
+        :type   max_size:   int
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        # The contexts, a copy of their JSON and the encoded envelope
+        # by the ids of the contexts, encode_base64 and json_encoder
+        self.entries: "OrderedDict[Tuple[Any, ...], CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def encode(
+        self,
+        contexts: List[SelfDescribingJson],
+        encode_base64: bool,
+        json_encoder: Optional[JsonEncoderFunction] = None,
+    ) -> PayloadDict:
+        """
+        Returns the payload field of the context envelope of the contexts,
+        "cx" if encode_base64 is set and "co" otherwise
+
+        :param  contexts:       The custom contexts of an event
+        :type   contexts:       list(SelfDescribingJson)
+        :param  encode_base64:  Whether the envelope is base64 encoded
+        :type   encode_base64:  bool
+        :param  json_encoder:   Custom JSON serializer that gets called on non-serializable object
+        :type   json_encoder:   function | None
+        :rtype:                 dict(string:string)
+        """
+        context_jsons = [c.to_json() for c in contexts]
+        key = (tuple(id(c) for c in contexts), encode_base64, json_encoder)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == context_jsons:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        envelope = SelfDescribingJson(CONTEXT_SCHEMA, context_jsons).to_json()
+        context_payload = payload.Payload()
+        context_payload.add_json(envelope, encode_base64, "cx", "co", json_encoder)
+        pairs = context_payload.nv_pairs
+
+        with self.lock:
+            self.entries[key] = (tuple(contexts), copy.deepcopy(context_jsons), pairs)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return pairs
+
+    def size(self) -> int:
+        """
+        Returns the number of cached envelopes
+
+        :rtype: int
+        """
+        return len(self.entries)
+
+    def clear(self) -> None:
+        """
+        Removes all the cached envelopes and resets the hit and miss counters
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
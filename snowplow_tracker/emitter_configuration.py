@@ -16,8 +16,16 @@
 # """
 
 from typing import Optional, Union, Tuple, Dict
-from snowplow_tracker.typing import SuccessCallback, FailureCallback
+from snowplow_tracker.typing import (
+    SuccessCallback,
+    FailureCallback,
+    Compression,
+    RetryBackoff,
+)
 from snowplow_tracker.event_store import EventStore
+from snowplow_tracker.retry_budget import RetryBudget
+from snowplow_tracker.emitters import CircuitBreaker
+from snowplow_tracker.transports import Transport
 import requests
 
 
@@ -33,6 +41,15 @@ class EmitterConfiguration(object):
         custom_retry_codes: Dict[int, bool] = {},
         event_store: Optional[EventStore] = None,
         session: Optional[requests.Session] = None,
+        max_request_bytes: Optional[int] = None,
+        compression: Optional[Compression] = None,
+        compression_min_bytes: int = 1024,
+        get_concurrency: int = 1,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_backoff: RetryBackoff = "exponential",
+        pool_size: Optional[int] = None,
+        transport: Optional[Transport] = None,
     ) -> None:
         """
         Configuration for the emitter that sends events to the Snowplow collector.
@@ -60,6 +77,38 @@ class EmitterConfiguration(object):
         :type   event_store:    EventStore | None
         :param  session:    Persist parameters across requests by using a session object
         :type   session:    request.Session | None
+        :param  max_request_bytes:  The maximum size of a POST request body. A flush is split into
+                                    requests of at most batch_size events and max_request_bytes bytes.
+                                    An event larger than the limit is sent on its own. Default is no limit.
+        :type   max_request_bytes:  int | None
+        :param  compression:    Compress POST request bodies with "gzip" or "deflate" and set the
+                                Content-Encoding header. The collector must accept compressed requests.
+                                Default is no compression.
+        :type   compression:    compression | None
+        :param  compression_min_bytes:  POST request bodies smaller than this are sent uncompressed. Default 1024 bytes.
+        :type   compression_min_bytes:  int
+        :param  get_concurrency:    The maximum number of GET requests sent in parallel in a flush. Default 1.
+        :type   get_concurrency:    int
+        :param  retry_budget:   Limits the failed attempts and the age of retried events.
+                                Expired events are passed to its dead-letter sink instead of the event buffer.
+                                Default is to retry events until they are sent.
+        :type   retry_budget:   RetryBudget | None
+        :param  circuit_breaker:    Stops sending requests to the collector after consecutive failed or slow
+                                    requests and probes it with a single request once the breaker's reset timeout
+                                    has passed. Events are retried when the breaker allows a probe. Default is no circuit breaker.
+        :type   circuit_breaker:    CircuitBreaker | None
+        :param  retry_backoff:  How the delay before retrying failed events grows: "exponential" doubles it and adds
+                                up to a second of noise, "full_jitter" picks it at random up to the exponential delay and
+                                "decorrelated_jitter" picks it at random up to three times the previous delay.
+                                A longer Retry-After header of 429 and 503 responses is respected, up to max_retry_delay_seconds.
+                                Default is "exponential".
+        :type   retry_backoff:  retry_backoff
+        :param  pool_size:  The maximum number of connections to the collector kept open by the session
+                            the emitter creates when no session is set. Default is get_concurrency.
+        :type   pool_size:  int | None
+        :param  transport:  Sends the requests to the collector, e.g. an HTTP2Transport.
+                            Default is a RequestsTransport using session, or a pooled session if not set.
+        :type   transport:  Transport | None
         """
 
         self.batch_size = batch_size
@@ -71,6 +120,15 @@ class EmitterConfiguration(object):
         self.custom_retry_codes = custom_retry_codes
         self.event_store = event_store
         self.session = session
+        self.max_request_bytes = max_request_bytes
+        self.compression = compression
+        self.compression_min_bytes = compression_min_bytes
+        self.get_concurrency = get_concurrency
+        self.retry_budget = retry_budget
+        self.circuit_breaker = circuit_breaker
+        self.retry_backoff = retry_backoff
+        self.pool_size = pool_size
+        self.transport = transport
 
     @property
     def batch_size(self) -> Optional[int]:
@@ -211,3 +269,125 @@ class EmitterConfiguration(object):
     @session.setter
     def session(self, value: Optional[requests.Session]):
         self._session = value
+
+    @property
+    def max_request_bytes(self) -> Optional[int]:
+        """
+        The maximum size of a POST request body. Default is no limit.
+        """
+        return self._max_request_bytes
+
+    @max_request_bytes.setter
+    def max_request_bytes(self, value: Optional[int]):
+        if isinstance(value, int) and value < 0:
+            raise ValueError("max_request_bytes must greater than 0")
+        if not isinstance(value, int) and value is not None:
+            raise ValueError("max_request_bytes must be of type int")
+        self._max_request_bytes = value
+
+    @property
+    def compression(self) -> Optional[Compression]:
+        """
+        The compression of POST request bodies, "gzip" or "deflate". Default is no compression.
+        """
+        return self._compression
+
+    @compression.setter
+    def compression(self, value: Optional[Compression]):
+        if value not in (None, "gzip", "deflate"):
+            raise ValueError("compression must be gzip, deflate or None")
+        self._compression = value
+
+    @property
+    def compression_min_bytes(self) -> int:
+        """
+        POST request bodies smaller than this are sent uncompressed. Default 1024 bytes.
+        """
+        return self._compression_min_bytes
+
+    @compression_min_bytes.setter
+    def compression_min_bytes(self, value: int):
+        if not isinstance(value, int):
+            raise ValueError("compression_min_bytes must be of type int")
+        if value < 0:
+            raise ValueError("compression_min_bytes must greater than 0")
+        self._compression_min_bytes = value
+
+    @property
+    def get_concurrency(self) -> int:
+        """
+        The maximum number of GET requests sent in parallel in a flush. Default 1.
+        """
+        return self._get_concurrency
+
+    @get_concurrency.setter
+    def get_concurrency(self, value: int):
+        if not isinstance(value, int):
+            raise ValueError("get_concurrency must be of type int")
+        if value < 1:
+            raise ValueError("get_concurrency must be at least 1")
+        self._get_concurrency = value
+
+    @property
+    def retry_budget(self) -> Optional[RetryBudget]:
+        """
+        Limits the failed attempts and the age of retried events. Default is to retry events until they are sent.
+        """
+        return self._retry_budget
+
+    @retry_budget.setter
+    def retry_budget(self, value: Optional[RetryBudget]):
+        self._retry_budget = value
+
+    @property
+    def circuit_breaker(self) -> Optional[CircuitBreaker]:
+        """
+        Stops sending requests to the collector after consecutive failed or slow requests
+                                    and probes it once the breaker's reset timeout has passed. Default is no circuit breaker.
+        """
+        return self._circuit_breaker
+
+    @circuit_breaker.setter
+    def circuit_breaker(self, value: Optional[CircuitBreaker]):
+        self._circuit_breaker = value
+
+    @property
+    def retry_backoff(self) -> RetryBackoff:
+        """
+        How the delay before retrying failed events grows: "exponential", "full_jitter" or "decorrelated_jitter". Default is "exponential".
+        """
+        return self._retry_backoff
+
+    @retry_backoff.setter
+    def retry_backoff(self, value: RetryBackoff):
+        if value not in ("exponential", "full_jitter", "decorrelated_jitter"):
+            raise ValueError(
+                "retry_backoff must be exponential, full_jitter or decorrelated_jitter"
+            )
+        self._retry_backoff = value
+
+    @property
+    def pool_size(self) -> Optional[int]:
+        """
+        The maximum number of connections to the collector kept open by the emitter's session. Default is get_concurrency.
+        """
+        return self._pool_size
+
+    @pool_size.setter
+    def pool_size(self, value: Optional[int]):
+        if not isinstance(value, int) and value is not None:
+            raise ValueError("pool_size must be of type int")
+        if isinstance(value, int) and value < 1:
+            raise ValueError("pool_size must be at least 1")
+        self._pool_size = value
+
+    @property
+    def transport(self) -> Optional[Transport]:
+        """
+        Sends the requests to the collector. Default is a RequestsTransport using the session.
+        """
+        return self._transport
+
+    @transport.setter
+    def transport(self, value: Optional[Transport]):
+        self._transport = value
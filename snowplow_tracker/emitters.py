@@ -15,26 +15,48 @@
 #     language governing permissions and limitations there under.
 # """
 
+import gzip
+import json
 import logging
+import os
 import time
 import threading
+import uuid
 import requests
 import random
-from typing import Optional, Union, Tuple, Dict, cast, Callable
-from queue import Queue
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from typing import Any, Optional, Union, Tuple, Dict, List, Mapping, cast, Callable
+from queue import Queue, Full, Empty
 
-from snowplow_tracker.self_describing_json import SelfDescribingJson
 from snowplow_tracker.typing import (
     PayloadDict,
     PayloadDictList,
     HttpProtocol,
     Method,
+    QueueOverflowPolicy,
+    Compression,
+    RetryBackoff,
     SuccessCallback,
     FailureCallback,
     EmitterProtocol,
 )
 from snowplow_tracker.contracts import one_of
-from snowplow_tracker.event_store import EventStore, InMemoryEventStore
+from snowplow_tracker.payload import SerializedPayload
+from snowplow_tracker.retry_budget import RetryBudget
+from snowplow_tracker.transports import (
+    CollectorResponse,
+    RequestsTransport,
+    Transport,
+    TransportError,
+)
+from snowplow_tracker.event_store import (
+    EventStore,
+    BatchLeasingEventStore,
+    InMemoryEventStore,
+)
 
 # logging
 logging.basicConfig()
@@ -45,27 +67,28 @@ DEFAULT_MAX_LENGTH = 10
 PAYLOAD_DATA_SCHEMA = (
     "iglu:com.snowplowanalytics.snowplow/payload_data/jsonschema/1-0-4"
 )
+PAYLOAD_DATA_PREFIX = (
+    '{"schema": %s, "data": [' % json.dumps(PAYLOAD_DATA_SCHEMA)
+).encode("utf-8")
+PAYLOAD_DATA_SUFFIX = b"]}"
 PROTOCOLS = {"http", "https"}
 METHODS = {"get", "post"}
-
-
-# Unifes the two request methods under one interface
-class Requester:
-    post: Callable
-    get: Callable
-
-    def __init__(self, post: Callable, get: Callable):
-        # 3.6 MyPy compatibility:
-        # error: Cannot assign to a method
-        # https://github.com/python/mypy/issues/2427
-        setattr(self, "post", post)
-        setattr(self, "get", get)
-
-
-class Emitter(EmitterProtocol):
+QUEUE_OVERFLOW_POLICIES = {"block", "drop_newest", "drop_oldest", "spill"}
+CIRCUIT_BREAKER_STATES = {"closed", "open", "half_open"}
+RETRY_BACKOFFS = {"exponential", "full_jitter", "decorrelated_jitter"}
+RETRY_BASE_DELAY_SECONDS = 1.0
+COMPRESSIONS = {"gzip", "deflate"}
+COMPRESSION_LEVEL = 6
+# Returned instead of a status code when the circuit breaker does not let a request through.
+# It equals -1 like a failed request, but is told apart by identity as no request was sent.
+REQUEST_NOT_SENT = CollectorResponse(-1)
+
+
+class BaseEmitter(EmitterProtocol, ABC):
     """
-    Synchronously send Snowplow events to a Snowplow collector
-    Supports both GET and POST requests
+    Buffers events and handles the outcome of the requests sending them:
+    which events are done with, which are retried and after how long.
+    Emitter and AsyncioEmitter extend it with the sending of the requests.
     """
 
     def __init__(
@@ -83,51 +106,27 @@ class Emitter(EmitterProtocol):
         buffer_capacity: Optional[int] = None,
         custom_retry_codes: Dict[int, bool] = {},
         event_store: Optional[EventStore] = None,
-        session: Optional[requests.Session] = None,
+        max_request_bytes: Optional[int] = None,
+        compression: Optional[Compression] = None,
+        compression_min_bytes: int = 1024,
+        get_concurrency: int = 1,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional["CircuitBreaker"] = None,
+        retry_backoff: RetryBackoff = "exponential",
     ) -> None:
         """
-        :param endpoint:    The collector URL. If protocol is not set in endpoint it will automatically set to "https://" - this is done automatically.
-        :type  endpoint:    string
-        :param protocol:    The protocol to use - http or https. Defaults to https.
-        :type  protocol:    protocol
-        :param port:        The collector port to connect to
-        :type  port:        int | None
-        :param method:      The HTTP request method. Defaults to post.
-        :type  method:      method
-        :param batch_size:  The maximum number of queued events before the buffer is flushed. Default is 10.
-        :type  batch_size:  int | None
-        :param on_success:  Callback executed after every HTTP request in a flush has status code 200
-                            Gets passed one argument, an array of dictionaries corresponding to the sent events' payloads
-        :type  on_success:  function | None
-        :param on_failure:  Callback executed if at least one HTTP request in a flush has status code other than 200
-                            Gets passed two arguments:
-                            1) The number of events which were successfully sent
-                            2) An array of dictionaries corresponding to the unsent events' payloads
-        :type  on_failure:  function | None
-        :param byte_limit:  The size event list after reaching which queued events will be flushed
-        :type  byte_limit:  int | None
-        :param request_timeout: Timeout for the HTTP requests. Can be set either as single float value which
-                                 applies to both "connect" AND "read" timeout, or as tuple with two float values
-                                 which specify the "connect" and "read" timeouts separately
-        :type request_timeout:  float | tuple | None
-        :param max_retry_delay_seconds:     Set the maximum time between attempts to send failed events to the collector. Default 60 seconds
-        :type max_retry_delay_seconds:      int
-        :param buffer_capacity: The maximum capacity of the event buffer.
-                                When the buffer is full new events are lost.
-        :type buffer_capacity: int
-        :param  custom_retry_codes: Set custom retry rules for HTTP status codes received in emit responses from the Collector.
-                                    By default, retry will not occur for status codes 400, 401, 403, 410 or 422. This can be overridden here.
-                                    Note that 2xx codes will never retry as they are considered successful.
-        :type   custom_retry_codes: dict
-        :param  event_store:    Stores the event buffer and buffer capacity. Default is an InMemoryEventStore object with buffer_capacity of 10,000 events.
-        :type   event_store:    EventStore | None
-        :param  session:    Persist parameters across requests by using a session object
-        :type   session:    requests.Session | None
+        Validates and stores the options shared by the emitters.
+        They are documented in Emitter.__init__.
         """
         one_of(protocol, PROTOCOLS)
         one_of(method, METHODS)
+        one_of(retry_backoff, RETRY_BACKOFFS)
+        if compression is not None:
+            one_of(compression, COMPRESSIONS)
+        if get_concurrency < 1:
+            raise ValueError("get_concurrency must be at least 1")
 
-        self.endpoint = Emitter.as_collector_uri(endpoint, protocol, port, method)
+        self.endpoint = BaseEmitter.as_collector_uri(endpoint, protocol, port, method)
 
         self.method = method
 
@@ -153,6 +152,12 @@ class Emitter(EmitterProtocol):
         self.batch_size = batch_size
         self.byte_limit = byte_limit
         self.bytes_queued = None if byte_limit is None else 0
+        self.max_request_bytes = max_request_bytes
+        self.compression = compression
+        self.compression_min_bytes = compression_min_bytes
+        self.get_concurrency = get_concurrency
+        self.retry_budget = retry_budget
+        self.circuit_breaker = circuit_breaker
         self.request_timeout = request_timeout
 
         self.on_success = on_success
@@ -160,19 +165,12 @@ class Emitter(EmitterProtocol):
 
         self.lock = threading.RLock()
 
-        self.timer = FlushTimer(emitter=self, repeating=True)
-        self.retry_timer = FlushTimer(emitter=self, repeating=False)
-
         self.max_retry_delay_seconds = max_retry_delay_seconds
+        self.retry_backoff = retry_backoff
         self.retry_delay: Union[int, float] = 0
+        self.retry_attempts = 0
 
         self.custom_retry_codes = custom_retry_codes
-        logger.info("Emitter initialized with endpoint " + self.endpoint)
-
-        if session is None:
-            self.request_method = Requester(post=requests.post, get=requests.get)
-        else:
-            self.request_method = Requester(post=session.post, get=session.get)
 
     @staticmethod
     def as_collector_uri(
@@ -215,22 +213,59 @@ class Emitter(EmitterProtocol):
         """
         Adds an event to the buffer.
         If the maximum size has been reached, flushes the buffer.
+        The flush happens after the lock is released so that other threads
+        can keep adding events while the HTTP request is in progress.
 
         :param payload:   The name-value pairs for the event
         :type  payload:   dict(string:\\*)
         """
         with self.lock:
-            if self.bytes_queued is not None:
-                self.bytes_queued += len(str(payload))
+            self._add_event(payload)
+            should_flush = self.reached_limit()
 
-            if self.method == "post":
-                self.event_store.add_event({key: str(payload[key]) for key in payload})
-            else:
-                self.event_store.add_event(payload)
+        if should_flush:
+            self.flush()
+
+    def input_many(self, payloads: PayloadDictList) -> None:
+        """
+        Adds events to the buffer, flushing it each time the maximum size is reached.
+        The lock is taken once for each chunk of events added between flushes
+        rather than once for each event.
 
-            if self.reached_limit():
+        :param payloads:  The name-value pairs of the events
+        :type  payloads:  list(dict(string:\\*))
+        """
+        i = 0
+        while i < len(payloads):
+            with self.lock:
+                should_flush = False
+                while i < len(payloads) and not should_flush:
+                    self._add_event(payloads[i])
+                    i += 1
+                    should_flush = self.reached_limit()
+
+            if should_flush:
                 self.flush()
 
+    def _add_event(self, payload: PayloadDict) -> None:
+        """
+        Adds an event to the event store and counts its bytes.
+        Must be called while holding the lock.
+
+        :param payload:   The name-value pairs for the event
+        :type  payload:   dict(string:\\*)
+        """
+        if self.method == "post":
+            event = SerializedPayload((key, str(payload[key])) for key in payload)
+            size = len(event.encoded)
+            self.event_store.add_event(event)
+        else:
+            size = len(urlencode(payload)) if self.bytes_queued is not None else 0
+            self.event_store.add_event(payload)
+
+        if self.bytes_queued is not None:
+            self.bytes_queued += size
+
     def reached_limit(self) -> bool:
         """
         Checks if event-size or bytes limit are reached
@@ -244,63 +279,27 @@ class Emitter(EmitterProtocol):
                 self.bytes_queued or 0
             ) >= self.byte_limit or self.event_store.size() >= self.batch_size
 
-    def flush(self) -> None:
+    def _take_batch(self) -> Tuple[Optional[str], PayloadDictList]:
         """
-        Sends all events in the buffer to the collector.
-        """
-        with self.lock:
-            if self.retry_timer.is_active():
-                return
-            send_events = self.event_store.get_events_batch()
-            self.send_events(send_events)
-            if self.bytes_queued is not None:
-                self.bytes_queued = 0
+        Takes all the events out of the buffer. Returns the batch ID
+        if the event store leases them and the events.
 
-    def http_post(self, data: str) -> int:
+        :rtype: tuple(string | None, list(dict(string:\\*)))
         """
-        :param data:  The array of JSONs to be sent
-        :type  data:  string
-        """
-        logger.info("Sending POST request to %s..." % self.endpoint)
-        logger.debug("Payload: %s" % data)
-        try:
-            r = self.request_method.post(
-                self.endpoint,
-                data=data,
-                headers={"Content-Type": "application/json; charset=utf-8"},
-                timeout=self.request_timeout,
-            )
-        except requests.RequestException as e:
-            logger.warning(e)
-            return -1
-
-        return r.status_code
+        if isinstance(self.event_store, BatchLeasingEventStore):
+            return self.event_store.lease_batch()
+        return None, self.event_store.get_events_batch()
 
-    def http_get(self, payload: PayloadDict) -> int:
-        """
-        :param payload:  The event properties
-        :type  payload:  dict(string:\\*)
+    @staticmethod
+    def is_unavailable_status_code(status_code: int) -> bool:
         """
-        logger.info("Sending GET request to %s..." % self.endpoint)
-        logger.debug("Payload: %s" % payload)
-        try:
-            r = self.request_method.get(
-                self.endpoint, params=payload, timeout=self.request_timeout
-            )
-        except requests.RequestException as e:
-            logger.warning(e)
-            return -1
-
-        return r.status_code
+        Returns True if the request failed or the collector is overloaded or unavailable
 
-    def sync_flush(self) -> None:
-        """
-        Calls the flush method of the base Emitter class.
-        This is guaranteed to be blocking, not asynchronous.
+        :param status_code:  HTTP status code, -1 if the request failed
+        :type  status_code:  int
+        :rtype:              bool
         """
-        logger.debug("Starting synchronous flush...")
-        self.flush()
-        logger.info("Finished synchronous flush")
+        return status_code == -1 or status_code == 429 or status_code >= 500
 
     @staticmethod
     def is_good_status_code(status_code: int) -> bool:
@@ -311,73 +310,169 @@ class Emitter(EmitterProtocol):
         """
         return 200 <= status_code < 300
 
-    def send_events(self, evts: PayloadDictList) -> None:
+    def _return_batch(
+        self, evts: PayloadDictList, batch_id: Optional[str] = None
+    ) -> None:
         """
-        :param evts: Array of events to be sent
-        :type  evts: list(dict(string:\\*))
+        Returns the events of a batch that could not be sent to the buffer
+
+        :param  evts:   The events of the batch
+        :type   evts:   list(dict(string:\\*))
+        :param  batch_id:   The batch ID if the events are leased from the event store
+        :type   batch_id:   string | None
         """
-        if len(evts) > 0:
-            logger.info("Attempting to send %s events" % len(evts))
+        with self.lock:
+            if batch_id is None:
+                self.event_store.cleanup(evts, True)
+            else:
+                cast(BatchLeasingEventStore, self.event_store).nack(batch_id)
 
-            Emitter.attach_sent_timestamp(evts)
-            success_events = []
-            failure_events = []
-
-            if self.method == "post":
-                data = SelfDescribingJson(PAYLOAD_DATA_SCHEMA, evts).to_string()
-                status_code = self.http_post(data)
-                request_succeeded = Emitter.is_good_status_code(status_code)
-                if request_succeeded:
-                    success_events += evts
+    def _complete_send(
+        self,
+        responses: List[Tuple[PayloadDictList, int]],
+        batch_id: Optional[str] = None,
+    ) -> None:
+        """
+        Updates the event store and the retry state after the requests of a flush
+        and calls the callbacks. Only events of failed requests which should be
+        retried are added back to the buffer.
+
+        :param  responses:  The events of each request with its status code
+        :type   responses:  list(tuple(list(dict(string:\\*)), int))
+        :param  batch_id:   The batch ID if the events are leased from the event store
+        :type   batch_id:   string | None
+        """
+        success_events: PayloadDictList = []
+        failure_events: PayloadDictList = []
+        retry_events: PayloadDictList = []
+        done_events: PayloadDictList = []
+        retry_status_codes = []
+
+        for evts, status_code in responses:
+            if BaseEmitter.is_good_status_code(status_code):
+                success_events += evts
+                done_events += evts
+            else:
+                failure_events += evts
+                if self._should_retry(status_code):
+                    retry_events += evts
+                    retry_status_codes.append(status_code)
                 else:
-                    failure_events += evts
-
-            elif self.method == "get":
-                for evt in evts:
-                    status_code = self.http_get(evt)
-                    request_succeeded = Emitter.is_good_status_code(status_code)
-
-                    if request_succeeded:
-                        success_events += [evt]
-                    else:
-                        failure_events += [evt]
-
-            if self.on_success is not None and len(success_events) > 0:
-                self.on_success(success_events)
-            if self.on_failure is not None and len(failure_events) > 0:
-                self.on_failure(len(success_events), failure_events)
-
-            if self._should_retry(status_code):
-                self._set_retry_delay()
-                self._retry_failed_events(failure_events)
+                    done_events += evts
+
+        if self.retry_budget is not None:
+            self.retry_budget.forget(done_events)
+            retry_events, expired_events = self.retry_budget.expire(retry_events)
+            done_events += expired_events
+
+        # The retry state is shared by the flushes of all threads,
+        # so it is updated while holding the lock
+        with self.lock:
+            if batch_id is None:
+                self.event_store.cleanup(done_events, False)
+            else:
+                cast(BatchLeasingEventStore, self.event_store).ack(
+                    batch_id, done_events
+                )
+
+            if len(retry_events) > 0:
+                self._set_retry_delay(BaseEmitter.max_retry_after(retry_status_codes))
+                self._retry_failed_events(retry_events, batch_id)
             else:
-                self.event_store.cleanup(success_events, False)
                 self._reset_retry_delay()
-        else:
-            logger.info("Skipping flush since buffer is empty")
 
-    def _set_retry_timer(self, timeout: float) -> None:
-        """
-        Set an interval at which failed events will be retried
+        # The callbacks run after the event store is updated,
+        # so the events are not lost if a callback raises an exception
+        if self.on_success is not None and len(success_events) > 0:
+            self.on_success(success_events)
+        if self.on_failure is not None and len(failure_events) > 0:
+            self.on_failure(len(success_events), failure_events)
 
-        :param timeout:   interval in seconds
-        :type  timeout:   int | float
+    @staticmethod
+    def split_post_batches(
+        evts: PayloadDictList, batch_size: int, max_request_bytes: Optional[int]
+    ) -> List[Tuple[PayloadDictList, bytes]]:
         """
-        self.retry_timer.start(timeout=timeout)
+        Splits events into POST request bodies with at most batch_size events
+        and at most max_request_bytes bytes each
+
+        :param  evts:   Array of events to be sent
+        :type   evts:   list(dict(string:\\*))
+        :param  batch_size: The maximum number of events in a request
+        :type   batch_size: int
+        :param  max_request_bytes:  The maximum size of a request body
+        :type   max_request_bytes:  int | None
+        :rtype: list(tuple(list(dict(string:\\*)), bytes))
+        """
+        batches: List[Tuple[PayloadDictList, List[bytes]]] = []
+        size = 0
+
+        for evt in evts:
+            # The bodies are the same as SelfDescribingJson(PAYLOAD_DATA_SCHEMA, batch).to_string()
+            fragment = Emitter.serialize_event(evt)
+            if (
+                len(batches) == 0
+                or len(batches[-1][0]) >= batch_size
+                or (
+                    max_request_bytes is not None
+                    and size + len(fragment) + 2 > max_request_bytes
+                )
+            ):
+                batches.append(([], []))
+                # The first event of a request has no ", " separator
+                size = len(PAYLOAD_DATA_PREFIX) + len(PAYLOAD_DATA_SUFFIX) - 2
+
+            batches[-1][0].append(evt)
+            batches[-1][1].append(fragment)
+            size += len(fragment) + 2
+
+        # Joining the encoded events only copies bytes, nothing is serialized again
+        return [
+            (
+                batch,
+                b"".join(
+                    (PAYLOAD_DATA_PREFIX, b", ".join(fragments), PAYLOAD_DATA_SUFFIX)
+                ),
+            )
+            for batch, fragments in batches
+        ]
 
-    def set_flush_timer(self, timeout: float) -> None:
+    @staticmethod
+    def compress_body(data: Union[str, bytes], compression: Compression) -> bytes:
         """
-        Set an interval at which the buffer will be flushed
-        :param timeout:   interval in seconds
-        :type  timeout:   int | float
+        Compresses a POST request body
+
+        :param  data:   The request body
+        :type   data:   string | bytes
+        :param  compression:    "gzip" or "deflate" (zlib format, as expected for the deflate Content-Encoding)
+        :type   compression:    compression
+        :rtype: bytes
         """
-        self.timer.start(timeout=timeout)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if compression == "gzip":
+            return gzip.compress(data, compresslevel=COMPRESSION_LEVEL)
+        return zlib.compress(data, COMPRESSION_LEVEL)
 
-    def cancel_flush_timer(self) -> None:
+    @staticmethod
+    def serialize_event(evt: PayloadDict) -> bytes:
         """
-        Abort automatic async flushing
+        Returns the encoded JSON of an event as sent in POST requests. The JSON
+        encoded when the event was buffered is reused, with the sent timestamp added.
+
+        :param  evt:    The event
+        :type   evt:    dict(string:\\*)
+        :rtype: bytes
         """
-        self.timer.cancel()
+        if not isinstance(evt, SerializedPayload):
+            return json.dumps(evt).encode("utf-8")
+        if "stm" not in evt:
+            return evt.encoded
+
+        stm = b'"stm": ' + json.dumps(evt["stm"]).encode("utf-8")
+        if evt.encoded == b"{}":
+            return b"{" + stm + b"}"
+        return b"".join((evt.encoded[:-1], b", ", stm, b"}"))
 
     @staticmethod
     def attach_sent_timestamp(events: PayloadDictList) -> None:
@@ -412,31 +507,444 @@ class Emitter(EmitterProtocol):
 
         return status_code not in [400, 401, 403, 410, 422]
 
-    def _set_retry_delay(self) -> None:
+    def _set_retry_delay(self, retry_after: Optional[float] = None) -> None:
         """
-        Sets a delay to retry failed events
+        Sets a delay to retry failed events.
+        Must be called while holding the lock.
+
+        :param  retry_after:    The Retry-After of the collector responses in seconds
+        :type   retry_after:    float | None
         """
-        random_noise = random.random()
-        self.retry_delay = min(
-            self.retry_delay * 2 + random_noise, self.max_retry_delay_seconds
+        self.retry_attempts += 1
+        self.retry_delay = Emitter.next_retry_delay(
+            self.retry_backoff,
+            self.retry_delay,
+            self.retry_attempts,
+            self.max_retry_delay_seconds,
         )
+        if retry_after is not None:
+            self.retry_delay = max(
+                self.retry_delay, min(retry_after, self.max_retry_delay_seconds)
+            )
+        # Retry when the circuit breaker lets a probe request through
+        if self.circuit_breaker is not None:
+            self.retry_delay = max(
+                self.retry_delay, self.circuit_breaker.time_until_half_open()
+            )
 
     def _reset_retry_delay(self) -> None:
         """
-        Resets retry delay to 0
+        Resets retry delay to 0.
+        Must be called while holding the lock.
         """
         self.retry_delay = 0
+        self.retry_attempts = 0
 
-    def _retry_failed_events(self, failed_events) -> None:
+    @staticmethod
+    def next_retry_delay(
+        retry_backoff: RetryBackoff,
+        retry_delay: float,
+        retry_attempts: int,
+        max_retry_delay_seconds: float,
+    ) -> float:
+        """
+        Returns the delay before the next retry
+
+        :param  retry_backoff:  The backoff strategy
+        :type   retry_backoff:  retry_backoff
+        :param  retry_delay:    The previous delay in seconds, 0 before the first retry
+        :type   retry_delay:    float
+        :param  retry_attempts: The number of consecutive failed attempts, including the last one
+        :type   retry_attempts: int
+        :param  max_retry_delay_seconds:    The maximum delay
+        :type   max_retry_delay_seconds:    float
+        :rtype: float
+        """
+        if retry_backoff == "full_jitter":
+            exponential = RETRY_BASE_DELAY_SECONDS * 2 ** min(retry_attempts - 1, 32)
+            return random.uniform(0, min(exponential, max_retry_delay_seconds))
+        if retry_backoff == "decorrelated_jitter":
+            upper = max(RETRY_BASE_DELAY_SECONDS, retry_delay * 3)
+            return min(
+                random.uniform(RETRY_BASE_DELAY_SECONDS, upper), max_retry_delay_seconds
+            )
+        return min(retry_delay * 2 + random.random(), max_retry_delay_seconds)
+
+    @staticmethod
+    def max_retry_after(status_codes: List[int]) -> Optional[float]:
+        """
+        Returns the longest Retry-After of the collector responses, None if they have none
+
+        :param  status_codes:   The status codes returned by http_post or http_get
+        :type   status_codes:   list(int)
+        :rtype: float | None
+        """
+        retry_after = None
+        for status_code in status_codes:
+            if isinstance(status_code, CollectorResponse):
+                value = status_code.retry_after
+                if value is not None and (retry_after is None or value > retry_after):
+                    retry_after = value
+        return retry_after
+
+    def _retry_failed_events(
+        self, failed_events: PayloadDictList, batch_id: Optional[str] = None
+    ) -> None:
         """
         Adds failed events back to the buffer to retry
 
         :param  failed_events: List of failed events
         :type   List
+        :param  batch_id:   The batch ID if the events are leased from the event store
+        :type   batch_id:   string | None
         """
-        self.event_store.cleanup(failed_events, True)
+        with self.lock:
+            if batch_id is None:
+                self.event_store.cleanup(failed_events, True)
+            else:
+                cast(BatchLeasingEventStore, self.event_store).nack(
+                    batch_id, failed_events
+                )
         self._set_retry_timer(self.retry_delay)
 
+    @abstractmethod
+    def _set_retry_timer(self, timeout: float) -> None:
+        """
+        Schedules a flush to retry failed events
+
+        :param timeout:   delay in seconds
+        :type  timeout:   int | float
+        """
+
+
+class Emitter(BaseEmitter):
+    """
+    Synchronously send Snowplow events to a Snowplow collector
+    Supports both GET and POST requests
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        protocol: HttpProtocol = "https",
+        port: Optional[int] = None,
+        method: Method = "post",
+        batch_size: Optional[int] = None,
+        on_success: Optional[SuccessCallback] = None,
+        on_failure: Optional[FailureCallback] = None,
+        byte_limit: Optional[int] = None,
+        request_timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        max_retry_delay_seconds: int = 60,
+        buffer_capacity: Optional[int] = None,
+        custom_retry_codes: Dict[int, bool] = {},
+        event_store: Optional[EventStore] = None,
+        session: Optional[requests.Session] = None,
+        max_request_bytes: Optional[int] = None,
+        compression: Optional[Compression] = None,
+        compression_min_bytes: int = 1024,
+        get_concurrency: int = 1,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional["CircuitBreaker"] = None,
+        retry_backoff: RetryBackoff = "exponential",
+        pool_size: Optional[int] = None,
+        transport: Optional[Transport] = None,
+    ) -> None:
+        """
+        :param endpoint:    The collector URL. If protocol is not set in endpoint it will automatically set to "https://" - this is done automatically.
+        :type  endpoint:    string
+        :param protocol:    The protocol to use - http or https. Defaults to https.
+        :type  protocol:    protocol
+        :param port:        The collector port to connect to
+        :type  port:        int | None
+        :param method:      The HTTP request method. Defaults to post.
+        :type  method:      method
+        :param batch_size:  The maximum number of queued events before the buffer is flushed. Default is 10.
+        :type  batch_size:  int | None
+        :param on_success:  Callback executed after every HTTP request in a flush has status code 200
+                            Gets passed one argument, an array of dictionaries corresponding to the sent events' payloads
+        :type  on_success:  function | None
+        :param on_failure:  Callback executed if at least one HTTP request in a flush has status code other than 200
+                            Gets passed two arguments:
+                            1) The number of events which were successfully sent
+                            2) An array of dictionaries corresponding to the unsent events' payloads
+        :type  on_failure:  function | None
+        :param byte_limit:  The size event list after reaching which queued events will be flushed
+        :type  byte_limit:  int | None
+        :param request_timeout: Timeout for the HTTP requests. Can be set either as single float value which
+                                 applies to both "connect" AND "read" timeout, or as tuple with two float values
+                                 which specify the "connect" and "read" timeouts separately
+        :type request_timeout:  float | tuple | None
+        :param max_retry_delay_seconds:     Set the maximum time between attempts to send failed events to the collector. Default 60 seconds
+        :type max_retry_delay_seconds:      int
+        :param buffer_capacity: The maximum capacity of the event buffer.
+                                When the buffer is full new events are lost.
+        :type buffer_capacity: int
+        :param  custom_retry_codes: Set custom retry rules for HTTP status codes received in emit responses from the Collector.
+                                    By default, retry will not occur for status codes 400, 401, 403, 410 or 422. This can be overridden here.
+                                    Note that 2xx codes will never retry as they are considered successful.
+        :type   custom_retry_codes: dict
+        :param  event_store:    Stores the event buffer and buffer capacity. Default is an InMemoryEventStore object with buffer_capacity of 10,000 events.
+        :type   event_store:    EventStore | None
+        :param  session:    Persist parameters across requests by using a session object.
+                            Default is a session owned by the emitter that keeps connections to the collector open.
+        :type   session:    requests.Session | None
+        :param  max_request_bytes:  The maximum size of a POST request body. A flush is split into
+                                    requests of at most batch_size events and max_request_bytes bytes.
+                                    An event larger than the limit is sent on its own. Default is no limit.
+        :type   max_request_bytes:  int | None
+        :param  compression:    Compress POST request bodies with "gzip" or "deflate" and set the
+                                Content-Encoding header. The collector must accept compressed requests.
+                                Default is no compression.
+        :type   compression:    compression | None
+        :param  compression_min_bytes:  POST request bodies smaller than this are sent uncompressed. Default 1024 bytes.
+        :type   compression_min_bytes:  int
+        :param  get_concurrency:    The maximum number of GET requests sent in parallel in a flush. Default 1.
+        :type   get_concurrency:    int
+        :param  retry_budget:   Limits the failed attempts and the age of retried events.
+                                Expired events are passed to its dead-letter sink instead of the event buffer.
+                                Default is to retry events until they are sent.
+        :type   retry_budget:   RetryBudget | None
+        :param  circuit_breaker:    Stops sending requests to the collector after consecutive failed or slow
+                                    requests and probes it with a single request once the breaker's reset timeout
+                                    has passed. Events are retried when the breaker allows a probe. Default is no circuit breaker.
+        :type   circuit_breaker:    CircuitBreaker | None
+        :param  retry_backoff:  How the delay before retrying failed events grows: "exponential" doubles it and adds
+                                up to a second of noise, "full_jitter" picks it at random up to the exponential delay and
+                                "decorrelated_jitter" picks it at random up to three times the previous delay.
+                                A longer Retry-After header of 429 and 503 responses is respected, up to max_retry_delay_seconds.
+                                Default is "exponential".
+        :type   retry_backoff:  retry_backoff
+        :param  pool_size:  The maximum number of connections to the collector kept open by the session
+                            the emitter creates when no session is set. Default is get_concurrency.
+        :type   pool_size:  int | None
+        :param  transport:  Sends the requests to the collector, e.g. an HTTP2Transport.
+                            Default is a RequestsTransport using session, or a pooled session if not set.
+        :type   transport:  Transport | None
+        """
+        super(Emitter, self).__init__(
+            endpoint=endpoint,
+            protocol=protocol,
+            port=port,
+            method=method,
+            batch_size=batch_size,
+            on_success=on_success,
+            on_failure=on_failure,
+            byte_limit=byte_limit,
+            request_timeout=request_timeout,
+            max_retry_delay_seconds=max_retry_delay_seconds,
+            buffer_capacity=buffer_capacity,
+            custom_retry_codes=custom_retry_codes,
+            event_store=event_store,
+            max_request_bytes=max_request_bytes,
+            compression=compression,
+            compression_min_bytes=compression_min_bytes,
+            get_concurrency=get_concurrency,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            retry_backoff=retry_backoff,
+        )
+        self.get_executor: Optional[ThreadPoolExecutor] = None
+
+        self.timer = FlushTimer(emitter=self, repeating=True)
+        self.retry_timer = FlushTimer(emitter=self, repeating=False)
+
+        logger.info("Emitter initialized with endpoint " + self.endpoint)
+
+        # Only a transport created with its own session is closed by close()
+        self._owns_transport = transport is None and session is None
+        if transport is None:
+            transport = RequestsTransport(
+                session, pool_size=max(pool_size or 1, get_concurrency)
+            )
+        self.transport = transport
+
+    def flush(self) -> None:
+        """
+        Sends all events in the buffer to the collector.
+        Only the buffer swap is done while holding the lock, the HTTP requests,
+        callbacks and retry bookkeeping happen after it is released.
+        """
+        with self.lock:
+            if self.retry_timer.is_active():
+                return
+            batch_id, send_events = self._take_batch()
+            if self.bytes_queued is not None:
+                self.bytes_queued = 0
+
+        self.send_events(send_events, batch_id)
+
+    def http_post(self, data: Union[str, bytes]) -> int:
+        """
+        :param data:  The array of JSONs to be sent
+        :type  data:  string | bytes
+        """
+        logger.debug("Payload: %r", data)
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        if self.compression is not None and len(data) >= self.compression_min_bytes:
+            data = Emitter.compress_body(data, self.compression)
+            headers["Content-Encoding"] = self.compression
+        return self._guarded_request(
+            self.transport.post,
+            self.endpoint,
+            data=data,
+            headers=headers,
+            timeout=self.request_timeout,
+        )
+
+    def http_get(self, payload: PayloadDict) -> int:
+        """
+        :param payload:  The event properties
+        :type  payload:  dict(string:\\*)
+        """
+        logger.debug("Payload: %s" % payload)
+        return self._guarded_request(
+            self.transport.get,
+            self.endpoint,
+            params=payload,
+            timeout=self.request_timeout,
+        )
+
+    def _guarded_request(self, request: Callable, endpoint: str, **kwargs: Any) -> int:
+        """
+        Sends a request unless the circuit breaker is open and returns the status code,
+        -1 if the request failed or REQUEST_NOT_SENT if it was not sent
+
+        :param  request:    The transport method sending the request
+        :type   request:    function
+        :param  endpoint:   The collector URI
+        :type   endpoint:   string
+        :rtype: int
+        """
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow_request():
+            logger.info("Circuit breaker is open, not sending request.")
+            return REQUEST_NOT_SENT
+
+        logger.info("Sending %s request to %s..." % (self.method.upper(), endpoint))
+        start = time.monotonic()
+        status_code = -1
+        try:
+            status_code = request(endpoint, **kwargs)
+        except TransportError as e:
+            logger.warning(e)
+        finally:
+            if breaker is not None:
+                breaker.record(status_code, time.monotonic() - start)
+        return status_code
+
+    def sync_flush(self) -> None:
+        """
+        Calls the flush method of the base Emitter class.
+        This is guaranteed to be blocking, not asynchronous.
+        """
+        logger.debug("Starting synchronous flush...")
+        self.flush()
+        logger.info("Finished synchronous flush")
+
+    def close(self) -> None:
+        """
+        Stops the threads sending GET requests in parallel, waiting for their requests,
+        and closes the connections of the transport if the emitter created it.
+        A transport or session passed to the emitter is left open.
+        Buffered events are not sent, call flush first.
+        """
+        with self.lock:
+            executor = self.get_executor
+            self.get_executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+        if self._owns_transport:
+            self.transport.close()
+
+    def send_events(
+        self, evts: PayloadDictList, batch_id: Optional[str] = None
+    ) -> None:
+        """
+        Sends the events in as many requests as needed. Only events of failed
+        requests which should be retried are added back to the buffer.
+        The events are returned to the buffer if sending raises an exception.
+
+        :param evts: Array of events to be sent
+        :type  evts: list(dict(string:\\*))
+        :param batch_id: The batch ID if the events are leased from the event store
+        :type  batch_id: string | None
+        """
+        if len(evts) > 0:
+            logger.info("Attempting to send %s events" % len(evts))
+
+            Emitter.attach_sent_timestamp(evts)
+            try:
+                responses = self._send_requests(evts)
+            except Exception:
+                self._return_batch(evts, batch_id)
+                raise
+
+            self._complete_send(responses, batch_id)
+        else:
+            logger.info("Skipping flush since buffer is empty")
+
+    def _send_requests(
+        self, evts: PayloadDictList
+    ) -> List[Tuple[PayloadDictList, int]]:
+        """
+        Sends the events and returns the events of each request with its status code
+
+        :param evts: Array of events to be sent
+        :type  evts: list(dict(string:\\*))
+        :rtype: list(tuple(list(dict(string:\\*)), int))
+        """
+        if self.method == "post":
+            return [
+                (batch, self.http_post(data))
+                for batch, data in Emitter.split_post_batches(
+                    evts, self.batch_size, self.max_request_bytes
+                )
+            ]
+
+        if self.get_concurrency > 1 and len(evts) > 1:
+            status_codes = list(self._get_executor().map(self.http_get, evts))
+        else:
+            status_codes = [self.http_get(evt) for evt in evts]
+        return [([evt], status_code) for evt, status_code in zip(evts, status_codes)]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Returns the thread pool sending GET requests in parallel, starting it if needed
+
+        :rtype: ThreadPoolExecutor
+        """
+        with self.lock:
+            if self.get_executor is None:
+                self.get_executor = ThreadPoolExecutor(
+                    max_workers=self.get_concurrency,
+                    thread_name_prefix="snowplow-get",
+                )
+            return self.get_executor
+
+    def _set_retry_timer(self, timeout: float) -> None:
+        """
+        Set an interval at which failed events will be retried
+
+        :param timeout:   interval in seconds
+        :type  timeout:   int | float
+        """
+        self.retry_timer.start(timeout=timeout)
+
+    def set_flush_timer(self, timeout: float) -> None:
+        """
+        Set an interval at which the buffer will be flushed
+        :param timeout:   interval in seconds
+        :type  timeout:   int | float
+        """
+        self.timer.start(timeout=timeout)
+
+    def cancel_flush_timer(self) -> None:
+        """
+        Abort automatic async flushing
+        """
+        self.timer.cancel()
+
     def _cancel_retry_timer(self) -> None:
         """
         Cancels a retry timer
@@ -470,6 +978,21 @@ class AsyncEmitter(Emitter):
         custom_retry_codes: Dict[int, bool] = {},
         event_store: Optional[EventStore] = None,
         session: Optional[requests.Session] = None,
+        max_request_bytes: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        queue_overflow_policy: QueueOverflowPolicy = "block",
+        spill_directory: Optional[str] = None,
+        max_in_flight: Optional[int] = None,
+        adaptive_concurrency: bool = False,
+        latency_threshold_seconds: float = 1.0,
+        compression: Optional[Compression] = None,
+        compression_min_bytes: int = 1024,
+        get_concurrency: int = 1,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional["CircuitBreaker"] = None,
+        retry_backoff: RetryBackoff = "exponential",
+        pool_size: Optional[int] = None,
+        transport: Optional[Transport] = None,
     ) -> None:
         """
         :param endpoint:    The collector URL. If protocol is not set in endpoint it will automatically set to "https://" - this is done automatically.
@@ -501,9 +1024,72 @@ class AsyncEmitter(Emitter):
         :type buffer_capacity: int
         :param  event_store:    Stores the event buffer and buffer capacity. Default is an InMemoryEventStore object with buffer_capacity of 10,000 events.
         :type   event_store:    EventStore
-        :param  session:    Persist parameters across requests by using a session object
+        :param  session:    Persist parameters across requests by using a session object.
+                            Default is a session owned by the emitter that keeps connections to the collector open.
         :type   session:    requests.Session | None
+        :param  max_request_bytes:  The maximum size of a POST request body. A flush is split into
+                                    requests of at most batch_size events and max_request_bytes bytes.
+                                    An event larger than the limit is sent on its own. Default is no limit.
+        :type   max_request_bytes:  int | None
+        :param  max_queue_size: The maximum number of batches waiting to be sent. Default is unbounded.
+        :type   max_queue_size: int | None
+        :param  queue_overflow_policy:  What to do with a new batch when the queue is full:
+                                        "block" waits for space, "drop_newest" drops the new batch,
+                                        "drop_oldest" drops the oldest queued batch and
+                                        "spill" writes the new batch to spill_directory until there is space.
+                                        Default is "block".
+        :type   queue_overflow_policy:  queue_overflow_policy
+        :param  spill_directory:    Directory for batches spilled to disk. Required by the "spill" policy.
+        :type   spill_directory:    string | None
+        :param  max_in_flight:  The maximum number of concurrent requests to the collector endpoint.
+                                It also caps the GET requests of a flush sent in parallel, so a max_in_flight
+                                smaller than get_concurrency overrides it. Default is the larger of thread_count
+                                and get_concurrency. More worker threads are started if it is larger than thread_count.
+        :type   max_in_flight:  int | None
+        :param  adaptive_concurrency:   Adapt the number of concurrent requests between 1 and max_in_flight:
+                                        grow after successful requests faster than latency_threshold_seconds,
+                                        halve after 5xx and 429 responses or failed requests. Default is False.
+        :type   adaptive_concurrency:   bool
+        :param  latency_threshold_seconds:  Requests slower than this do not grow the concurrency limit. Default 1 second.
+        :type   latency_threshold_seconds:  float
+        :param  compression:    Compress POST request bodies with "gzip" or "deflate" and set the
+                                Content-Encoding header. The collector must accept compressed requests.
+                                Default is no compression.
+        :type   compression:    compression | None
+        :param  compression_min_bytes:  POST request bodies smaller than this are sent uncompressed. Default 1024 bytes.
+        :type   compression_min_bytes:  int
+        :param  get_concurrency:    The maximum number of GET requests sent in parallel in a flush. Default 1.
+        :type   get_concurrency:    int
+        :param  retry_budget:   Limits the failed attempts and the age of retried events.
+                                Expired events are passed to its dead-letter sink instead of the event buffer.
+                                Default is to retry events until they are sent.
+        :type   retry_budget:   RetryBudget | None
+        :param  circuit_breaker:    Stops sending requests to the collector after consecutive failed or slow
+                                    requests and probes it with a single request once the breaker's reset timeout
+                                    has passed. Events are retried when the breaker allows a probe. Default is no circuit breaker.
+        :type   circuit_breaker:    CircuitBreaker | None
+        :param  retry_backoff:  How the delay before retrying failed events grows: "exponential" doubles it and adds
+                                up to a second of noise, "full_jitter" picks it at random up to the exponential delay and
+                                "decorrelated_jitter" picks it at random up to three times the previous delay.
+                                A longer Retry-After header of 429 and 503 responses is respected, up to max_retry_delay_seconds.
+                                Default is "exponential".
+        :type   retry_backoff:  retry_backoff
+        :param  pool_size:  The maximum number of connections to the collector kept open by the session
+                            the emitter creates when no session is set. Default is the number of worker threads.
+        :type   pool_size:  int | None
+        :param  transport:  Sends the requests to the collector, e.g. an HTTP2Transport.
+                            Default is a RequestsTransport using session, or a pooled session if not set.
+        :type   transport:  Transport | None
         """
+        one_of(queue_overflow_policy, QUEUE_OVERFLOW_POLICIES)
+        if queue_overflow_policy == "spill":
+            if spill_directory is None:
+                raise ValueError("spill_directory is required for the spill policy.")
+            os.makedirs(spill_directory, exist_ok=True)
+        worker_count = max(thread_count, max_in_flight or 0)
+        if max_in_flight is None:
+            max_in_flight = max(thread_count, get_concurrency)
+
         super(AsyncEmitter, self).__init__(
             endpoint=endpoint,
             protocol=protocol,
@@ -519,9 +1105,33 @@ class AsyncEmitter(Emitter):
             custom_retry_codes=custom_retry_codes,
             event_store=event_store,
             session=session,
+            max_request_bytes=max_request_bytes,
+            compression=compression,
+            compression_min_bytes=compression_min_bytes,
+            get_concurrency=get_concurrency,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            retry_backoff=retry_backoff,
+            pool_size=pool_size or max(thread_count, max_in_flight),
+            transport=transport,
         )
-        self.queue: Queue = Queue()
-        for i in range(thread_count):
+        self.queue_overflow_policy = queue_overflow_policy
+        self.spill_directory = spill_directory
+        self.spill_lock = threading.Lock()
+        self.overflow_lock = threading.Lock()
+        # Number of batches and events affected by each overflow policy
+        self.overflow_stats: Dict[str, Dict[str, int]] = {
+            policy: {"batches": 0, "events": 0} for policy in QUEUE_OVERFLOW_POLICIES
+        }
+
+        self.max_in_flight = max_in_flight
+        self.adaptive_concurrency = adaptive_concurrency
+        self.latency_threshold_seconds = latency_threshold_seconds
+        self.limiters: Dict[str, ConcurrencyLimiter] = {}
+        self.limiters_lock = threading.Lock()
+
+        self.queue: Queue = Queue(maxsize=max_queue_size or 0)
+        for i in range(worker_count):
             t = threading.Thread(target=self.consume)
             t.daemon = True
             t.start()
@@ -530,25 +1140,377 @@ class AsyncEmitter(Emitter):
         while True:
             self.flush()
             self.queue.join()
-            if self.event_store.size() < 1:
+            if self.event_store.size() < 1 and len(self._spilled_batches()) < 1:
                 break
 
     def flush(self) -> None:
         """
-        Removes all dead threads, then creates a new thread which
-        executes the flush method of the base Emitter class
+        Puts all events in the buffer on the queue consumed by the worker threads.
+        The queue_overflow_policy is applied when the queue is full.
         """
         with self.lock:
-            self.queue.put(self.event_store.get_events_batch())
+            batch_id, evts = self._take_batch()
             if self.bytes_queued is not None:
                 self.bytes_queued = 0
 
+        self._restore_spilled_batches()
+        if len(evts) > 0:
+            self._enqueue(evts, batch_id)
+
+    def http_post(self, data: Union[str, bytes]) -> int:
+        """
+        Waits for a free slot on the endpoint's concurrency limiter before sending
+
+        :param data:  The array of JSONs to be sent
+        :type  data:  string | bytes
+        """
+        return self._limited_request(
+            self.endpoint, super(AsyncEmitter, self).http_post, data
+        )
+
+    def http_get(self, payload: PayloadDict) -> int:
+        """
+        Waits for a free slot on the endpoint's concurrency limiter before sending
+
+        :param payload:  The event properties
+        :type  payload:  dict(string:\\*)
+        """
+        return self._limited_request(
+            self.endpoint, super(AsyncEmitter, self).http_get, payload
+        )
+
+    def get_limiter(self, endpoint: str) -> "ConcurrencyLimiter":
+        """
+        Returns the concurrency limiter of a collector endpoint
+
+        :param  endpoint:   The collector URI
+        :type   endpoint:   string
+        :rtype: ConcurrencyLimiter
+        """
+        with self.limiters_lock:
+            if endpoint not in self.limiters:
+                self.limiters[endpoint] = ConcurrencyLimiter(
+                    max_limit=self.max_in_flight,
+                    adaptive=self.adaptive_concurrency,
+                    latency_threshold_seconds=self.latency_threshold_seconds,
+                )
+            return self.limiters[endpoint]
+
+    def _limited_request(self, endpoint: str, request: Callable, data: Any) -> int:
+        limiter = self.get_limiter(endpoint)
+        limiter.acquire()
+        start = time.monotonic()
+        status_code = -1
+        try:
+            status_code = request(data)
+        finally:
+            limiter.release(status_code, time.monotonic() - start)
+        return status_code
+
     def consume(self) -> None:
         while True:
-            evts = self.queue.get()
-            self.send_events(evts)
+            batch_id, evts = self.queue.get()
+            try:
+                self.send_events(evts, batch_id)
+            except Exception:
+                logger.exception("Failed to send events")
+            # Refill the queue before marking the batch done so that join()
+            # does not return while spilled batches are left
+            self._restore_spilled_batches()
             self.queue.task_done()
 
+    def _enqueue(self, evts: PayloadDictList, batch_id: Optional[str] = None) -> None:
+        """
+        Puts a batch on the queue, applying the overflow policy if it is full.
+        Leased batches that are dropped or spilled are acknowledged in the event store.
+
+        :param  evts:   Batch of events
+        :type   evts:   list(dict(string:\\*))
+        :param  batch_id:   The batch ID if the events are leased from the event store
+        :type   batch_id:   string | None
+        """
+        try:
+            self.queue.put_nowait((batch_id, evts))
+            return
+        except Full:
+            pass
+
+        if self.queue_overflow_policy == "block":
+            self._record_overflow("block", evts)
+            self.queue.put((batch_id, evts))
+
+        elif self.queue_overflow_policy == "drop_newest":
+            self._record_overflow("drop_newest", evts)
+            logger.error("Send queue is full, dropping %s events." % len(evts))
+            self._ack_batch(batch_id)
+
+        elif self.queue_overflow_policy == "drop_oldest":
+            while True:
+                try:
+                    self.queue.put_nowait((batch_id, evts))
+                    return
+                except Full:
+                    pass
+                try:
+                    oldest_batch_id, oldest = self.queue.get_nowait()
+                except Empty:
+                    continue
+                self.queue.task_done()
+                self._record_overflow("drop_oldest", oldest)
+                logger.error("Send queue is full, dropping %s events." % len(oldest))
+                self._ack_batch(oldest_batch_id)
+
+        elif self.queue_overflow_policy == "spill":
+            self._record_overflow("spill", evts)
+            self._spill_batch(evts)
+            self._ack_batch(batch_id)
+
+    def _ack_batch(self, batch_id: Optional[str]) -> None:
+        """
+        Acknowledges a leased batch that is no longer sent from the event store
+
+        :param  batch_id:   The batch ID if the events are leased from the event store
+        :type   batch_id:   string | None
+        """
+        if batch_id is not None:
+            with self.lock:
+                cast(BatchLeasingEventStore, self.event_store).ack(batch_id)
+
+    def _record_overflow(self, policy: str, evts: PayloadDictList) -> None:
+        with self.overflow_lock:
+            self.overflow_stats[policy]["batches"] += 1
+            self.overflow_stats[policy]["events"] += len(evts)
+
+    def _spill_batch(self, evts: PayloadDictList) -> None:
+        """
+        Writes a batch to the spill directory
+
+        :param  evts:   Batch of events
+        :type   evts:   list(dict(string:\\*))
+        """
+        name = "%020d-%s.json" % (time.time_ns(), uuid.uuid4().hex)
+        path = os.path.join(cast(str, self.spill_directory), name)
+        with self.spill_lock:
+            with open(path + ".tmp", "w") as f:
+                json.dump(evts, f)
+            os.replace(path + ".tmp", path)
+
+    def _spilled_batches(self) -> List[str]:
+        """
+        Returns the paths of the spilled batches, oldest first
+
+        :rtype: list(string)
+        """
+        if self.queue_overflow_policy != "spill":
+            return []
+        directory = cast(str, self.spill_directory)
+        return [
+            os.path.join(directory, name)
+            for name in sorted(os.listdir(directory))
+            if name.endswith(".json")
+        ]
+
+    def _restore_spilled_batches(self) -> None:
+        """
+        Moves spilled batches back onto the queue while it has space
+        """
+        if self.queue_overflow_policy != "spill":
+            return
+        with self.spill_lock:
+            for path in self._spilled_batches():
+                if self.queue.full():
+                    return
+                with open(path) as f:
+                    evts = json.load(f)
+                try:
+                    self.queue.put_nowait((None, evts))
+                except Full:
+                    return
+                os.remove(path)
+
+
+class ConcurrencyLimiter(object):
+    """
+    Limits the number of requests in flight to a collector endpoint.
+    When adaptive, the limit grows by one after each successful request faster
+    than the latency threshold and is halved after a 5xx or 429 response
+    or a failed request (additive increase, multiplicative decrease).
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        adaptive: bool = False,
+        latency_threshold_seconds: float = 1.0,
+    ) -> None:
+        """
+        :param  max_limit:  The maximum number of requests in flight
+        :type   max_limit:  int
+        :param  min_limit:  The lowest value the limit can shrink to
+        :type   min_limit:  int
+        :param  adaptive:   Whether the limit adapts to the collector responses
+        :type   adaptive:   bool
+        :param  latency_threshold_seconds:  Requests slower than this do not grow the limit
+        :type   latency_threshold_seconds:  float
+        """
+        if max_limit < 1:
+            raise ValueError("max_limit must be greater than 0")
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.adaptive = adaptive
+        self.latency_threshold_seconds = latency_threshold_seconds
+        self.limit = max_limit
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a request can be sent
+        """
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, status_code: int, latency: float) -> None:
+        """
+        Frees the slot of a finished request and adapts the limit
+
+        :param  status_code:    Response status code, -1 if the request failed or REQUEST_NOT_SENT if it was not sent
+        :type   status_code:    int
+        :param  latency:        Duration of the request in seconds
+        :type   latency:        float
+        """
+        with self.condition:
+            self.in_flight -= 1
+            # A request stopped by the circuit breaker says nothing about the collector
+            if self.adaptive and status_code is not REQUEST_NOT_SENT:
+                if Emitter.is_unavailable_status_code(status_code):
+                    self.limit = max(self.min_limit, self.limit // 2)
+                elif (
+                    Emitter.is_good_status_code(status_code)
+                    and latency <= self.latency_threshold_seconds
+                ):
+                    self.limit = min(self.max_limit, self.limit + 1)
+            self.condition.notify_all()
+
+
+class CircuitBreaker(object):
+    """
+    Stops sending requests to a collector endpoint that keeps failing.
+    The breaker is closed while requests succeed. It opens after failure_threshold
+    consecutive failed requests, 5xx or 429 responses or requests slower than
+    slow_request_seconds, and requests are not sent while it is open.
+    After the reset timeout it is half-open and lets a single probe request through:
+    the breaker closes if the probe succeeds, otherwise it opens again for twice
+    as long, up to max_reset_timeout_seconds.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 5.0,
+        max_reset_timeout_seconds: float = 60.0,
+        slow_request_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        :param  failure_threshold:  The number of consecutive failed requests that opens the breaker
+        :type   failure_threshold:  int
+        :param  reset_timeout_seconds:  How long the breaker stays open before a probe request
+        :type   reset_timeout_seconds:  float
+        :param  max_reset_timeout_seconds:  The longest the breaker stays open after failed probes
+        :type   max_reset_timeout_seconds:  float
+        :param  slow_request_seconds:   Requests slower than this count as failed. Default is no limit.
+        :type   slow_request_seconds:   float | None
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be greater than 0")
+        self.failure_threshold = failure_threshold
+        self.initial_reset_timeout_seconds = reset_timeout_seconds
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.max_reset_timeout_seconds = max(
+            max_reset_timeout_seconds, reset_timeout_seconds
+        )
+        self.slow_request_seconds = slow_request_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Returns True if a request can be sent.
+        Moves an open breaker to half-open once the reset timeout has passed.
+
+        :rtype: bool
+        """
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout_seconds:
+                    return False
+                self.state = "half_open"
+                self.probing = False
+            if self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, status_code: int, latency: float) -> None:
+        """
+        Records the outcome of a request sent after allow_request
+
+        :param  status_code:    Response status code, -1 if the request failed
+        :type   status_code:    int
+        :param  latency:        Duration of the request in seconds
+        :type   latency:        float
+        """
+        failed = Emitter.is_unavailable_status_code(status_code) or (
+            self.slow_request_seconds is not None
+            and latency > self.slow_request_seconds
+        )
+        with self.lock:
+            if self.state == "half_open":
+                self.probing = False
+                if failed:
+                    self.reset_timeout_seconds = min(
+                        self.reset_timeout_seconds * 2, self.max_reset_timeout_seconds
+                    )
+                    self._open()
+                else:
+                    self.state = "closed"
+                    self.failures = 0
+                    self.reset_timeout_seconds = self.initial_reset_timeout_seconds
+            elif not failed:
+                self.failures = 0
+            elif self.state == "closed":
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self._open()
+
+    def time_until_half_open(self) -> float:
+        """
+        Returns the number of seconds until an open breaker lets a probe request through, 0 if it is not open
+
+        :rtype: float
+        """
+        with self.lock:
+            if self.state != "open":
+                return 0.0
+            return max(
+                0.0, self.opened_at + self.reset_timeout_seconds - time.monotonic()
+            )
+
+    def _open(self) -> None:
+        logger.warning(
+            "Circuit breaker opened for %s seconds." % self.reset_timeout_seconds
+        )
+        self.state = "open"
+        self.opened_at = time.monotonic()
+
 
 class FlushTimer(object):
     """
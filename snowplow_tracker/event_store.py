@@ -15,11 +15,20 @@
 #     language governing permissions and limitations there under.
 # """
 
-from typing import List
-from typing_extensions import Protocol
-from snowplow_tracker.typing import PayloadDict, PayloadDictList
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, cast
+from typing_extensions import Protocol, runtime_checkable
+from snowplow_tracker.contracts import one_of
+from snowplow_tracker.typing import (
+    PayloadDict,
+    PayloadDictList,
+    EventStoreOverflowPolicy,
+)
 from logging import Logger
 
+EVENT_STORE_OVERFLOW_POLICIES = {"drop_newest", "drop_oldest", "priority"}
+
 
 class EventStore(Protocol):
     """
@@ -64,23 +73,119 @@ class EventStore(Protocol):
         ...
 
 
-class InMemoryEventStore(EventStore):
+@runtime_checkable
+class BatchLeasingEventStore(EventStore, Protocol):
+    """
+    EventStore that leases batches of events to the emitter instead of removing them.
+    A leased batch is not returned again until its events are acknowledged or
+    returned to the buffer, so concurrent senders get disjoint batches and events
+    are not lost if sending fails with an exception.
+    """
+
+    def lease_batch(
+        self, batch_size: Optional[int] = None
+    ) -> Tuple[str, PayloadDictList]:
+        """
+        Leases the oldest events in the buffer. Returns the batch ID and the events.
+
+        :param  batch_size: The maximum number of events to lease. Default is all the events.
+        :type   batch_size: int | None
+        :rtype  tuple(string, PayloadDictList)
+        """
+        ...
+
+    def ack(self, batch_id: str, events: Optional[PayloadDictList] = None) -> None:
+        """
+        Removes events of a leased batch from the event store once they are sent or given up on.
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events to acknowledge. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        """
+        ...
+
+    def nack(self, batch_id: str, events: Optional[PayloadDictList] = None) -> None:
+        """
+        Returns events of a leased batch to the buffer so they are sent again.
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events to return. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        """
+        ...
+
+
+class InMemoryEventStore(BatchLeasingEventStore):
     """
     Create a InMemoryEventStore object with custom buffer capacity. The default is 10,000 events.
+    Events are kept in a ring buffer preallocated with the buffer capacity.
+    Events evicted by the "priority" overflow policy leave an empty slot behind,
+    so that policy preallocates twice the capacity and compacts the ring buffer
+    when it runs out of slots.
     """
 
-    def __init__(self, logger: Logger, buffer_capacity: int = 10000) -> None:
+    def __init__(
+        self,
+        logger: Logger,
+        buffer_capacity: int = 10000,
+        overflow_policy: EventStoreOverflowPolicy = "drop_newest",
+        event_priorities: Optional[Dict[str, int]] = None,
+    ) -> None:
         """
         :param  logger: Logging module
         :type   logger: Logger
         :param  buffer_capacity:    The maximum capacity of the event buffer.
-                                    When the buffer is full new events are lost.
         :type   buffer_capacity     int
+        :param  overflow_policy:    What to do with a new event when the buffer is full:
+                                    "drop_newest" drops the new event, "drop_oldest" evicts the oldest
+                                    buffered event and "priority" evicts the oldest event with the lowest
+                                    priority if it is lower than the priority of the new event,
+                                    otherwise drops the new event. Default is "drop_newest".
+        :type   overflow_policy:    event_store_overflow_policy
+        :param  event_priorities:   Priorities of event types (the `e` property) for the "priority" policy.
+                                    Other event types have priority 0.
+        :type   event_priorities:   dict(string:int) | None
         """
-        self.event_buffer: List[PayloadDict] = []
+        one_of(overflow_policy, EVENT_STORE_OVERFLOW_POLICIES)
+
         self.buffer_capacity = buffer_capacity
+        self.overflow_policy = overflow_policy
+        self.event_priorities = event_priorities or {}
         self.logger = logger
 
+        # Ring buffer of the events with their keys and priorities, starting at head
+        self.ring_size = buffer_capacity
+        if overflow_policy == "priority":
+            self.ring_size *= 2
+        self.slots: List[Optional[PayloadDict]] = [None] * self.ring_size
+        self.slot_keys: List[Any] = [None] * self.ring_size
+        self.slot_priorities: List[int] = [0] * self.ring_size
+        self.head = 0
+        # Number of slots used from the head, including the empty slots of evicted events
+        self.span = 0
+        self.count = 0
+        # Position of the head slot, counting the slots used since the store was created
+        self.head_position = 0
+        # Positions of the buffered events by priority, oldest first, for the "priority" policy.
+        # Positions before the head belong to events taken from the buffer and are skipped.
+        self.priority_positions: Dict[int, Deque[int]] = {}
+        # Number of buffered events by key, so that cleanup does not scan the buffer
+        self.event_keys: Dict[Any, int] = {}
+        # Number of new events dropped and of buffered events evicted when the buffer was full
+        self.overflow_stats: Dict[str, int] = {"dropped": 0, "evicted": 0}
+        # Events of the leased batches by batch ID and id() of the event
+        self.leases: Dict[str, Dict[int, PayloadDict]] = {}
+
+    @property
+    def event_buffer(self) -> PayloadDictList:
+        """
+        The buffered events, oldest first
+        """
+        slots = (self.slots[(self.head + i) % self.ring_size] for i in range(self.span))
+        return [event for event in slots if event is not None]
+
     def add_event(self, payload: PayloadDict) -> bool:
         """
         Add PayloadDict to buffer.
@@ -88,21 +193,63 @@ class InMemoryEventStore(EventStore):
         :param payload: The payload to add
         :type  payload: PayloadDict
         """
-        if self._buffer_capacity_reached():
+        priority = 0
+        if self.overflow_policy == "priority":
+            priority = self.event_priorities.get(payload.get("e", ""), 0)
+
+        if self._buffer_capacity_reached() and not self._evict(priority):
             self.logger.error("Event buffer is full, dropping event.")
+            self.overflow_stats["dropped"] += 1
             return False
 
-        self.event_buffer.append(payload)
+        if self.span == self.ring_size:
+            self._compact()
+        key = self._event_key(payload)
+        index = (self.head + self.span) % self.ring_size
+        self.slots[index] = payload
+        self.slot_keys[index] = key
+        self.slot_priorities[index] = priority
+        if self.overflow_policy == "priority":
+            positions = self.priority_positions.setdefault(priority, deque())
+            positions.append(self.head_position + self.span)
+        self.span += 1
+        self.count += 1
+        self.event_keys[key] = self.event_keys.get(key, 0) + 1
         return True
 
-    def get_events_batch(self) -> PayloadDictList:
+    def get_events_batch(self, batch_size: Optional[int] = None) -> PayloadDictList:
         """
-        Get a list of all the PayloadDicts in the in the buffer.
+        Takes the oldest events out of the buffer.
 
+        :param  batch_size: The maximum number of events to take. Default is all the events.
+        :type   batch_size: int | None
         :rtype  PayloadDictList
         """
-        batch = self.event_buffer
-        self.event_buffer = []
+        if batch_size is None or batch_size > self.count:
+            batch_size = self.count
+
+        # Slices the batch out of the ring buffer, in two parts if it wraps around,
+        # and more if there are empty slots left by evicted events
+        batch: PayloadDictList = []
+        while len(batch) < batch_size:
+            start = self.head
+            end = min(start + batch_size - len(batch), self.ring_size)
+            events = self.slots[start:end]
+            keys = self.slot_keys[start:end]
+            if self.span > self.count:
+                keys = [key for key, event in zip(keys, events) if event is not None]
+                events = [event for event in events if event is not None]
+            for key in keys:
+                self._forget(key)
+            batch += cast(PayloadDictList, events)
+            self.slots[start:end] = [None] * (end - start)
+            self.slot_keys[start:end] = [None] * (end - start)
+            self.head = end % self.ring_size
+            self.head_position += end - start
+            self.span -= end - start
+            self.count -= len(events)
+        self._skip_empty_slots()
+
         return batch
 
     def cleanup(self, batch: PayloadDictList, need_retry: bool) -> None:
@@ -118,17 +265,210 @@ class InMemoryEventStore(EventStore):
             return
 
         for event in batch:
-            if not event in self.event_buffer:
+            if self._event_key(event) not in self.event_keys:
                 if not self.add_event(event):
                     return
 
+    def lease_batch(
+        self, batch_size: Optional[int] = None
+    ) -> Tuple[str, PayloadDictList]:
+        """
+        Leases the oldest events in the buffer. Returns the batch ID and the events.
+
+        :param  batch_size: The maximum number of events to lease. Default is all the events.
+        :type   batch_size: int | None
+        :rtype  tuple(string, PayloadDictList)
+        """
+        batch = self.get_events_batch(batch_size)
+        batch_id = uuid.uuid4().hex
+        if len(batch) > 0:
+            self.leases[batch_id] = {id(event): event for event in batch}
+        return batch_id, batch
+
+    def ack(self, batch_id: str, events: Optional[PayloadDictList] = None) -> None:
+        """
+        Removes events of a leased batch from the event store once they are sent or given up on.
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events to acknowledge. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        """
+        self._release(batch_id, events)
+
+    def nack(self, batch_id: str, events: Optional[PayloadDictList] = None) -> None:
+        """
+        Returns events of a leased batch to the buffer so they are sent again.
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events to return. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        """
+        for event in self._release(batch_id, events):
+            if not self.add_event(event):
+                return
+
     def size(self) -> int:
         """
         Returns the number of events in the buffer
 
         :rtype  int
         """
-        return len(self.event_buffer)
+        return self.count
+
+    def _release(
+        self, batch_id: str, events: Optional[PayloadDictList]
+    ) -> PayloadDictList:
+        """
+        Ends the lease of events and returns the ones that were leased
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        :rtype  PayloadDictList
+        """
+        lease = self.leases.get(batch_id)
+        if lease is None:
+            return []
+
+        if events is None:
+            released = list(lease.values())
+            lease.clear()
+        else:
+            released = [lease.pop(id(event)) for event in events if id(event) in lease]
+        if len(lease) == 0:
+            del self.leases[batch_id]
+        return released
+
+    def _evict(self, priority: int) -> bool:
+        """
+        Makes room for a new event according to the overflow policy.
+        Returns True if an event was evicted.
+
+        :param  priority:   The priority of the new event
+        :type   priority:   int
+        :rtype: bool
+        """
+        if self.count == 0 or self.overflow_policy == "drop_newest":
+            return False
+
+        if self.overflow_policy == "drop_oldest":
+            self._remove_oldest()
+        else:
+            position = self._lowest_priority_position(priority)
+            if position is None:
+                return False
+            self._remove(position)
+
+        self.logger.warning("Event buffer is full, evicting event.")
+        self.overflow_stats["evicted"] += 1
+        return True
+
+    def _lowest_priority_position(self, priority: int) -> Optional[int]:
+        """
+        Takes the position of the oldest event with the lowest priority
+        if it is lower than the priority of a new event
+
+        :param  priority:   The priority of the new event
+        :type   priority:   int
+        :rtype: int | None
+        """
+        for level in sorted(self.priority_positions):
+            if level >= priority:
+                return None
+            positions = self.priority_positions[level]
+            while len(positions) > 0 and positions[0] < self.head_position:
+                positions.popleft()
+            if len(positions) > 0:
+                return positions.popleft()
+        return None
+
+    def _remove_oldest(self) -> None:
+        """
+        Removes the oldest event
+        """
+        self._forget(self.slot_keys[self.head])
+        self.slots[self.head] = None
+        self.slot_keys[self.head] = None
+        self.head = (self.head + 1) % self.ring_size
+        self.head_position += 1
+        self.span -= 1
+        self.count -= 1
+        self._skip_empty_slots()
+
+    def _remove(self, position: int) -> None:
+        """
+        Removes an event, leaving its slot empty
+
+        :param  position:   The position of the event slot
+        :type   position:   int
+        """
+        index = (self.head + position - self.head_position) % self.ring_size
+        self._forget(self.slot_keys[index])
+        self.slots[index] = None
+        self.slot_keys[index] = None
+        self.count -= 1
+        self._skip_empty_slots()
+
+    def _skip_empty_slots(self) -> None:
+        """
+        Moves the head past the empty slots left by evicted events
+        """
+        while self.span > 0 and self.slots[self.head] is None:
+            self.head = (self.head + 1) % self.ring_size
+            self.head_position += 1
+            self.span -= 1
+
+    def _compact(self) -> None:
+        """
+        Moves the buffered events to the start of the ring buffer, removing the empty slots.
+        The ring buffer of the "priority" policy has room for twice the capacity,
+        so it is compacted at most once every buffer_capacity evictions.
+        """
+        used = [(self.head + i) % self.ring_size for i in range(self.span)]
+        kept = [i for i in used if self.slots[i] is not None]
+        events = [self.slots[i] for i in kept]
+        keys = [self.slot_keys[i] for i in kept]
+        priorities = [self.slot_priorities[i] for i in kept]
+
+        empty = self.ring_size - len(kept)
+        self.slots = events + [None] * empty
+        self.slot_keys = keys + [None] * empty
+        self.slot_priorities = priorities + [0] * empty
+        self.head = 0
+        self.span = len(kept)
+
+        self.priority_positions = {}
+        for i, priority in enumerate(priorities):
+            positions = self.priority_positions.setdefault(priority, deque())
+            positions.append(self.head_position + i)
+
+    def _forget(self, key: Any) -> None:
+        """
+        Removes the key of an event that left the buffer
+
+        :param  key:    The key of the event
+        """
+        remaining = self.event_keys.get(key, 0) - 1
+        if remaining > 0:
+            self.event_keys[key] = remaining
+        else:
+            self.event_keys.pop(key, None)
+
+    def _event_key(self, payload: PayloadDict) -> Any:
+        """
+        Returns the event ID of an event, or the identity of the buffered object
+        for events without one. The buffer keeps that object, so its identity is not reused.
+
+        :param payload: The event
+        :type  payload: PayloadDict
+        :rtype: Any
+        """
+        if "eid" in payload:
+            return payload["eid"]
+        return id(payload)
 
     def _buffer_capacity_reached(self) -> bool:
         """
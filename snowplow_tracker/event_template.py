@@ -0,0 +1,117 @@
+# """
+#     event_template.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+from typing import TYPE_CHECKING, Optional
+
+from snowplow_tracker import payload
+from snowplow_tracker.constants import UNSTRUCT_EVENT_SCHEMA
+from snowplow_tracker.events import Event
+from snowplow_tracker.self_describing_json import SelfDescribingJson
+from snowplow_tracker.typing import PayloadDict
+
+if TYPE_CHECKING:
+    from snowplow_tracker.tracker import Tracker
+
+
+class EventTemplate(object):
+    """
+    An event compiled once for a tracker and tracked many times.
+    The static part of the payload, the event properties, the encoded context,
+    the subject pairs and the tracker's tv, tna and aid, is built when the
+    template is created. Tracking the template copies it and only adds the
+    variable fields, eid and dtm.
+
+    Changes to the prototype event or to the tracker's subject made after the
+    template is created are not reflected in the tracked events.
+    """
+
+    def __init__(self, tracker: "Tracker", event: Event) -> None:
+        """
+        :param  tracker:    The tracker sending the events
+        :type   tracker:    Tracker
+        :param  event:      The prototype event
+        :type   event:      events.Event
+        """
+        self.tracker = tracker
+        static_payload = event.build_payload(
+            encode_base64=tracker.encode_base64,
+            json_encoder=tracker.json_encoder,
+            subject=tracker.subject,
+        )
+        static_payload.add_dict(tracker.standard_nv_pairs)
+        self.nv_pairs = static_payload.nv_pairs
+
+    def build_payload(
+        self,
+        fields: Optional[PayloadDict] = None,
+        event_json: Optional[SelfDescribingJson] = None,
+        true_timestamp: Optional[float] = None,
+    ) -> PayloadDict:
+        """
+        Returns the name-value pairs of a new event from the template
+
+        :param  fields:         Payload fields set or replaced for this event, e.g. {"se_la": "label"}
+        :type   fields:         dict(string:\\*) | None
+        :param  event_json:     The properties of this event, replacing those of a SelfDescribing prototype
+        :type   event_json:     SelfDescribingJson | None
+        :param  true_timestamp: Optional event timestamp in milliseconds
+        :type   true_timestamp: int | float | None
+        :rtype:                 dict(string:\\*)
+        """
+        nv_pairs = self.nv_pairs.copy()
+        if fields is not None or event_json is not None or true_timestamp is not None:
+            variable = payload.Payload(dict_=fields)
+            if event_json is not None:
+                envelope = SelfDescribingJson(
+                    UNSTRUCT_EVENT_SCHEMA, event_json.to_json()
+                ).to_json()
+                variable.add_json(
+                    envelope,
+                    self.tracker.encode_base64,
+                    "ue_px",
+                    "ue_pr",
+                    self.tracker.json_encoder,
+                )
+            if isinstance(true_timestamp, (int, float)):
+                variable.add("ttm", int(true_timestamp))
+            nv_pairs.update(variable.nv_pairs)
+
+        nv_pairs["eid"] = self.tracker.get_uuid()
+        nv_pairs["dtm"] = self.tracker.get_timestamp()
+        return nv_pairs
+
+    def track(
+        self,
+        fields: Optional[PayloadDict] = None,
+        event_json: Optional[SelfDescribingJson] = None,
+        true_timestamp: Optional[float] = None,
+    ) -> str:
+        """
+        Sends a new event from the template to the tracker's emitters. Returns the tracked event ID.
+
+        :param  fields:         Payload fields set or replaced for this event, e.g. {"se_la": "label"}
+        :type   fields:         dict(string:\\*) | None
+        :param  event_json:     The properties of this event, replacing those of a SelfDescribing prototype
+        :type   event_json:     SelfDescribingJson | None
+        :param  true_timestamp: Optional event timestamp in milliseconds
+        :type   true_timestamp: int | float | None
+        :rtype:                 string
+        """
+        nv_pairs = self.build_payload(fields, event_json, true_timestamp)
+        for emitter in self.tracker.emitters:
+            emitter.input(nv_pairs)
+        return nv_pairs["eid"]
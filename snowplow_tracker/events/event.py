@@ -15,11 +15,15 @@
 #     language governing permissions and limitations there under.
 # """
 
-from typing import Optional, List
+from typing import Optional, List, cast
 from snowplow_tracker import payload
 from snowplow_tracker.subject import Subject
 
-from snowplow_tracker.self_describing_json import SelfDescribingJson
+from snowplow_tracker.self_describing_json import (
+    SelfDescribingJson,
+    FrozenSelfDescribingJson,
+)
+from snowplow_tracker.context_cache import ContextCache
 
 from snowplow_tracker.constants import CONTEXT_SCHEMA
 from snowplow_tracker.typing import JsonEncoderFunction, PayloadDict
@@ -66,22 +70,46 @@ class Event(object):
         encode_base64: bool,
         json_encoder: Optional[JsonEncoderFunction],
         subject: Optional[Subject] = None,
+        context_cache: Optional[ContextCache] = None,
     ) -> "payload.Payload":
         """
+        Builds a new payload from the event properties, context, true timestamp and subject.
+        The event is not modified, so it can be tracked many times and from several threads.
+
         :param encode_base64:    Whether JSONs in the payload should be base-64 encoded
         :type  encode_base64:    bool
         :param json_encoder:     Custom JSON serializer that gets called on non-serializable object
         :type  json_encoder:     function | None
         :param  subject:         Optional per event subject
         :type   subject:         subject | None
+        :param  context_cache:   Optional cache of encoded context envelopes
+        :type   context_cache:   ContextCache | None
         :rtype:                  payload.Payload
         """
-        if len(self.context) > 0:
+        event_payload = payload.Payload(dict_=self.payload.nv_pairs)
+        if len(self.context) > 0 and context_cache is not None:
+            event_payload.add_dict(
+                context_cache.encode(self.context, encode_base64, json_encoder)
+            )
+        elif len(self.context) > 0 and all(
+            isinstance(c, FrozenSelfDescribingJson) for c in self.context
+        ):
+            event_payload.add_json_string(
+                FrozenSelfDescribingJson.join(
+                    CONTEXT_SCHEMA,
+                    cast(List[FrozenSelfDescribingJson], self.context),
+                    json_encoder,
+                ),
+                encode_base64,
+                "cx",
+                "co",
+            )
+        elif len(self.context) > 0:
             context_jsons = list(map(lambda c: c.to_json(), self.context))
             context_envelope = SelfDescribingJson(
                 CONTEXT_SCHEMA, context_jsons
             ).to_json()
-            self.payload.add_json(
+            event_payload.add_json(
                 context_envelope, encode_base64, "cx", "co", json_encoder
             )
 
@@ -92,15 +120,15 @@ class Event(object):
                 float,
             ),
         ):
-            self.payload.add("ttm", int(self.true_timestamp))
+            event_payload.add("ttm", int(self.true_timestamp))
 
         if self.event_subject is not None:
             fin_payload_dict = self.event_subject.combine_subject(subject)
         else:
             fin_payload_dict = {} if subject is None else subject.standard_nv_pairs
 
-        self.payload.add_dict(fin_payload_dict)
-        return self.payload
+        event_payload.add_dict(fin_payload_dict)
+        return event_payload
 
     @property
     def event_subject(self) -> Optional[Subject]:
@@ -27,6 +27,7 @@ from snowplow_tracker.constants import (
 from snowplow_tracker import payload
 from snowplow_tracker.subject import Subject
 from snowplow_tracker.contracts import non_empty_string
+from snowplow_tracker.context_cache import ContextCache
 
 
 class ScreenView(Event):
@@ -174,6 +175,7 @@ class ScreenView(Event):
         encode_base64: bool,
         json_encoder: Optional[JsonEncoderFunction],
         subject: Optional[Subject] = None,
+        context_cache: Optional[ContextCache] = None,
     ) -> "payload.Payload":
         """
         :param encode_base64:    Whether JSONs in the payload should be base-64 encoded
@@ -182,6 +184,8 @@ class ScreenView(Event):
         :type  json_encoder:     function | None
         :param  subject:         Optional per event subject
         :type   subject:         subject | None
+        :param  context_cache:   Optional cache of encoded context envelopes
+        :type   context_cache:   ContextCache | None
         :rtype:                  payload.Payload
         """
         event_json = SelfDescribingJson(
@@ -195,5 +199,5 @@ class ScreenView(Event):
             true_timestamp=self.true_timestamp,
         )
         return self_describing.build_payload(
-            encode_base64, json_encoder, subject=subject
+            encode_base64, json_encoder, subject=subject, context_cache=context_cache
         )
@@ -18,10 +18,12 @@ from typing import Optional, List
 from snowplow_tracker.typing import JsonEncoderFunction
 from snowplow_tracker.events.event import Event
 from snowplow_tracker import SelfDescribingJson
+from snowplow_tracker.self_describing_json import FrozenSelfDescribingJson
 from snowplow_tracker.constants import UNSTRUCT_EVENT_SCHEMA
 from snowplow_tracker import payload
 from snowplow_tracker.subject import Subject
 from snowplow_tracker.contracts import non_empty
+from snowplow_tracker.context_cache import ContextCache
 
 
 class SelfDescribing(Event):
@@ -77,6 +79,7 @@ class SelfDescribing(Event):
         encode_base64: bool,
         json_encoder: Optional[JsonEncoderFunction],
         subject: Optional[Subject] = None,
+        context_cache: Optional[ContextCache] = None,
     ) -> "payload.Payload":
         """
         :param encode_base64:    Whether JSONs in the payload should be base-64 encoded
@@ -85,14 +88,27 @@ class SelfDescribing(Event):
         :type  json_encoder:     function | None
         :param  subject:         Optional per event subject
         :type   subject:         subject | None
+        :param  context_cache:   Optional cache of encoded context envelopes
+        :type   context_cache:   ContextCache | None
         :rtype:                  payload.Payload
         """
+        event_payload = super(SelfDescribing, self).build_payload(
+            encode_base64=encode_base64,
+            json_encoder=json_encoder,
+            subject=subject,
+            context_cache=context_cache,
+        )
+
+        if isinstance(self.event_json, FrozenSelfDescribingJson):
+            frozen_envelope = self.event_json.envelope(UNSTRUCT_EVENT_SCHEMA)
+            if encode_base64:
+                event_payload.add("ue_px", frozen_envelope.to_base64(json_encoder))
+            else:
+                event_payload.add("ue_pr", frozen_envelope.to_string(json_encoder))
+            return event_payload
 
         envelope = SelfDescribingJson(
             UNSTRUCT_EVENT_SCHEMA, self.event_json.to_json()
         ).to_json()
-        self.payload.add_json(envelope, encode_base64, "ue_px", "ue_pr", json_encoder)
-
-        return super(SelfDescribing, self).build_payload(
-            encode_base64=encode_base64, json_encoder=json_encoder, subject=subject
-        )
+        event_payload.add_json(envelope, encode_base64, "ue_px", "ue_pr", json_encoder)
+        return event_payload
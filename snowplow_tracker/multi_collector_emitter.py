@@ -0,0 +1,409 @@
+# """
+#     multi_collector_emitter.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import requests
+
+from snowplow_tracker.contracts import one_of
+from snowplow_tracker.emitters import (
+    AsyncEmitter,
+    CircuitBreaker,
+    Emitter,
+    REQUEST_NOT_SENT,
+    logger,
+)
+from snowplow_tracker.event_store import EventStore
+from snowplow_tracker.retry_budget import RetryBudget
+from snowplow_tracker.transports import Transport, TransportError
+from snowplow_tracker.typing import (
+    Compression,
+    FailureCallback,
+    HttpProtocol,
+    LoadBalancingStrategy,
+    Method,
+    PayloadDict,
+    QueueOverflowPolicy,
+    RetryBackoff,
+    SuccessCallback,
+)
+
+LOAD_BALANCING_STRATEGIES = {"round_robin", "least_in_flight", "latency_weighted"}
+# Weight of the latest request in the moving average of an endpoint's latency
+LATENCY_SMOOTHING = 0.2
+
+
+class CollectorEndpoint(object):
+    """
+    A collector endpoint of a MultiCollectorEmitter with its health and latency.
+    The circuit breaker leaves the endpoint out after consecutive failed requests.
+    """
+
+    def __init__(self, uri: str, circuit_breaker: CircuitBreaker) -> None:
+        """
+        :param  uri:    The collector URI
+        :type   uri:    string
+        :param  circuit_breaker:    Tracks the health of the endpoint
+        :type   circuit_breaker:    CircuitBreaker
+        """
+        self.uri = uri
+        self.circuit_breaker = circuit_breaker
+        # Moving average of the latency of the requests in seconds, None before the first request
+        self.latency: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def is_healthy(self) -> bool:
+        """
+        Returns False while the circuit breaker leaves the endpoint out
+
+        :rtype: bool
+        """
+        return self.circuit_breaker.time_until_half_open() == 0
+
+    def record(self, status_code: int, latency: float) -> None:
+        """
+        Records the outcome of a request
+
+        :param  status_code:    Response status code, -1 if the request failed
+        :type   status_code:    int
+        :param  latency:        Duration of the request in seconds
+        :type   latency:        float
+        """
+        self.circuit_breaker.record(status_code, latency)
+        with self.lock:
+            self.requests += 1
+            if Emitter.is_unavailable_status_code(status_code):
+                self.failures += 1
+            elif self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+
+
+class MultiCollectorEmitter(AsyncEmitter):
+    """
+    Sends events to several collector endpoints using threads.
+    Each request goes to a healthy endpoint chosen by the load balancing strategy.
+    If it fails or the collector is unavailable, it is sent to the next endpoint,
+    so the batch is only retried later if no endpoint accepts it. Endpoints are
+    left out after consecutive failed requests and probed again after a timeout.
+    The endpoint attribute is the URI of the first endpoint, collectors has all of them.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        protocol: HttpProtocol = "http",
+        port: Optional[int] = None,
+        method: Method = "post",
+        batch_size: Optional[int] = None,
+        on_success: Optional[SuccessCallback] = None,
+        on_failure: Optional[FailureCallback] = None,
+        thread_count: int = 1,
+        byte_limit: Optional[int] = None,
+        request_timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        max_retry_delay_seconds: int = 60,
+        buffer_capacity: Optional[int] = None,
+        custom_retry_codes: Dict[int, bool] = {},
+        event_store: Optional[EventStore] = None,
+        session: Optional[requests.Session] = None,
+        max_request_bytes: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        queue_overflow_policy: QueueOverflowPolicy = "block",
+        spill_directory: Optional[str] = None,
+        max_in_flight: Optional[int] = None,
+        adaptive_concurrency: bool = False,
+        latency_threshold_seconds: float = 1.0,
+        compression: Optional[Compression] = None,
+        compression_min_bytes: int = 1024,
+        get_concurrency: int = 1,
+        retry_budget: Optional[RetryBudget] = None,
+        retry_backoff: RetryBackoff = "exponential",
+        pool_size: Optional[int] = None,
+        transport: Optional[Transport] = None,
+        strategy: LoadBalancingStrategy = "round_robin",
+        failure_threshold: int = 3,
+        reset_timeout_seconds: float = 5.0,
+        max_reset_timeout_seconds: float = 60.0,
+    ) -> None:
+        """
+        :param endpoints:   The collector URLs. If protocol is not set in an endpoint it will automatically set to "https://" - this is done automatically.
+        :type  endpoints:   list(string)
+        :param protocol:    The protocol to use - http or https. Defaults to http.
+        :type  protocol:    protocol
+        :param port:        The collector port to connect to
+        :type  port:        int | None
+        :param method:      The HTTP request method
+        :type  method:      method
+        :param batch_size: The maximum number of queued events before the buffer is flushed. Default is 10.
+        :type  batch_size: int | None
+        :param on_success:  Callback executed after every HTTP request in a flush has status code 200
+                            Gets passed one argument, an array of dictionaries corresponding to the sent events' payloads
+        :type  on_success:  function | None
+        :param on_failure:  Callback executed if at least one HTTP request in a flush has status code other than 200
+                            Gets passed two arguments:
+                            1) The number of events which were successfully sent
+                            2) An array of dictionaries corresponding to the unsent events' payloads
+        :type  on_failure:  function | None
+        :param thread_count: Number of worker threads to use for HTTP requests
+        :type  thread_count: int
+        :param byte_limit:  The size event list after reaching which queued events will be flushed
+        :type  byte_limit:  int | None
+        :param max_retry_delay_seconds:     Set the maximum time between attempts to send failed events to the collector. Default 60 seconds
+        :type max_retry_delay_seconds:      int
+        :param buffer_capacity: The maximum capacity of the event buffer.
+                                When the buffer is full new events are lost.
+        :type buffer_capacity: int
+        :param  event_store:    Stores the event buffer and buffer capacity. Default is an InMemoryEventStore object with buffer_capacity of 10,000 events.
+        :type   event_store:    EventStore
+        :param  session:    Persist parameters across requests by using a session object.
+                            Default is a session owned by the emitter that keeps connections to the collector open.
+        :type   session:    requests.Session | None
+        :param  max_request_bytes:  The maximum size of a POST request body. A flush is split into
+                                    requests of at most batch_size events and max_request_bytes bytes.
+                                    An event larger than the limit is sent on its own. Default is no limit.
+        :type   max_request_bytes:  int | None
+        :param  max_queue_size: The maximum number of batches waiting to be sent. Default is unbounded.
+        :type   max_queue_size: int | None
+        :param  queue_overflow_policy:  What to do with a new batch when the queue is full:
+                                        "block" waits for space, "drop_newest" drops the new batch,
+                                        "drop_oldest" drops the oldest queued batch and
+                                        "spill" writes the new batch to spill_directory until there is space.
+                                        Default is "block".
+        :type   queue_overflow_policy:  queue_overflow_policy
+        :param  spill_directory:    Directory for batches spilled to disk. Required by the "spill" policy.
+        :type   spill_directory:    string | None
+        :param  max_in_flight:  The maximum number of concurrent requests to each collector endpoint.
+                                It also caps the GET requests of a flush sent in parallel, so a max_in_flight
+                                smaller than get_concurrency overrides it. Default is the larger of thread_count
+                                and get_concurrency. More worker threads are started if it is larger than thread_count.
+        :type   max_in_flight:  int | None
+        :param  adaptive_concurrency:   Adapt the number of concurrent requests between 1 and max_in_flight:
+                                        grow after successful requests faster than latency_threshold_seconds,
+                                        halve after 5xx and 429 responses or failed requests. Default is False.
+        :type   adaptive_concurrency:   bool
+        :param  latency_threshold_seconds:  Requests slower than this do not grow the concurrency limit. Default 1 second.
+        :type   latency_threshold_seconds:  float
+        :param  compression:    Compress POST request bodies with "gzip" or "deflate" and set the
+                                Content-Encoding header. The collector must accept compressed requests.
+                                Default is no compression.
+        :type   compression:    compression | None
+        :param  compression_min_bytes:  POST request bodies smaller than this are sent uncompressed. Default 1024 bytes.
+        :type   compression_min_bytes:  int
+        :param  get_concurrency:    The maximum number of GET requests sent in parallel in a flush. Default 1.
+        :type   get_concurrency:    int
+        :param  retry_budget:   Limits the failed attempts and the age of retried events.
+                                Expired events are passed to its dead-letter sink instead of the event buffer.
+                                Default is to retry events until they are sent.
+        :type   retry_budget:   RetryBudget | None
+        :param  retry_backoff:  How the delay before retrying failed events grows: "exponential" doubles it and adds
+                                up to a second of noise, "full_jitter" picks it at random up to the exponential delay and
+                                "decorrelated_jitter" picks it at random up to three times the previous delay.
+                                A longer Retry-After header of 429 and 503 responses is respected, up to max_retry_delay_seconds.
+                                Default is "exponential".
+        :type   retry_backoff:  retry_backoff
+        :param  pool_size:  The maximum number of connections to each collector kept open by the session
+                            the emitter creates when no session is set. Default is the number of worker threads.
+        :type   pool_size:  int | None
+        :param  transport:  Sends the requests to the collector, e.g. an HTTP2Transport.
+                            Default is a RequestsTransport using session, or a pooled session if not set.
+        :type   transport:  Transport | None
+        :param  strategy:   How requests are spread across the healthy endpoints: "round_robin" takes turns,
+                            "least_in_flight" picks the endpoint with the fewest requests in flight and
+                            "latency_weighted" picks endpoints at random with weights inversely proportional
+                            to their recent latency. Default is "round_robin".
+        :type   strategy:   load_balancing_strategy
+        :param  failure_threshold:  The number of consecutive failed requests that marks an endpoint unhealthy. Default 3.
+        :type   failure_threshold:  int
+        :param  reset_timeout_seconds:  How long an unhealthy endpoint is left out before a probe request. Default 5 seconds.
+        :type   reset_timeout_seconds:  float
+        :param  max_reset_timeout_seconds:  The longest an endpoint is left out after failed probes. Default 60 seconds.
+        :type   max_reset_timeout_seconds:  float
+        """
+        one_of(strategy, LOAD_BALANCING_STRATEGIES)
+        if len(endpoints) == 0:
+            raise ValueError("No endpoint provided.")
+
+        self.strategy = strategy
+        self.collectors = [
+            CollectorEndpoint(
+                Emitter.as_collector_uri(endpoint, protocol, port, method),
+                CircuitBreaker(
+                    failure_threshold=failure_threshold,
+                    reset_timeout_seconds=reset_timeout_seconds,
+                    max_reset_timeout_seconds=max_reset_timeout_seconds,
+                ),
+            )
+            for endpoint in endpoints
+        ]
+        self.next_collector = 0
+        self.collectors_lock = threading.Lock()
+
+        super(MultiCollectorEmitter, self).__init__(
+            endpoint=endpoints[0],
+            protocol=protocol,
+            port=port,
+            method=method,
+            batch_size=batch_size,
+            on_success=on_success,
+            on_failure=on_failure,
+            thread_count=thread_count,
+            byte_limit=byte_limit,
+            request_timeout=request_timeout,
+            max_retry_delay_seconds=max_retry_delay_seconds,
+            buffer_capacity=buffer_capacity,
+            custom_retry_codes=custom_retry_codes,
+            event_store=event_store,
+            session=session,
+            max_request_bytes=max_request_bytes,
+            max_queue_size=max_queue_size,
+            queue_overflow_policy=queue_overflow_policy,
+            spill_directory=spill_directory,
+            max_in_flight=max_in_flight,
+            adaptive_concurrency=adaptive_concurrency,
+            latency_threshold_seconds=latency_threshold_seconds,
+            compression=compression,
+            compression_min_bytes=compression_min_bytes,
+            get_concurrency=get_concurrency,
+            retry_budget=retry_budget,
+            retry_backoff=retry_backoff,
+            pool_size=pool_size,
+            transport=transport,
+        )
+
+    def http_post(self, data: Union[str, bytes]) -> int:
+        """
+        Sends the request to the collector endpoints in the order of the load balancing strategy
+
+        :param data:  The array of JSONs to be sent
+        :type  data:  string | bytes
+        """
+        return Emitter.http_post(self, data)
+
+    def http_get(self, payload: PayloadDict) -> int:
+        """
+        Sends the request to the collector endpoints in the order of the load balancing strategy
+
+        :param payload:  The event properties
+        :type  payload:  dict(string:\\*)
+        """
+        return Emitter.http_get(self, payload)
+
+    def _guarded_request(self, request: Callable, endpoint: str, **kwargs: Any) -> int:
+        """
+        Sends a request to the first endpoint that accepts it and returns the status code.
+        An endpoint is skipped if it is unhealthy and the request fails over to the next one
+        if it fails or the collector is unavailable.
+
+        :param  request:    The transport method sending the request
+        :type   request:    function
+        :param  endpoint:   Ignored, the endpoints are chosen by the load balancing strategy
+        :type   endpoint:   string
+        :rtype: int
+        """
+        status_code: int = REQUEST_NOT_SENT
+        for collector in self._ordered_collectors():
+            if not collector.circuit_breaker.allow_request():
+                continue
+
+            logger.info(
+                "Sending %s request to %s..." % (self.method.upper(), collector.uri)
+            )
+            limiter = self.get_limiter(collector.uri)
+            limiter.acquire()
+            start = time.monotonic()
+            status_code = -1
+            try:
+                status_code = request(collector.uri, **kwargs)
+            except TransportError as e:
+                logger.warning(e)
+            finally:
+                latency = time.monotonic() - start
+                limiter.release(status_code, latency)
+                collector.record(status_code, latency)
+
+            if not Emitter.is_unavailable_status_code(status_code):
+                return status_code
+            logger.warning(
+                "Request to %s failed, trying the next endpoint." % collector.uri
+            )
+
+        return status_code
+
+    def _ordered_collectors(self) -> List[CollectorEndpoint]:
+        """
+        Returns the endpoints in the order to try them: the healthy endpoints
+        in the order of the load balancing strategy, then the unhealthy ones
+
+        :rtype: list(CollectorEndpoint)
+        """
+        with self.collectors_lock:
+            start = self.next_collector
+            self.next_collector = (start + 1) % len(self.collectors)
+        rotated = self.collectors[start:] + self.collectors[:start]
+        healthy = [c for c in rotated if c.is_healthy()]
+        unhealthy = [c for c in rotated if not c.is_healthy()]
+
+        if self.strategy == "least_in_flight":
+            healthy.sort(key=lambda c: self.get_limiter(c.uri).in_flight)
+        elif self.strategy == "latency_weighted" and len(healthy) > 1:
+            healthy = self._weighted_order(healthy)
+        return healthy + unhealthy
+
+    @staticmethod
+    def _weighted_order(
+        collectors: List[CollectorEndpoint],
+    ) -> List[CollectorEndpoint]:
+        """
+        Picks the first endpoint at random with weights inversely proportional to
+        the latency, followed by the other endpoints from the fastest to the slowest.
+        Endpoints without requests yet are weighted like the fastest endpoint.
+
+        :param  collectors: The healthy endpoints
+        :type   collectors: list(CollectorEndpoint)
+        :rtype: list(CollectorEndpoint)
+        """
+        latencies = [c.latency for c in collectors if c.latency is not None]
+        fastest = max(min(latencies), 0.001) if latencies else 1.0
+        weights = [
+            1.0 / max(fastest if c.latency is None else c.latency, 0.001)
+            for c in collectors
+        ]
+        first = random.choices(collectors, weights=weights)[0]
+        others = sorted(
+            (c for c in collectors if c is not first),
+            key=lambda c: fastest if c.latency is None else c.latency,
+        )
+        return [first] + others
+
+    def _set_retry_delay(self, retry_after: Optional[float] = None) -> None:
+        """
+        Sets a delay to retry failed events, at least until an endpoint can be probed again
+
+        :param  retry_after:    The Retry-After of the collector responses in seconds
+        :type   retry_after:    float | None
+        """
+        super(MultiCollectorEmitter, self)._set_retry_delay(retry_after)
+        self.retry_delay = max(
+            self.retry_delay,
+            min(c.circuit_breaker.time_until_half_open() for c in self.collectors),
+        )
@@ -80,17 +80,73 @@ class Payload:
         if dict_ is not None and dict_ != {}:
 
             json_dict = json.dumps(dict_, ensure_ascii=False, default=json_encoder)
+            self.add_json_string(
+                json_dict, encode_base64, type_when_encoded, type_when_not_encoded
+            )
 
-            if encode_base64:
-                encoded_dict = base64.urlsafe_b64encode(json_dict.encode("utf-8"))
-                encoded_dict_str = encoded_dict.decode("utf-8")
-                self.add(type_when_encoded, encoded_dict_str)
+    def add_json_string(
+        self,
+        json_string: str,
+        encode_base64: bool,
+        type_when_encoded: str,
+        type_when_not_encoded: str,
+    ) -> None:
+        """
+        Add an already serialized JSON to the payload, base64 encoded or not
+
+        :param  json_string:            The JSON text
+        :type   json_string:            string
+        :param  encode_base64:          If the payload is base64 encoded
+        :type   encode_base64:          bool
+        :param  type_when_encoded:      Name of the field when encode_base64 is set
+        :type   type_when_encoded:      string
+        :param  type_when_not_encoded:  Name of the field when encode_base64 is not set
+        :type   type_when_not_encoded:  string
+        """
+        if encode_base64:
+            encoded_dict = base64.urlsafe_b64encode(json_string.encode("utf-8"))
+            encoded_dict_str = encoded_dict.decode("utf-8")
+            self.add(type_when_encoded, encoded_dict_str)
 
-            else:
-                self.add(type_when_not_encoded, json_dict)
+        else:
+            self.add(type_when_not_encoded, json_string)
 
     def get(self) -> PayloadDict:
         """
         Returns the context dictionary from the Payload object
         """
         return self.nv_pairs
+
+
+class SerializedPayload(dict):
+    """
+    Event payload buffered by a POST emitter together with its JSON encoded as UTF-8,
+    so that each event is serialized once and the bytes are reused in request bodies.
+    The JSON leaves out the sent timestamp `stm`, which is added when sending.
+    The payload should not be changed after it is created.
+    """
+
+    __slots__ = ("encoded",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super(SerializedPayload, self).__init__(*args, **kwargs)
+        if "stm" in self:
+            data = json.dumps({key: self[key] for key in self if key != "stm"})
+        else:
+            data = json.dumps(self)
+        self.encoded = data.encode("utf-8")
+
+    @classmethod
+    def decode(cls, encoded: bytes) -> "SerializedPayload":
+        """
+        Creates a payload from the encoded JSON of a SerializedPayload
+        without serializing it again
+
+        :param encoded: The encoded JSON
+        :type  encoded: bytes
+        :rtype: SerializedPayload
+        """
+        payload = cls.__new__(cls)
+        dict.update(payload, json.loads(encoded))
+        payload.encoded = encoded
+        return payload
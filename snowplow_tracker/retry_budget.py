@@ -0,0 +1,182 @@
+# """
+#     retry_budget.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from snowplow_tracker.payload import SerializedPayload
+from snowplow_tracker.typing import DeadLetterSink, PayloadDict, PayloadDictList
+
+logger = logging.getLogger(__name__)
+
+
+class FileDeadLetterSink(object):
+    """
+    Dead-letter sink that appends events to a local file, one JSON object per line
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param  path:   The file to append the events to. Its directory is created if it does not exist.
+        :type   path:   string
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+
+    def __call__(self, events: PayloadDictList) -> None:
+        """
+        :param  events: The expired events
+        :type   events: PayloadDictList
+        """
+        lines = [
+            (
+                event.encoded
+                if isinstance(event, SerializedPayload)
+                else json.dumps(event).encode("utf-8")
+            )
+            + b"\n"
+            for event in events
+        ]
+        with self.lock:
+            with open(self.path, "ab") as f:
+                f.writelines(lines)
+
+
+class RetryBudget(object):
+    """
+    Limits how often and for how long failed events are retried.
+    The failed attempts of each event and the time of its first failed attempt are
+    tracked by event ID. Events over the budget are expired instead of being added
+    back to the event buffer, and are passed to the dead-letter sink if there is one.
+    """
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        dead_letter: Optional[DeadLetterSink] = None,
+        max_tracked_events: int = 100000,
+    ) -> None:
+        """
+        :param  max_attempts:   The maximum number of failed attempts to send an event. Default is no limit.
+        :type   max_attempts:   int | None
+        :param  max_age_seconds:    The maximum time since the first failed attempt to send an event. Default is no limit.
+        :type   max_age_seconds:    float | None
+        :param  dead_letter:    Receives the list of expired events, for example a FileDeadLetterSink.
+                                Default is to drop them.
+        :type   dead_letter:    function | None
+        :param  max_tracked_events: The maximum number of failed events tracked.
+                                    The events that failed first stop being tracked when it is reached,
+                                    for example after they were dropped from a full event buffer.
+        :type   max_tracked_events: int
+        """
+        if max_attempts is not None and max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if max_age_seconds is not None and max_age_seconds < 0:
+            raise ValueError("max_age_seconds must be at least 0")
+
+        self.max_attempts = max_attempts
+        self.max_age_seconds = max_age_seconds
+        self.dead_letter = dead_letter
+        self.max_tracked_events = max_tracked_events
+        self.lock = threading.Lock()
+        # Failed attempts and time of the first failed attempt by event key, in order of the first failure
+        self.attempts: "OrderedDict[Any, Tuple[int, float]]" = OrderedDict()
+        # Number of events expired and passed to the dead-letter sink
+        self.expired_count = 0
+
+    def expire(
+        self, events: PayloadDictList
+    ) -> Tuple[PayloadDictList, PayloadDictList]:
+        """
+        Records a failed attempt to send the events and passes the events over
+        the budget to the dead-letter sink. Returns the events to retry and the expired events.
+        If the dead-letter sink raises an exception, all the events are retried and the
+        expired events keep their failed attempts, so they expire again when they next fail.
+
+        :param  events: The failed events that should be retried
+        :type   events: PayloadDictList
+        :rtype: tuple(PayloadDictList, PayloadDictList)
+        """
+        now = time.monotonic()
+        retry: PayloadDictList = []
+        expired: PayloadDictList = []
+        with self.lock:
+            for event in events:
+                key = self._event_key(event)
+                count, first_failure = self.attempts.get(key, (0, now))
+                count += 1
+                # Expired events are only forgotten once the dead-letter sink took them
+                self.attempts[key] = (count, first_failure)
+                if (self.max_attempts is not None and count >= self.max_attempts) or (
+                    self.max_age_seconds is not None
+                    and now - first_failure >= self.max_age_seconds
+                ):
+                    expired.append(event)
+                else:
+                    retry.append(event)
+
+            while len(self.attempts) > self.max_tracked_events:
+                self.attempts.popitem(last=False)
+
+        if len(expired) == 0:
+            return retry, expired
+
+        logger.warning("Retry budget exhausted, expiring %s events." % len(expired))
+        if self.dead_letter is not None:
+            try:
+                self.dead_letter(expired)
+            except Exception:
+                logger.exception("Dead-letter sink failed, retrying expired events.")
+                return events, []
+        with self.lock:
+            for event in expired:
+                self.attempts.pop(self._event_key(event), None)
+            self.expired_count += len(expired)
+        return retry, expired
+
+    def forget(self, events: PayloadDictList) -> None:
+        """
+        Stops tracking events that were sent or will not be retried
+
+        :param  events: The events
+        :type   events: PayloadDictList
+        """
+        if not self.attempts:
+            return
+        with self.lock:
+            for event in events:
+                self.attempts.pop(self._event_key(event), None)
+
+    @staticmethod
+    def _event_key(event: PayloadDict) -> Any:
+        """
+        Returns the event ID of an event, or the identity of the object for events without one
+
+        :param  event:  The event
+        :type   event:  PayloadDict
+        :rtype: Any
+        """
+        return event.get("eid", id(event))
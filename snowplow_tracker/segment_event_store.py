@@ -0,0 +1,502 @@
+# """
+#     segment_event_store.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+import zlib
+from logging import Logger
+from typing import Dict, List, Optional, Set, Tuple
+
+from snowplow_tracker.event_store import BatchLeasingEventStore
+from snowplow_tracker.payload import SerializedPayload
+from snowplow_tracker.typing import PayloadDict, PayloadDictList
+
+# Length and CRC-32 of the record data
+RECORD_HEADER = struct.Struct("<II")
+ACK_RECORD = struct.Struct("<Q")
+SEGMENT_SUFFIX = ".segment"
+ACK_SUFFIX = ".ack"
+
+
+class Segment(object):
+    """
+    A memory-mapped segment file of event records prefixed with their length and checksum.
+    The file is allocated with its full size when created and records are
+    appended until the next one does not fit. A zero length marks the end.
+    The data of a record is written before its header, and a record that is
+    incomplete or fails its checksum when the segment is opened marks the end too.
+    The offsets of acknowledged records are appended to a sidecar ack file.
+    """
+
+    def __init__(self, directory: str, number: int, size: Optional[int]) -> None:
+        """
+        :param  directory:  The directory of the segment files
+        :type   directory:  string
+        :param  number:     The sequence number of the segment
+        :type   number:     int
+        :param  size:       The size of a new segment file, None to open an existing one
+        :type   size:       int | None
+        """
+        self.number = number
+        self.path = os.path.join(directory, "%020d%s" % (number, SEGMENT_SUFFIX))
+        self.ack_path = os.path.join(directory, "%020d%s" % (number, ACK_SUFFIX))
+
+        if size is None:
+            self.file = open(self.path, "r+b")
+        else:
+            self.file = open(self.path, "w+b")
+            self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.size = len(self.map)
+
+        # Offsets of all the records and of the acknowledged records
+        self.offsets: List[int] = []
+        self.acked: Set[int] = set()
+        self.end = 0
+        if size is None:
+            self._read_records()
+        self.ack_file = open(self.ack_path, "ab")
+
+    def append(self, data: bytes) -> int:
+        """
+        Appends a record and returns its offset
+
+        :param  data:   The encoded event
+        :type   data:   bytes
+        :rtype: int
+        """
+        offset = self.end
+        start = offset + RECORD_HEADER.size
+        self.map[start : start + len(data)] = data
+        # The header is written last, so the record only exists once its data is written
+        RECORD_HEADER.pack_into(self.map, offset, len(data), zlib.crc32(data))
+        self.end = start + len(data)
+        self.offsets.append(offset)
+        return offset
+
+    def has_room(self, data: bytes) -> bool:
+        """
+        :param  data:   The encoded event
+        :type   data:   bytes
+        :rtype: bool
+        """
+        return self.end + RECORD_HEADER.size + len(data) <= self.size
+
+    def read(self, offset: int) -> bytes:
+        """
+        Returns the encoded event of a record
+
+        :param  offset: The offset of the record
+        :type   offset: int
+        :rtype: bytes
+        """
+        length, _ = RECORD_HEADER.unpack_from(self.map, offset)
+        start = offset + RECORD_HEADER.size
+        return self.map[start : start + length]
+
+    def ack(self, offset: int) -> None:
+        """
+        Marks a record as acknowledged
+
+        :param  offset: The offset of the record
+        :type   offset: int
+        """
+        self.acked.add(offset)
+        self.ack_file.write(ACK_RECORD.pack(offset))
+
+    def is_fully_acked(self) -> bool:
+        """
+        :rtype: bool
+        """
+        return len(self.acked) == len(self.offsets)
+
+    def unacked_offsets(self) -> List[int]:
+        """
+        :rtype: list(int)
+        """
+        return [offset for offset in self.offsets if offset not in self.acked]
+
+    def flush(self) -> None:
+        """
+        Writes the appended records and acknowledgements to the files
+        """
+        self.map.flush()
+        self.ack_file.flush()
+
+    def close(self) -> None:
+        self.map.close()
+        self.file.close()
+        self.ack_file.close()
+
+    def delete(self) -> None:
+        self.close()
+        os.remove(self.path)
+        os.remove(self.ack_path)
+
+    def _read_records(self) -> None:
+        """
+        Finds the records of an existing segment file and the acknowledged ones
+        """
+        while self.end + RECORD_HEADER.size <= self.size:
+            length, checksum = RECORD_HEADER.unpack_from(self.map, self.end)
+            start = self.end + RECORD_HEADER.size
+            if length == 0 or start + length > self.size:
+                break
+            if zlib.crc32(self.map[start : start + length]) != checksum:
+                # The process or the system stopped while the record was written
+                break
+            self.offsets.append(self.end)
+            self.end = start + length
+
+        if os.path.exists(self.ack_path):
+            with open(self.ack_path, "rb") as f:
+                acks = f.read()
+            # A partially written acknowledgement is ignored and the event is sent again
+            for i in range(len(acks) // ACK_RECORD.size):
+                self.acked.add(ACK_RECORD.unpack_from(acks, i * ACK_RECORD.size)[0])
+
+
+class SegmentFileEventStore(BatchLeasingEventStore):
+    """
+    Durable EventStore that appends events to memory-mapped segment files of a fixed size.
+    Appending an event copies it into the mapped file without a system call,
+    so it sustains much higher write rates than the SQLiteEventStore.
+
+    Acknowledged events are recorded in a sidecar file next to each segment and
+    a segment is deleted once all of its events are acknowledged. Events that were
+    not acknowledged, including events in flight when the process stopped, are
+    buffered again when the store is opened. Appended events survive the process
+    stopping, but may be lost if the operating system stops before they are written
+    to disk, unless sync is called.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        directory: str,
+        segment_size: int = 16 * 1024 * 1024,
+        buffer_capacity: int = 10000,
+    ) -> None:
+        """
+        :param  logger: Logging module
+        :type   logger: Logger
+        :param  directory:  Directory of the segment files. It is created if it does not exist.
+        :type   directory:  string
+        :param  segment_size:   The size of a segment file in bytes. Default 16 MiB.
+                                An event that does not fit in a segment gets a segment of its own.
+        :type   segment_size:   int
+        :param  buffer_capacity:    The maximum number of events in the buffer.
+                                    When the buffer is full new events are lost.
+        :type   buffer_capacity:    int
+        """
+        self.logger = logger
+        self.directory = directory
+        self.segment_size = segment_size
+        self.buffer_capacity = buffer_capacity
+        self.lock = threading.Lock()
+
+        self.segments: Dict[int, Segment] = {}
+        self.active: Optional[Segment] = None
+        # Positions of the buffered events, as segment number and record offset
+        self.buffer: List[Tuple[int, int]] = []
+        # Leased payloads and their positions by batch ID and id() of the payload.
+        # Keeping the payload prevents its id from being reused while it is leased.
+        self.leases: Dict[str, Dict[int, Tuple[PayloadDict, int, int]]] = {}
+        # Events buffered again for a retry by position, so that they are not decoded again
+        self.released: Dict[Tuple[int, int], PayloadDict] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._open_segments()
+
+    def add_event(self, payload: PayloadDict) -> bool:
+        """
+        Add PayloadDict to buffer. Returns True if successful.
+
+        :param payload: The payload to add
+        :type  payload: PayloadDict
+        :rtype  bool
+        """
+        if isinstance(payload, SerializedPayload):
+            data = payload.encoded
+        else:
+            data = json.dumps(payload).encode("utf-8")
+
+        with self.lock:
+            if len(self.buffer) >= self.buffer_capacity:
+                self.logger.error("Event buffer is full, dropping event.")
+                return False
+
+            active = self.active
+            if active is None or not active.has_room(data):
+                active = self._roll_segment(RECORD_HEADER.size + len(data))
+            self.buffer.append((active.number, active.append(data)))
+            return True
+
+    def get_events_batch(self) -> PayloadDictList:
+        """
+        Leases all the events in the buffer and returns them.
+
+        :rtype  PayloadDictList
+        """
+        return self.lease_batch()[1]
+
+    def lease_batch(
+        self, batch_size: Optional[int] = None
+    ) -> Tuple[str, PayloadDictList]:
+        """
+        Leases the oldest events in the buffer. Returns the batch ID and the events.
+
+        :param  batch_size: The maximum number of events to lease. Default is all the events.
+        :type   batch_size: int | None
+        :rtype  tuple(string, PayloadDictList)
+        """
+        with self.lock:
+            if batch_size is None:
+                batch_size = len(self.buffer)
+
+            batch_id = uuid.uuid4().hex
+            lease: Dict[int, Tuple[PayloadDict, int, int]] = {}
+            batch: PayloadDictList = []
+            corrupt: List[Tuple[int, int]] = []
+            for number, offset in self.buffer[:batch_size]:
+                event = self.released.pop((number, offset), None)
+                if event is None:
+                    try:
+                        event = SerializedPayload.decode(
+                            self.segments[number].read(offset)
+                        )
+                    except ValueError:
+                        corrupt.append((number, offset))
+                        continue
+                lease[id(event)] = (event, number, offset)
+                batch.append(event)
+            del self.buffer[:batch_size]
+
+            if len(corrupt) > 0:
+                self.logger.error(
+                    "Dropping %s events that could not be decoded." % len(corrupt)
+                )
+                self._acknowledge(corrupt)
+            if len(lease) > 0:
+                self.leases[batch_id] = lease
+            return batch_id, batch
+
+    def ack(self, batch_id: str, events: Optional[PayloadDictList] = None) -> None:
+        """
+        Acknowledges events of a leased batch once they are sent or given up on
+        and deletes fully acknowledged segments.
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events to acknowledge. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        """
+        with self.lock:
+            released = self._release(batch_id, events)
+            self._acknowledge([(number, offset) for _, number, offset in released])
+
+    def nack(self, batch_id: str, events: Optional[PayloadDictList] = None) -> None:
+        """
+        Buffers events of a leased batch again so they are sent again.
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events to return. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        """
+        with self.lock:
+            self._unlease(self._release(batch_id, events))
+
+    def cleanup(self, batch: PayloadDictList, need_retry: bool) -> None:
+        """
+        Acknowledges sent events and deletes fully acknowledged segments.
+        If events need to be retried they are buffered again.
+
+        :param  batch:  The events to be removed from the buffer
+        :type   batch:  PayloadDictList
+        :param  need_retry  Whether the events should be re-sent or not
+        :type   need_retry  bool
+        """
+        new_events = []
+        with self.lock:
+            leased = []
+            for event in batch:
+                batch_id = self._batch_of(event)
+                if batch_id is None:
+                    new_events.append(event)
+                else:
+                    leased += self._release(batch_id, [event])
+
+            if need_retry:
+                self._unlease(leased)
+            else:
+                self._acknowledge([(number, offset) for _, number, offset in leased])
+
+        # Events that did not come from this store are added like the InMemoryEventStore does
+        if need_retry:
+            for event in new_events:
+                if not self.add_event(event):
+                    return
+
+    def size(self) -> int:
+        """
+        Returns the number of events in the buffer
+
+        :rtype  int
+        """
+        return len(self.buffer)
+
+    def sync(self) -> None:
+        """
+        Writes the appended events and acknowledgements to disk
+        """
+        with self.lock:
+            for segment in self.segments.values():
+                segment.flush()
+
+    def close(self) -> None:
+        """
+        Writes the appended events and acknowledgements to disk and closes the segment files
+        """
+        with self.lock:
+            for segment in self.segments.values():
+                segment.flush()
+                segment.close()
+            self.segments = {}
+            self.active = None
+
+    def _batch_of(self, event: PayloadDict) -> Optional[str]:
+        """
+        Returns the ID of the leased batch of an event
+
+        :param  event:  The event
+        :type   event:  PayloadDict
+        :rtype: string | None
+        """
+        for batch_id, lease in self.leases.items():
+            leased = lease.get(id(event))
+            if leased is not None and leased[0] is event:
+                return batch_id
+        return None
+
+    def _release(
+        self, batch_id: str, events: Optional[PayloadDictList]
+    ) -> List[Tuple[PayloadDict, int, int]]:
+        """
+        Ends the lease of events and returns the ones that were leased with their positions
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        :rtype  list(tuple(PayloadDict, int, int))
+        """
+        lease = self.leases.get(batch_id)
+        if lease is None:
+            return []
+
+        if events is None:
+            released = list(lease.values())
+            lease.clear()
+        else:
+            released = [lease.pop(id(event)) for event in events if id(event) in lease]
+        if len(lease) == 0:
+            del self.leases[batch_id]
+        return released
+
+    def _acknowledge(self, positions: List[Tuple[int, int]]) -> None:
+        """
+        Acknowledges events and deletes fully acknowledged segments
+
+        :param  positions:  The segment numbers and record offsets of the events
+        :type   positions:  list(tuple(int, int))
+        """
+        acked: Set[int] = set()
+        for number, offset in positions:
+            self.segments[number].ack(offset)
+            acked.add(number)
+
+        for number in acked:
+            segment = self.segments[number]
+            segment.ack_file.flush()
+            if segment is not self.active and segment.is_fully_acked():
+                self._delete_segment(segment)
+
+    def _unlease(self, released: List[Tuple[PayloadDict, int, int]]) -> None:
+        """
+        Buffers released events again, keeping them so that they are not decoded again
+
+        :param  released:   The events with their segment numbers and record offsets
+        :type   released:   list(tuple(PayloadDict, int, int))
+        """
+        for event, number, offset in released:
+            self.buffer.append((number, offset))
+            self.released[(number, offset)] = event
+
+    def _open_segments(self) -> None:
+        """
+        Opens the existing segments and buffers their events that were not acknowledged
+        """
+        numbers = sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+        for number in numbers:
+            path = os.path.join(self.directory, "%020d%s" % (number, SEGMENT_SUFFIX))
+            if os.path.getsize(path) == 0:
+                # The process stopped while the segment was being created
+                os.remove(path)
+                continue
+            segment = Segment(self.directory, number, None)
+            if segment.is_fully_acked() and number != numbers[-1]:
+                segment.delete()
+                continue
+            self.segments[number] = segment
+            self.buffer += [(number, offset) for offset in segment.unacked_offsets()]
+            self.active = segment
+
+        if len(self.buffer) > 0:
+            self.logger.info(
+                "Recovered %s events from segment files." % len(self.buffer)
+            )
+
+    def _roll_segment(self, min_size: int) -> Segment:
+        """
+        Starts a new active segment and deletes the previous one if all its events were acknowledged
+
+        :param  min_size:   The size needed for the next record
+        :type   min_size:   int
+        :rtype: Segment
+        """
+        previous = self.active
+        number = 0 if previous is None else previous.number + 1
+        active = Segment(self.directory, number, max(self.segment_size, min_size))
+        self.segments[number] = active
+        self.active = active
+
+        if previous is not None and previous.is_fully_acked():
+            self._delete_segment(previous)
+        return active
+
+    def _delete_segment(self, segment: Segment) -> None:
+        del self.segments[segment.number]
+        segment.delete()
@@ -15,10 +15,12 @@
 #     language governing permissions and limitations there under.
 # """
 
+import base64
+import copy
 import json
-from typing import Union
+from typing import Any, Dict, Iterable, Optional, Union
 
-from snowplow_tracker.typing import PayloadDict, PayloadDictList
+from snowplow_tracker.typing import PayloadDict, PayloadDictList, JsonEncoderFunction
 from snowplow_tracker.contracts import non_empty_string
 
 
@@ -41,3 +43,177 @@ class SelfDescribingJson(object):
 
     def to_string(self) -> str:
         return json.dumps(self.to_json())
+
+
+class FrozenSelfDescribingJson(SelfDescribingJson):
+    """
+    Immutable SelfDescribingJson for entities shared by many events.
+    The schema is validated once and the data is deep-copied when the entity is
+    created. Its JSON, JSON text and base64 encoded JSON text are built the first
+    time they are needed and reused afterwards, so an entity attached to many
+    events is only serialized once. Frozen entities are hashable and equal when
+    their schema and data are equal. The encodings are cached per json_encoder,
+    the entity's own one or else the one passed by the tracker.
+
+    data and to_json return copies of the data, changing them leaves the entity unchanged.
+    The JSON text keeps non-ASCII characters unescaped as in event payloads.
+    """
+
+    _data: Union[PayloadDict, PayloadDictList]
+    _json_encoder: Optional[JsonEncoderFunction]
+    _strings: Dict[Optional[JsonEncoderFunction], str]
+    _base64s: Dict[Optional[JsonEncoderFunction], str]
+    _envelopes: Dict[str, "FrozenSelfDescribingJson"]
+    _hash: Optional[int]
+
+    def __init__(
+        self,
+        schema: str,
+        data: Union[PayloadDict, PayloadDictList],
+        json_encoder: Optional[JsonEncoderFunction] = None,
+    ) -> None:
+        """
+        :param  schema:         The schema of the data
+        :type   schema:         string
+        :param  data:           The data, copied when the entity is created
+        :type   data:           dict(string:\\*) | list(dict(string:\\*))
+        :param  json_encoder:   Custom JSON serializer that gets called on non-serializable object.
+                                Used instead of the tracker's json_encoder if set.
+        :type   json_encoder:   function | None
+        """
+        non_empty_string(schema)
+        object.__setattr__(self, "_schema", schema)
+        object.__setattr__(self, "_data", copy.deepcopy(data))
+        object.__setattr__(self, "_json_encoder", json_encoder)
+        object.__setattr__(self, "_strings", {})
+        object.__setattr__(self, "_base64s", {})
+        object.__setattr__(self, "_envelopes", {})
+        object.__setattr__(self, "_hash", None)
+
+    @property
+    def data(self) -> Union[PayloadDict, PayloadDictList]:
+        """
+        A copy of the data
+        """
+        return copy.deepcopy(self._data)
+
+    @data.setter
+    def data(self, value: Union[PayloadDict, PayloadDictList]) -> None:
+        raise AttributeError("FrozenSelfDescribingJson is immutable")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("FrozenSelfDescribingJson is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("FrozenSelfDescribingJson is immutable")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FrozenSelfDescribingJson):
+            return NotImplemented
+        return self.schema == other.schema and self._data == other._data
+
+    def __hash__(self) -> int:
+        value = self._hash
+        if value is None:
+            value = hash((self.schema, _hashable(self._data)))
+            object.__setattr__(self, "_hash", value)
+        return value
+
+    def __copy__(self) -> "FrozenSelfDescribingJson":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "FrozenSelfDescribingJson":
+        return self
+
+    def __reduce__(self) -> Any:
+        return (FrozenSelfDescribingJson, (self.schema, self._data, self._json_encoder))
+
+    def to_json(self) -> PayloadDict:
+        return {"schema": self.schema, "data": self.data}
+
+    def to_string(self, json_encoder: Optional[JsonEncoderFunction] = None) -> str:
+        """
+        Returns the JSON text
+
+        :param  json_encoder:   The tracker's custom JSON serializer, used if the entity has none
+        :type   json_encoder:   function | None
+        :rtype:                 string
+        """
+        encoder = self._json_encoder or json_encoder
+        value = self._strings.get(encoder)
+        if value is None:
+            value = json.dumps(
+                {"schema": self.schema, "data": self._data},
+                ensure_ascii=False,
+                default=encoder,
+            )
+            self._strings[encoder] = value
+        return value
+
+    def to_base64(self, json_encoder: Optional[JsonEncoderFunction] = None) -> str:
+        """
+        Returns the URL-safe base64 encoding of the JSON text
+
+        :param  json_encoder:   The tracker's custom JSON serializer, used if the entity has none
+        :type   json_encoder:   function | None
+        :rtype:                 string
+        """
+        encoder = self._json_encoder or json_encoder
+        value = self._base64s.get(encoder)
+        if value is None:
+            text = self.to_string(encoder)
+            value = base64.urlsafe_b64encode(text.encode("utf-8")).decode("utf-8")
+            self._base64s[encoder] = value
+        return value
+
+    def envelope(self, schema: str) -> "FrozenSelfDescribingJson":
+        """
+        Returns a frozen entity of the schema wrapping this one, such as the
+        unstruct_event envelope of a self-describing event. It is created once per schema.
+
+        :param  schema: The schema of the envelope
+        :type   schema: string
+        :rtype:         FrozenSelfDescribingJson
+        """
+        wrapper = self._envelopes.get(schema)
+        if wrapper is None:
+            wrapper = FrozenSelfDescribingJson(
+                schema, {"schema": self.schema, "data": self._data}, self._json_encoder
+            )
+            self._envelopes[schema] = wrapper
+        return wrapper
+
+    @staticmethod
+    def join(
+        schema: str,
+        entities: Iterable["FrozenSelfDescribingJson"],
+        json_encoder: Optional[JsonEncoderFunction] = None,
+    ) -> str:
+        """
+        Returns the JSON text of a self-describing JSON of the schema whose data is
+        the list of entities, such as the contexts envelope of an event, from the
+        cached JSON text of the entities
+
+        :param  schema:     The schema of the envelope
+        :type   schema:     string
+        :param  entities:   The entities in the data of the envelope
+        :type   entities:   list(FrozenSelfDescribingJson)
+        :param  json_encoder:   The tracker's custom JSON serializer, used by entities without one
+        :type   json_encoder:   function | None
+        :rtype:             string
+        """
+        return '{"schema": %s, "data": [%s]}' % (
+            json.dumps(schema, ensure_ascii=False),
+            ", ".join(entity.to_string(json_encoder) for entity in entities),
+        )
+
+
+def _hashable(value: Any) -> Any:
+    """
+    Converts JSON data to an equivalent hashable value
+    """
+    if isinstance(value, dict):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    return value
@@ -82,6 +82,15 @@ class Snowplow:
             custom_retry_codes=emitter_config.custom_retry_codes,
             event_store=emitter_config.event_store,
             session=emitter_config.session,
+            max_request_bytes=emitter_config.max_request_bytes,
+            compression=emitter_config.compression,
+            compression_min_bytes=emitter_config.compression_min_bytes,
+            get_concurrency=emitter_config.get_concurrency,
+            retry_budget=emitter_config.retry_budget,
+            circuit_breaker=emitter_config.circuit_breaker,
+            retry_backoff=emitter_config.retry_backoff,
+            pool_size=emitter_config.pool_size,
+            transport=emitter_config.transport,
         )
 
         tracker = Tracker(
@@ -91,6 +100,7 @@ class Snowplow:
             subject=subject,
             encode_base64=tracker_config.encode_base64,
             json_encoder=tracker_config.json_encoder,
+            context_cache=tracker_config.context_cache,
         )
 
         return Snowplow.add_tracker(tracker)
@@ -0,0 +1,313 @@
+# """
+#     sqlite_event_store.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import json
+import sqlite3
+import threading
+import uuid
+from logging import Logger
+from typing import Dict, List, Optional, Tuple
+
+from snowplow_tracker.event_store import BatchLeasingEventStore
+from snowplow_tracker.payload import SerializedPayload
+from snowplow_tracker.typing import PayloadDict, PayloadDictList
+
+
+class SQLiteEventStore(BatchLeasingEventStore):
+    """
+    Durable EventStore that keeps the event buffer in a SQLite database,
+    so buffered and retrying events survive a restart of the process.
+
+    Events returned by lease_batch and get_events_batch are leased: they stay in the database
+    but are not returned again until ack or cleanup removes them or nack releases them for a retry.
+    Leases left by a process that stopped before cleanup are released when the store is opened,
+    so those events are sent again.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        path: str,
+        buffer_capacity: int = 10000,
+        insert_batch_size: int = 1,
+    ) -> None:
+        """
+        :param  logger: Logging module
+        :type   logger: Logger
+        :param  path:   Path of the database file. It is created if it does not exist.
+        :type   path:   string
+        :param  buffer_capacity:    The maximum number of events in the buffer.
+                                    When the buffer is full new events are lost.
+        :type   buffer_capacity:    int
+        :param  insert_batch_size:  The number of added events written to the database in one transaction.
+                                    Events waiting to be written are lost if the process stops.
+                                    They are also written when a batch is leased or close is called. Default 1.
+        :type   insert_batch_size:  int
+        """
+        self.logger = logger
+        self.path = path
+        self.buffer_capacity = buffer_capacity
+        self.insert_batch_size = insert_batch_size
+        self.lock = threading.Lock()
+        # Events added but not yet written to the database
+        self.pending: List[Tuple[bytes]] = []
+        # Leased payloads and their row ids by batch ID and id() of the payload.
+        # Keeping the payload prevents its id from being reused while it is leased.
+        self.leases: Dict[str, Dict[int, Tuple[PayloadDict, int]]] = {}
+        # Events released for a retry by row id, so that they are not decoded again
+        self.released: Dict[int, PayloadDict] = {}
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "payload BLOB NOT NULL, "
+                "leased INTEGER NOT NULL DEFAULT 0)"
+            )
+            recovered = self.connection.execute(
+                "UPDATE events SET leased = 0 WHERE leased = 1"
+            ).rowcount
+        if recovered > 0:
+            self.logger.info("Released %s events leased before a restart." % recovered)
+
+        # Number of events that are not leased, kept in memory so size() does not query the database
+        self._size: int = self.connection.execute(
+            "SELECT COUNT(*) FROM events"
+        ).fetchone()[0]
+
+    def add_event(self, payload: PayloadDict) -> bool:
+        """
+        Add PayloadDict to buffer. Returns True if successful.
+
+        :param payload: The payload to add
+        :type  payload: PayloadDict
+        :rtype  bool
+        """
+        with self.lock:
+            if self._size >= self.buffer_capacity:
+                self.logger.error("Event buffer is full, dropping event.")
+                return False
+
+            if isinstance(payload, SerializedPayload):
+                encoded = payload.encoded
+            else:
+                encoded = json.dumps(payload).encode("utf-8")
+            self.pending.append((encoded,))
+            self._size += 1
+
+            if len(self.pending) >= self.insert_batch_size:
+                self._write_pending()
+            return True
+
+    def get_events_batch(self) -> PayloadDictList:
+        """
+        Leases all the events in the buffer and returns them.
+
+        :rtype  PayloadDictList
+        """
+        return self.lease_batch()[1]
+
+    def lease_batch(
+        self, batch_size: Optional[int] = None
+    ) -> Tuple[str, PayloadDictList]:
+        """
+        Leases the oldest events in the buffer. Returns the batch ID and the events.
+
+        :param  batch_size: The maximum number of events to lease. Default is all the events.
+        :type   batch_size: int | None
+        :rtype  tuple(string, PayloadDictList)
+        """
+        with self.lock:
+            self._write_pending()
+            query = "SELECT id, payload FROM events WHERE leased = 0 ORDER BY id"
+            with self.connection:
+                if batch_size is None:
+                    rows = self.connection.execute(query).fetchall()
+                else:
+                    rows = self.connection.execute(
+                        query + " LIMIT ?", (batch_size,)
+                    ).fetchall()
+                self.connection.executemany(
+                    "UPDATE events SET leased = 1 WHERE id = ?",
+                    [(rowid,) for rowid, _ in rows],
+                )
+            self._size -= len(rows)
+
+            batch_id = uuid.uuid4().hex
+            lease: Dict[int, Tuple[PayloadDict, int]] = {}
+            batch: PayloadDictList = []
+            for rowid, encoded in rows:
+                event = self.released.pop(rowid, None)
+                if event is None:
+                    event = SerializedPayload.decode(bytes(encoded))
+                lease[id(event)] = (event, rowid)
+                batch.append(event)
+            if len(lease) > 0:
+                self.leases[batch_id] = lease
+            return batch_id, batch
+
+    def ack(self, batch_id: str, events: Optional[PayloadDictList] = None) -> None:
+        """
+        Deletes events of a leased batch from the database once they are sent or given up on.
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events to acknowledge. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        """
+        with self.lock:
+            self._delete(self._release(batch_id, events))
+
+    def nack(self, batch_id: str, events: Optional[PayloadDictList] = None) -> None:
+        """
+        Releases the lease of events of a leased batch so they are sent again.
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events to return. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        """
+        with self.lock:
+            self._unlease(self._release(batch_id, events))
+
+    def cleanup(self, batch: PayloadDictList, need_retry: bool) -> None:
+        """
+        Deletes sent events from the database. If events need to be retried their lease is released instead.
+
+        :param  batch:  The events to be removed from the buffer
+        :type   batch:  PayloadDictList
+        :param  need_retry  Whether the events should be re-sent or not
+        :type   need_retry  bool
+        """
+        new_events = []
+        with self.lock:
+            leased = []
+            for event in batch:
+                batch_id = self._batch_of(event)
+                if batch_id is None:
+                    new_events.append(event)
+                else:
+                    leased += self._release(batch_id, [event])
+
+            if need_retry:
+                self._unlease(leased)
+            else:
+                self._delete(leased)
+
+        # Events that did not come from this store are added like the InMemoryEventStore does
+        if need_retry:
+            for event in new_events:
+                if not self.add_event(event):
+                    return
+
+    def size(self) -> int:
+        """
+        Returns the number of events in the buffer
+
+        :rtype  int
+        """
+        return self._size
+
+    def close(self) -> None:
+        """
+        Writes the added events to the database and closes it
+        """
+        with self.lock:
+            self._write_pending()
+            self.connection.close()
+
+    def _batch_of(self, event: PayloadDict) -> Optional[str]:
+        """
+        Returns the ID of the leased batch of an event
+
+        :param  event:  The event
+        :type   event:  PayloadDict
+        :rtype: string | None
+        """
+        for batch_id, lease in self.leases.items():
+            leased = lease.get(id(event))
+            if leased is not None and leased[0] is event:
+                return batch_id
+        return None
+
+    def _release(
+        self, batch_id: str, events: Optional[PayloadDictList]
+    ) -> List[Tuple[PayloadDict, int]]:
+        """
+        Ends the lease of events and returns the ones that were leased with their row ids
+
+        :param  batch_id:   The ID of the leased batch
+        :type   batch_id:   string
+        :param  events: The events. Default is all the events still leased in the batch.
+        :type   events: PayloadDictList | None
+        :rtype  list(tuple(PayloadDict, int))
+        """
+        lease = self.leases.get(batch_id)
+        if lease is None:
+            return []
+
+        if events is None:
+            released = list(lease.values())
+            lease.clear()
+        else:
+            released = [lease.pop(id(event)) for event in events if id(event) in lease]
+        if len(lease) == 0:
+            del self.leases[batch_id]
+        return released
+
+    def _delete(self, released: List[Tuple[PayloadDict, int]]) -> None:
+        """
+        Deletes released events from the database
+
+        :param  released:   The events with their row ids
+        :type   released:   list(tuple(PayloadDict, int))
+        """
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM events WHERE id = ?",
+                [(rowid,) for _, rowid in released],
+            )
+
+    def _unlease(self, released: List[Tuple[PayloadDict, int]]) -> None:
+        """
+        Returns released events to the buffer, keeping them so that they are not decoded again
+
+        :param  released:   The events with their row ids
+        :type   released:   list(tuple(PayloadDict, int))
+        """
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE events SET leased = 0 WHERE id = ?",
+                [(rowid,) for _, rowid in released],
+            )
+        for event, rowid in released:
+            self.released[rowid] = event
+        self._size += len(released)
+
+    def _write_pending(self) -> None:
+        """
+        Inserts the added events in one transaction
+        """
+        if len(self.pending) > 0:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO events (payload) VALUES (?)", self.pending
+                )
+            self.pending = []
@@ -517,13 +517,14 @@ class IntegrationTest(unittest.TestCase):
         )
         t = tracker.Tracker("namespace", default_emitter, default_subject)
         with HTTMock(pass_post_response_content):
-            t.track_struct_event("Test", "A")  # 153 bytes
-            t.track_struct_event("Test", "A")  # 306 bytes
-            t.track_struct_event("Test", "A")  # 459 bytes. Send
-            t.track_struct_event("Test", "AA")  # 154
+            t.track_struct_event("Test", "A")  # 162 bytes
+            t.track_struct_event("Test", "A")  # 324 bytes
+            t.track_struct_event("Test", "A")  # 486 bytes. Send
+            t.track_struct_event("Test", "AA")  # 163
 
         self.assertEqual(len(querystrings[-1]["data"]), 3)
-        self.assertEqual(default_emitter.bytes_queued, 156 + len(_version.__version__))
+        # bytes_queued is the size of the event JSON sent to the collector
+        self.assertEqual(default_emitter.bytes_queued, 158 + len(_version.__version__))
 
     def test_unicode_get(self) -> None:
         t = tracker.Tracker(
@@ -0,0 +1,338 @@
+# """
+#     test_asyncio_emitter.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import asyncio
+import gzip
+import json
+import unittest
+import unittest.mock as mock
+from typing import Any, List
+
+from aiohttp import web
+
+from snowplow_tracker.asyncio_emitter import AsyncioEmitter
+from snowplow_tracker.emitters import CircuitBreaker, CollectorResponse
+from snowplow_tracker.tracker import Tracker
+from snowplow_tracker.events import StructuredEvent
+
+
+# helpers
+async def mocked_http_response_success(*args: Any) -> int:
+    return 200
+
+
+async def mocked_http_response_failure(*args: Any) -> int:
+    return 400
+
+
+async def mocked_http_response_failure_retry(*args: Any) -> int:
+    return 500
+
+
+class TestAsyncioEmitter(unittest.IsolatedAsyncioTestCase):
+    def test_init(self) -> None:
+        e = AsyncioEmitter("0.0.0.0")
+        self.assertEqual(
+            e.endpoint, "https://0.0.0.0/com.snowplowanalytics.snowplow/tp2"
+        )
+        self.assertEqual(e.method, "post")
+        self.assertEqual(e.batch_size, 10)
+        self.assertEqual(e.event_store.event_buffer, [])
+        self.assertIsNone(e.bytes_queued)
+        self.assertIsNone(e.session)
+
+    def test_init_get(self) -> None:
+        e = AsyncioEmitter("0.0.0.0", method="get")
+        self.assertEqual(e.endpoint, "https://0.0.0.0/i")
+        self.assertEqual(e.batch_size, 1)
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_input_no_flush(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_success
+
+        e = AsyncioEmitter("0.0.0.0", batch_size=3)
+        e.input({"a": "aa"})
+        e.input({"b": "bb"})
+        await asyncio.sleep(0)
+
+        self.assertEqual(len(e.event_store.event_buffer), 2)
+        mok_http_post.assert_not_called()
+        await e.aclose()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_input_flushes_in_background(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_success
+        mok_success = mock.Mock()
+
+        e = AsyncioEmitter("0.0.0.0", batch_size=2, on_success=mok_success)
+        e.input({"a": "aa"})
+        e.input({"b": "bb"})
+
+        # input only queues the batch, the request is made by the consumer task
+        mok_http_post.assert_not_called()
+        self.assertEqual(len(e.event_store.event_buffer), 0)
+
+        await e.flush()
+        self.assertEqual(mok_http_post.call_count, 1)
+        sent = json.loads(mok_http_post.call_args[0][0])
+        self.assertEqual(sent["data"][0]["a"], "aa")
+        self.assertEqual(sent["data"][1]["b"], "bb")
+        mok_success.assert_called_once()
+        await e.aclose()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_input_many(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_success
+
+        e = AsyncioEmitter("0.0.0.0", batch_size=2)
+        e.input_many([{"n": "v%d" % i} for i in range(5)])
+        self.assertEqual(len(e.event_store.event_buffer), 1)
+
+        await e.flush()
+        self.assertEqual(mok_http_post.call_count, 3)
+        await e.aclose()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_flush_byte_limit(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_success
+
+        e = AsyncioEmitter("0.0.0.0", batch_size=10, byte_limit=16)
+        e.input({"n0": "v0", "n1": "v1"})
+        self.assertEqual(e.bytes_queued, 0)
+
+        await e.flush()
+        self.assertEqual(mok_http_post.call_count, 1)
+        await e.aclose()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_get")
+    async def test_send_events_get_success(self, mok_http_get: Any) -> None:
+        mok_http_get.side_effect = mocked_http_response_success
+        mok_success = mock.Mock()
+        mok_failure = mock.Mock()
+
+        e = AsyncioEmitter(
+            "0.0.0.0", method="get", on_success=mok_success, on_failure=mok_failure
+        )
+        evBuffer = [{"a": "aa"}, {"b": "bb"}, {"c": "cc"}]
+        await e.send_events(evBuffer)
+
+        self.assertEqual(mok_http_get.call_count, 3)
+        mok_success.assert_called_once_with(evBuffer)
+        mok_failure.assert_not_called()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_get")
+    async def test_send_events_get_retry_per_event(self, mok_http_get: Any) -> None:
+        mok_http_get.side_effect = [503, 200, 400]
+        mok_failure = mock.Mock()
+
+        e = AsyncioEmitter(
+            "0.0.0.0", method="get", on_failure=mok_failure, get_concurrency=2
+        )
+        evBuffer = [{"a": "aa"}, {"b": "bb"}, {"c": "cc"}]
+        await e.send_events(evBuffer)
+
+        mok_failure.assert_called_once_with(1, [evBuffer[0], evBuffer[2]])
+        self.assertEqual(e.event_store.event_buffer, [evBuffer[0]])
+        await e.aclose()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_send_events_post_no_retry(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_failure
+        mok_success = mock.Mock()
+        mok_failure = mock.Mock()
+
+        e = AsyncioEmitter("0.0.0.0", on_success=mok_success, on_failure=mok_failure)
+        evBuffer = [{"a": "aa"}, {"b": "bb"}]
+        await e.send_events(evBuffer)
+
+        mok_success.assert_not_called()
+        mok_failure.assert_called_once_with(0, evBuffer)
+        self.assertEqual(e.event_store.size(), 0)
+        self.assertIsNone(e._retry_handle)
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_send_events_post_retry(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_failure_retry
+        mok_success = mock.Mock()
+        mok_failure = mock.Mock()
+
+        e = AsyncioEmitter("0.0.0.0", on_success=mok_success, on_failure=mok_failure)
+        evBuffer = [{"a": "aa"}, {"b": "bb"}]
+        await e.send_events(evBuffer)
+
+        mok_failure.assert_called_once_with(0, evBuffer)
+        self.assertEqual(e.event_store.size(), 2)
+        self.assertGreater(e.retry_delay, 0)
+        self.assertIsNotNone(e._retry_handle)
+
+        # flushing is skipped while a retry is scheduled
+        await e.flush()
+        self.assertEqual(mok_http_post.call_count, 1)
+
+        mok_http_post.side_effect = mocked_http_response_success
+        await asyncio.sleep(e.retry_delay + 0.1)
+        await e.flush()
+
+        mok_success.assert_called_with(evBuffer)
+        self.assertEqual(e.event_store.size(), 0)
+        self.assertEqual(e.retry_delay, 0)
+        await e.aclose()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_send_events_retry_after(self, mok_http_post: Any) -> None:
+        mok_http_post.return_value = CollectorResponse(503, {"Retry-After": "20"})
+
+        e = AsyncioEmitter("0.0.0.0", retry_backoff="decorrelated_jitter")
+        await e.send_events([{"a": "aa"}])
+
+        self.assertEqual(e.retry_delay, 20)
+        await e.aclose()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_send_events_post_chunked(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = [200, 503]
+
+        e = AsyncioEmitter("0.0.0.0", batch_size=2)
+        evBuffer = [{"a": "aa"}, {"b": "bb"}, {"c": "cc"}]
+        await e.send_events(evBuffer)
+        e._cancel_retry_timer()
+
+        self.assertEqual(mok_http_post.call_count, 2)
+        self.assertEqual(e.event_store.event_buffer, evBuffer[2:])
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_consumer_survives_callback_error(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_success
+        mok_success = mock.Mock(side_effect=ValueError("callback error"))
+
+        e = AsyncioEmitter("0.0.0.0", batch_size=1, on_success=mok_success)
+        e.input({"a": "aa"})
+        await e.flush()
+        e.input({"b": "bb"})
+        await e.flush()
+
+        self.assertEqual(mok_http_post.call_count, 2)
+        await e.aclose()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_send_error_returns_batch(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = RuntimeError("connection reset")
+
+        e = AsyncioEmitter("0.0.0.0", batch_size=2)
+        e.input({"a": "aa"})
+        e.input({"b": "bb"})
+        await e.flush()
+
+        self.assertEqual(e.event_store.size(), 2)
+        self.assertEqual(e.event_store.leases, {})
+
+        mok_http_post.side_effect = mocked_http_response_success
+        await e.aclose()
+        self.assertEqual(e.event_store.size(), 0)
+        sent = json.loads(mok_http_post.call_args[0][0])
+        self.assertEqual(
+            [evt.get("a", evt.get("b")) for evt in sent["data"]], ["aa", "bb"]
+        )
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_aclose_cancels_pending_flushes(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_failure_retry
+
+        e = AsyncioEmitter("0.0.0.0", batch_size=1)
+        e.input({"a": "aa"})
+        await e.flush()
+        self.assertIsNotNone(e._retry_handle)
+
+        pending = [e.flush(), e.flush()]
+        await e.aclose()
+
+        self.assertTrue(all(waiter.done() for waiter in pending))
+        self.assertEqual(e._flush_waiters, set())
+        self.assertIsNone(e._retry_handle)
+
+    @mock.patch("aiohttp.ClientSession.post")
+    async def test_circuit_breaker(self, mok_post: Any) -> None:
+        mok_post.return_value.__aenter__.return_value.status = 503
+        mok_post.return_value.__aenter__.return_value.headers = {}
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30)
+        e = AsyncioEmitter("0.0.0.0", circuit_breaker=breaker)
+        for i in range(4):
+            self.assertEqual(await e.http_post(b"{}"), 503 if i < 2 else -1)
+
+        self.assertEqual(mok_post.call_count, 2)
+        self.assertEqual(breaker.state, "open")
+        await e.aclose()
+
+    @mock.patch("snowplow_tracker.asyncio_emitter.AsyncioEmitter.http_post")
+    async def test_aclose_sends_buffered_events(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_success
+
+        async with AsyncioEmitter("0.0.0.0", batch_size=10) as e:
+            e.input({"a": "aa"})
+            mok_http_post.assert_not_called()
+
+        self.assertEqual(mok_http_post.call_count, 1)
+        self.assertIsNone(e._consumer)
+
+    @mock.patch("aiohttp.ClientSession.post")
+    async def test_http_post_compression(self, mok_post: Any) -> None:
+        mok_post.return_value.__aenter__.return_value.status = 200
+        body = json.dumps({"data": ["x" * 100] * 20}).encode("utf-8")
+
+        e = AsyncioEmitter("0.0.0.0", compression="gzip")
+        self.assertEqual(await e.http_post(body), 200)
+        kwargs = mok_post.call_args[1]
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(kwargs["data"]), body)
+
+        self.assertEqual(await e.http_post(b"{}"), 200)
+        self.assertNotIn("Content-Encoding", mok_post.call_args[1]["headers"])
+        await e.aclose()
+
+    async def test_collector_requests(self) -> None:
+        received: List[Any] = []
+
+        async def collector(request: web.Request) -> web.Response:
+            received.append(await request.json())
+            return web.Response(status=200)
+
+        app = web.Application()
+        app.router.add_post("/com.snowplowanalytics.snowplow/tp2", collector)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore
+
+        try:
+            e = AsyncioEmitter("127.0.0.1", protocol="http", port=port, batch_size=2)
+            t = Tracker("namespace", e)
+            for action in ["A", "B", "C", "D"]:
+                t.track(StructuredEvent("Test", action))
+            await e.flush()
+            session = e.session
+            await e.aclose()
+        finally:
+            await runner.cleanup()
+
+        self.assertEqual(len(received), 2)
+        self.assertEqual(
+            [evt["se_ac"] for body in received for evt in body["data"]],
+            ["A", "B", "C", "D"],
+        )
+        self.assertTrue(session is not None and session.closed)
@@ -0,0 +1,118 @@
+# """
+#     test_context_cache.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import json
+import unittest
+import unittest.mock as mock
+
+from snowplow_tracker.context_cache import ContextCache
+from snowplow_tracker.events import Event, StructuredEvent
+from snowplow_tracker.self_describing_json import SelfDescribingJson
+from snowplow_tracker.tracker import Tracker
+
+USER_SCHEMA = "iglu:com.acme/user/jsonschema/1-0-0"
+
+
+class TestContextCache(unittest.TestCase):
+    def test_reuse_encoded_envelope(self) -> None:
+        cache = ContextCache()
+        contexts = [SelfDescribingJson(USER_SCHEMA, {"id": "u1"})]
+
+        first = cache.encode(contexts, False)
+        second = cache.encode(contexts, False)
+
+        self.assertIs(first, second)
+        self.assertEqual(
+            json.loads(first["co"])["data"],
+            [{"schema": USER_SCHEMA, "data": {"id": "u1"}}],
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_mutated_context(self) -> None:
+        cache = ContextCache()
+        data = {"id": "u1", "roles": ["admin"]}
+        context = SelfDescribingJson(USER_SCHEMA, data)
+        cache.encode([context], False)
+
+        data["roles"].append("editor")
+        pairs = cache.encode([context], False)
+        self.assertEqual(
+            json.loads(pairs["co"])["data"][0]["data"]["roles"], ["admin", "editor"]
+        )
+
+        context.schema = "iglu:com.acme/user/jsonschema/1-0-1"
+        pairs = cache.encode([context], False)
+        self.assertEqual(
+            json.loads(pairs["co"])["data"][0]["schema"],
+            "iglu:com.acme/user/jsonschema/1-0-1",
+        )
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertEqual(cache.size(), 1)
+
+    def test_keys(self) -> None:
+        cache = ContextCache()
+        first = SelfDescribingJson(USER_SCHEMA, {"id": "u1"})
+        second = SelfDescribingJson(USER_SCHEMA, {"id": "u1"})
+
+        self.assertIn("cx", cache.encode([first], True))
+        self.assertIn("co", cache.encode([first], False))
+        cache.encode([second], True)
+        cache.encode([first, second], True)
+        cache.encode([second, first], True)
+
+        self.assertEqual((cache.hits, cache.misses), (0, 5))
+        self.assertEqual(cache.size(), 5)
+
+    def test_lru_eviction(self) -> None:
+        cache = ContextCache(max_size=2)
+        contexts = [[SelfDescribingJson(USER_SCHEMA, {"id": i})] for i in range(3)]
+
+        cache.encode(contexts[0], True)
+        cache.encode(contexts[1], True)
+        cache.encode(contexts[0], True)
+        cache.encode(contexts[2], True)
+        self.assertEqual(cache.size(), 2)
+
+        cache.encode(contexts[0], True)
+        cache.encode(contexts[1], True)
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+        cache.clear()
+        self.assertEqual((cache.size(), cache.hits, cache.misses), (0, 0, 0))
+
+    def test_invalid_max_size(self) -> None:
+        with self.assertRaises(ValueError):
+            ContextCache(max_size=0)
+
+    def test_tracker(self) -> None:
+        contexts = [
+            SelfDescribingJson(USER_SCHEMA, {"id": "u1"}),
+            SelfDescribingJson("iglu:com.acme/page/jsonschema/1-0-0", {"n": 1}),
+        ]
+        cache = ContextCache()
+        emitter = mock.Mock()
+        tracker = Tracker("namespace", emitter, context_cache=cache)
+
+        tracker.track(StructuredEvent(category="c", action="a", context=contexts))
+        tracker.track(StructuredEvent(category="c", action="b", context=contexts))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        expected = Event(context=contexts).build_payload(
+            encode_base64=True, json_encoder=None
+        )
+        for call in emitter.input.call_args_list:
+            self.assertEqual(call[0][0]["cx"], expected.nv_pairs["cx"])
@@ -15,14 +15,39 @@
 #     language governing permissions and limitations there under.
 # """
 
+import os
+import gzip
+import zlib
+import logging
+import json
 import time
+import tempfile
+import threading
 import unittest
 import unittest.mock as mock
 from freezegun import freeze_time
-from typing import Any
+from typing import Any, List
+import requests
 from requests import ConnectTimeout
 
-from snowplow_tracker.emitters import Emitter, AsyncEmitter, DEFAULT_MAX_LENGTH
+from snowplow_tracker.emitters import (
+    BaseEmitter,
+    Emitter,
+    AsyncEmitter,
+    ConcurrencyLimiter,
+    CircuitBreaker,
+    CollectorResponse,
+    DEFAULT_MAX_LENGTH,
+    PAYLOAD_DATA_SCHEMA,
+)
+from snowplow_tracker.self_describing_json import SelfDescribingJson
+from snowplow_tracker.payload import SerializedPayload
+from snowplow_tracker.event_store import InMemoryEventStore
+from snowplow_tracker.transports import (
+    KeepAliveHTTPAdapter,
+    RequestsTransport,
+    SOCKET_OPTIONS,
+)
 
 
 # helpers
@@ -54,6 +79,22 @@ def mocked_http_response_failure_retry(*args: Any) -> int:
     return 500
 
 
+class BlockingSender:
+    """
+    Stand-in for send_events which blocks the worker thread until released
+    """
+
+    def __init__(self) -> None:
+        self.in_flight = threading.Event()
+        self.release = threading.Event()
+        self.sent: List[Any] = []
+
+    def __call__(self, evts: Any, batch_id: Any = None) -> None:
+        self.sent.append(evts)
+        self.in_flight.set()
+        self.release.wait(5)
+
+
 class TestEmitters(unittest.TestCase):
     def setUp(self) -> None:
         pass
@@ -135,7 +176,7 @@ class TestEmitters(unittest.TestCase):
     def test_input_flush_byte_limit(self, mok_flush: Any) -> None:
         mok_flush.side_effect = mocked_flush
 
-        e = Emitter("0.0.0.0", method="get", batch_size=2, byte_limit=16)
+        e = Emitter("0.0.0.0", method="get", batch_size=2, byte_limit=11)
         nvPairs = {"n0": "v0", "n1": "v1"}
         e.input(nvPairs)
 
@@ -163,6 +204,21 @@ class TestEmitters(unittest.TestCase):
         self.assertTrue(e.reached_limit())
         self.assertEqual(mok_flush.call_count, 1)
 
+    @mock.patch("snowplow_tracker.Emitter.flush")
+    def test_input_many(self, mok_flush: Any) -> None:
+        e = Emitter("0.0.0.0", batch_size=2)
+        batches: List[List[Any]] = []
+        mok_flush.side_effect = lambda: batches.append(e.event_store.get_events_batch())
+        e.lock = mock.MagicMock(wraps=e.lock)
+
+        e.input_many([{"n": "v%d" % i} for i in range(5)])
+
+        # the lock is taken once for each chunk until the buffer is full
+        self.assertEqual(e.lock.__enter__.call_count, 3)
+        self.assertEqual(mok_flush.call_count, 2)
+        self.assertEqual(batches[1], [{"n": "v2"}, {"n": "v3"}])
+        self.assertEqual(e.event_store.get_events_batch(), [{"n": "v4"}])
+
     @mock.patch("snowplow_tracker.Emitter.flush")
     def test_input_bytes_queued(self, mok_flush: Any) -> None:
         mok_flush.side_effect = mocked_flush
@@ -172,10 +228,89 @@ class TestEmitters(unittest.TestCase):
         e.input(nvPairs)
 
         self.assertEqual(len(e.event_store.event_buffer), 1)
-        self.assertEqual(e.bytes_queued, 24)
+        # size of the query string "n0=v0&n1=v1"
+        self.assertEqual(e.bytes_queued, 11)
 
         e.input(nvPairs)
-        self.assertEqual(e.bytes_queued, 48)
+        self.assertEqual(e.bytes_queued, 22)
+
+    @mock.patch("snowplow_tracker.Emitter.flush")
+    def test_input_bytes_queued_post(self, mok_flush: Any) -> None:
+        mok_flush.side_effect = mocked_flush
+
+        e = Emitter("0.0.0.0", batch_size=10, byte_limit=1024)
+        nvPairs = {"unicode": "\u0107", "num": 2.72}
+        e.input(nvPairs)
+
+        wire_json = json.dumps({"unicode": "\u0107", "num": "2.72"})
+        self.assertEqual(e.bytes_queued, len(wire_json.encode("utf-8")))
+        self.assertEqual(
+            e.event_store.event_buffer[0].encoded, wire_json.encode("utf-8")
+        )
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_send_events_post_reuses_serialized_events(
+        self, mok_http_post: Any
+    ) -> None:
+        mok_http_post.side_effect = mocked_http_response_success
+
+        e = Emitter("0.0.0.0", batch_size=10)
+        e.input({"a": "aa"})
+        e.input({"b": "bb"})
+        with mock.patch(
+            "snowplow_tracker.emitters.json.dumps", wraps=json.dumps
+        ) as mok_dumps:
+            e.flush()
+            mok_dumps.assert_called()
+            # only the sent timestamps are serialized when sending
+            for call in mok_dumps.call_args_list:
+                self.assertIsInstance(call[0][0], str)
+
+        sent = json.loads(mok_http_post.call_args[0][0])
+        self.assertEqual(sent["schema"], PAYLOAD_DATA_SCHEMA)
+        self.assertEqual(sent["data"][0]["a"], "aa")
+        self.assertEqual(sent["data"][1]["b"], "bb")
+        self.assertIn("stm", sent["data"][1])
+
+    def test_serialize_event(self) -> None:
+        evt = SerializedPayload({"a": "aa"})
+        self.assertEqual(Emitter.serialize_event(evt), b'{"a": "aa"}')
+
+        Emitter.attach_sent_timestamp([evt])
+        self.assertEqual(json.loads(Emitter.serialize_event(evt)), evt)
+
+        empty = SerializedPayload()
+        Emitter.attach_sent_timestamp([empty])
+        self.assertEqual(json.loads(Emitter.serialize_event(empty)), empty)
+
+        self.assertEqual(Emitter.serialize_event({"b": "bb"}), b'{"b": "bb"}')
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_send_events_post_retry_reuses_serialized_events(
+        self, mok_http_post: Any
+    ) -> None:
+        mok_http_post.side_effect = [503, 200]
+        mok_success = mock.Mock()
+
+        e = Emitter("0.0.0.0", batch_size=10, on_success=mok_success)
+        e.input({"a": "aa"})
+        e.input({"b": "bb"})
+        buffered = e.event_store.event_buffer
+
+        e.flush()
+        e.retry_timer.cancel()
+        for retried, evt in zip(e.event_store.event_buffer, buffered):
+            self.assertIs(retried, evt)
+
+        with mock.patch("snowplow_tracker.payload.json.loads") as mok_loads:
+            e.flush()
+        mok_loads.assert_not_called()
+        sent = json.loads(mok_http_post.call_args[0][0])
+        self.assertEqual(sent["data"][0]["a"], "aa")
+        self.assertEqual(sent["data"][1]["b"], "bb")
+        self.assertIn("stm", sent["data"][1])
+        self.assertEqual(mok_success.call_args[0][0][1]["b"], "bb")
+        self.assertEqual(e.event_store.size(), 0)
 
     @mock.patch("snowplow_tracker.Emitter.flush")
     def test_input_bytes_post(self, mok_flush: Any) -> None:
@@ -214,6 +349,95 @@ class TestEmitters(unittest.TestCase):
         self.assertEqual(len(e.event_store.event_buffer), 0)
         self.assertEqual(e.bytes_queued, 0)
 
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_input_not_blocked_by_flush(self, mok_http_post: Any) -> None:
+        in_flight = threading.Event()
+        release = threading.Event()
+
+        def slow_collector(*args: Any) -> int:
+            in_flight.set()
+            release.wait(5)
+            return 200
+
+        mok_http_post.side_effect = slow_collector
+
+        e = Emitter("0.0.0.0", batch_size=100)
+        e.input({"a": "aa"})
+        flush_thread = threading.Thread(target=e.flush)
+        flush_thread.start()
+        self.assertTrue(in_flight.wait(5))
+
+        latencies = []
+        for i in range(20):
+            start = time.time()
+            e.input({"b": str(i)})
+            latencies.append(time.time() - start)
+
+        self.assertTrue(flush_thread.is_alive())
+        self.assertLess(max(latencies), 0.5)
+        self.assertEqual(e.event_store.size(), 20)
+
+        release.set()
+        flush_thread.join()
+        self.assertEqual(mok_http_post.call_count, 1)
+        self.assertEqual(e.event_store.size(), 20)
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_flush_failure_keeps_events_added_during_flush(
+        self, mok_http_post: Any
+    ) -> None:
+        in_flight = threading.Event()
+        release = threading.Event()
+
+        def failing_collector(*args: Any) -> int:
+            in_flight.set()
+            release.wait(5)
+            return 500
+
+        mok_http_post.side_effect = failing_collector
+
+        e = Emitter("0.0.0.0", batch_size=100)
+        e.input({"a": "aa"})
+        flush_thread = threading.Thread(target=e.flush)
+        flush_thread.start()
+        self.assertTrue(in_flight.wait(5))
+
+        e.input({"b": "bb"})
+        release.set()
+        flush_thread.join()
+        e._cancel_retry_timer()
+
+        self.assertEqual(e.event_store.size(), 2)
+        self.assertIn({"a": "aa", "stm": mock.ANY}, e.event_store.event_buffer)
+        self.assertIn({"b": "bb"}, e.event_store.event_buffer)
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_flush_error_returns_leased_events(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = RuntimeError("connection reset")
+
+        e = Emitter("0.0.0.0", batch_size=100)
+        e.input({"a": "aa"})
+        e.input({"b": "bb"})
+        with self.assertRaises(RuntimeError):
+            e.flush()
+
+        self.assertEqual(e.event_store.size(), 2)
+        self.assertEqual(e.event_store.leases, {})
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_flush_callback_error_acks_sent_events(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_success
+        mok_success = mock.Mock(side_effect=ValueError("callback failed"))
+
+        e = Emitter("0.0.0.0", batch_size=100, on_success=mok_success)
+        e.input({"a": "aa"})
+        with self.assertRaises(ValueError):
+            e.flush()
+
+        mok_success.assert_called_once()
+        self.assertEqual(e.event_store.size(), 0)
+        self.assertEqual(e.event_store.leases, {})
+
     @freeze_time("2021-04-14 00:00:02")  # unix: 1618358402000
     def test_attach_sent_tstamp(self) -> None:
         e = Emitter("0.0.0.0")
@@ -277,6 +501,49 @@ class TestEmitters(unittest.TestCase):
         mok_success.assert_not_called()
         mok_failure.assert_called_once_with(0, evBuffer)
 
+    @mock.patch("snowplow_tracker.Emitter.http_get")
+    def test_send_events_get_retry_per_event(self, mok_http_get: Any) -> None:
+        mok_http_get.side_effect = [503, 200, 400]
+        mok_failure = mock.Mock()
+
+        e = Emitter("0.0.0.0", method="get", batch_size=10, on_failure=mok_failure)
+        evBuffer = [{"a": "aa"}, {"b": "bb"}, {"c": "cc"}]
+        e.send_events(evBuffer)
+        e._cancel_retry_timer()
+
+        mok_failure.assert_called_once_with(1, [evBuffer[0], evBuffer[2]])
+        # only the event which failed with a retryable status code is retried
+        self.assertEqual(e.event_store.event_buffer, [evBuffer[0]])
+
+    @mock.patch("snowplow_tracker.Emitter.http_get")
+    def test_send_events_get_concurrency(self, mok_http_get: Any) -> None:
+        barrier = threading.Barrier(3, timeout=5)
+
+        def collector(payload: Any) -> int:
+            # fails unless the three requests are in flight at the same time
+            barrier.wait()
+            return 200
+
+        mok_http_get.side_effect = collector
+        mok_success = mock.Mock()
+
+        e = Emitter(
+            "0.0.0.0",
+            method="get",
+            batch_size=10,
+            on_success=mok_success,
+            get_concurrency=3,
+        )
+        evBuffer = [{"a": "aa"}, {"b": "bb"}, {"c": "cc"}]
+        e.send_events(evBuffer)
+
+        mok_success.assert_called_once_with(evBuffer)
+        self.assertIsInstance(e.transport, RequestsTransport)
+
+    def test_get_concurrency_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            Emitter("0.0.0.0", method="get", get_concurrency=0)
+
     @mock.patch("snowplow_tracker.Emitter.http_post")
     def test_send_events_post_success(self, mok_http_post: Any) -> None:
         mok_http_post.side_effect = mocked_http_response_success
@@ -307,7 +574,70 @@ class TestEmitters(unittest.TestCase):
         mok_success.assert_not_called()
         mok_failure.assert_called_with(0, evBuffer)
 
-    @mock.patch("snowplow_tracker.emitters.requests.post")
+    def test_split_post_batches_batch_size(self) -> None:
+        evts = [{"n": str(i)} for i in range(5)]
+        batches = Emitter.split_post_batches(evts, 2, None)
+
+        self.assertEqual(
+            [batch for batch, _ in batches], [evts[0:2], evts[2:4], evts[4:]]
+        )
+        for batch, data in batches:
+            self.assertEqual(
+                data,
+                SelfDescribingJson(PAYLOAD_DATA_SCHEMA, batch).to_string().encode(),
+            )
+
+    def test_split_post_batches_max_request_bytes(self) -> None:
+        evts = [{"n": str(i)} for i in range(5)]
+        two_events = len(SelfDescribingJson(PAYLOAD_DATA_SCHEMA, evts[:2]).to_string())
+        batches = Emitter.split_post_batches(evts, 10, two_events)
+
+        self.assertEqual([len(batch) for batch, _ in batches], [2, 2, 1])
+        for batch, data in batches:
+            self.assertLessEqual(len(data), two_events)
+
+    def test_split_post_batches_oversized_event(self) -> None:
+        evts = [{"n": "0"}, {"n": "x" * 500}, {"n": "2"}]
+        batches = Emitter.split_post_batches(evts, 10, 200)
+
+        self.assertEqual(
+            [batch for batch, _ in batches], [[evts[0]], [evts[1]], [evts[2]]]
+        )
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_send_events_post_chunked(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_success
+        mok_success = mock.Mock(return_value="success mocked")
+
+        e = Emitter("0.0.0.0", batch_size=2, on_success=mok_success)
+        evBuffer = [{"a": "aa"}, {"b": "bb"}, {"c": "cc"}, {"d": "dd"}, {"e": "ee"}]
+        e.send_events(evBuffer)
+
+        self.assertEqual(mok_http_post.call_count, 3)
+        sizes = [len(json.loads(c[0][0])["data"]) for c in mok_http_post.call_args_list]
+        self.assertEqual(sizes, [2, 2, 1])
+        mok_success.assert_called_once_with(evBuffer)
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_send_events_post_retry_failed_chunks(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = [200, 500, 400]
+        mok_success = mock.Mock(return_value="success mocked")
+        mok_failure = mock.Mock(return_value="failure mocked")
+
+        e = Emitter(
+            "0.0.0.0", batch_size=2, on_success=mok_success, on_failure=mok_failure
+        )
+        evBuffer = [{"a": "aa"}, {"b": "bb"}, {"c": "cc"}, {"d": "dd"}, {"e": "ee"}]
+        e.send_events(evBuffer)
+        e._cancel_retry_timer()
+
+        mok_success.assert_called_once_with(evBuffer[0:2])
+        mok_failure.assert_called_once_with(2, evBuffer[2:])
+        # only the chunk which failed with a retryable status code is retried
+        self.assertEqual(e.event_store.event_buffer, evBuffer[2:4])
+        self.assertGreater(e.retry_delay, 0)
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
     def test_http_post_connect_timeout_error(self, mok_post_request: Any) -> None:
         mok_post_request.side_effect = ConnectTimeout
         e = Emitter("0.0.0.0")
@@ -316,7 +646,101 @@ class TestEmitters(unittest.TestCase):
 
         self.assertFalse(post_succeeded)
 
-    @mock.patch("snowplow_tracker.emitters.requests.post")
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_http_post_compression(self, mok_post_request: Any) -> None:
+        mok_post_request.return_value = mock.Mock(status_code=200)
+        body = json.dumps({"data": ["x" * 100] * 20}).encode("utf-8")
+
+        e = Emitter("0.0.0.0", compression="gzip")
+        e.http_post(body)
+        kwargs = mok_post_request.call_args[1]
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(kwargs["data"]), body)
+        self.assertLess(len(kwargs["data"]), len(body))
+
+        e = Emitter("0.0.0.0", compression="deflate")
+        e.http_post(body.decode("utf-8"))
+        kwargs = mok_post_request.call_args[1]
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "deflate")
+        self.assertEqual(zlib.decompress(kwargs["data"]), body)
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_http_post_compression_min_bytes(self, mok_post_request: Any) -> None:
+        mok_post_request.return_value = mock.Mock(status_code=200)
+
+        e = Emitter("0.0.0.0", compression="gzip", compression_min_bytes=100)
+        e.http_post(b"x" * 99)
+        kwargs = mok_post_request.call_args[1]
+        self.assertNotIn("Content-Encoding", kwargs["headers"])
+        self.assertEqual(kwargs["data"], b"x" * 99)
+
+        e.http_post(b"x" * 100)
+        kwargs = mok_post_request.call_args[1]
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "gzip")
+
+    def test_default_session(self) -> None:
+        e = Emitter("0.0.0.0")
+        session = e.transport.session
+        self.assertIsInstance(session, requests.Session)
+        adapter = session.get_adapter("https://0.0.0.0")
+        self.assertIsInstance(adapter, KeepAliveHTTPAdapter)
+        self.assertEqual(adapter._pool_maxsize, 1)
+        self.assertEqual(
+            adapter.poolmanager.connection_pool_kw["socket_options"], SOCKET_OPTIONS
+        )
+
+        e = Emitter("0.0.0.0", method="get", get_concurrency=4, pool_size=2)
+        session = e.transport.session
+        self.assertEqual(session.get_adapter("http://0.0.0.0")._pool_maxsize, 4)
+
+        ae = AsyncEmitter("0.0.0.0", thread_count=3)
+        session = ae.transport.session
+        self.assertEqual(session.get_adapter("http://0.0.0.0")._pool_maxsize, 3)
+
+        custom = requests.Session()
+        e = Emitter("0.0.0.0", session=custom)
+        self.assertIs(e.transport.session, custom)
+
+    def test_base_emitter_requires_retry_timer(self) -> None:
+        class NoRetryTimerEmitter(BaseEmitter):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoRetryTimerEmitter("0.0.0.0")  # type: ignore
+
+    @mock.patch("snowplow_tracker.transports.RequestsTransport.close")
+    def test_close_created_transport(self, mok_close: Any) -> None:
+        Emitter("0.0.0.0").close()
+        mok_close.assert_called_once_with()
+
+        # a transport or session passed to the emitter is left open
+        Emitter("0.0.0.0", session=requests.Session()).close()
+        mok_close.assert_called_once_with()
+        transport = mock.Mock()
+        Emitter("0.0.0.0", transport=transport).close()
+        transport.close.assert_not_called()
+
+    @mock.patch("snowplow_tracker.Emitter.http_get")
+    def test_close_stops_get_executor(self, mok_http_get: Any) -> None:
+        mok_http_get.side_effect = mocked_http_response_success
+
+        e = Emitter("0.0.0.0", method="get", batch_size=3, get_concurrency=2)
+        e.input({"a": "aa"})
+        e.input({"b": "bb"})
+        e.flush()
+        executor = e.get_executor
+        self.assertIsNotNone(executor)
+
+        e.close()
+        self.assertIsNone(e.get_executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)  # type: ignore
+
+    def test_compression_not_supported(self) -> None:
+        with self.assertRaises(ValueError):
+            Emitter("0.0.0.0", compression="br")  # type: ignore
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.get")
     def test_http_get_connect_timeout_error(self, mok_post_request: Any) -> None:
         mok_post_request.side_effect = ConnectTimeout
         e = Emitter("0.0.0.0", method="get")
@@ -438,6 +862,373 @@ class TestEmitters(unittest.TestCase):
         mok_success.assert_not_called()
         mok_failure.assert_called_with(0, evBuffer)
 
+    @mock.patch("snowplow_tracker.AsyncEmitter.send_events")
+    def test_async_emitter_drop_newest(self, mok_send_events: Any) -> None:
+        sender = BlockingSender()
+        mok_send_events.side_effect = sender
+
+        ae = AsyncEmitter(
+            "0.0.0.0",
+            batch_size=1,
+            max_queue_size=1,
+            queue_overflow_policy="drop_newest",
+        )
+        ae.input({"a": "aa"})
+        self.assertTrue(sender.in_flight.wait(5))
+        ae.input({"b": "bb"})
+        ae.input({"c": "cc"})
+
+        self.assertEqual(ae.overflow_stats["drop_newest"], {"batches": 1, "events": 1})
+        sender.release.set()
+        ae.sync_flush()
+        self.assertEqual(sender.sent, [[{"a": "aa"}], [{"b": "bb"}]])
+
+    @mock.patch("snowplow_tracker.AsyncEmitter.send_events")
+    def test_async_emitter_drop_oldest(self, mok_send_events: Any) -> None:
+        sender = BlockingSender()
+        mok_send_events.side_effect = sender
+
+        ae = AsyncEmitter(
+            "0.0.0.0",
+            batch_size=1,
+            max_queue_size=1,
+            queue_overflow_policy="drop_oldest",
+        )
+        ae.input({"a": "aa"})
+        self.assertTrue(sender.in_flight.wait(5))
+        ae.input({"b": "bb"})
+        ae.input({"c": "cc"})
+
+        self.assertEqual(ae.overflow_stats["drop_oldest"], {"batches": 1, "events": 1})
+        sender.release.set()
+        ae.sync_flush()
+        self.assertEqual(sender.sent, [[{"a": "aa"}], [{"c": "cc"}]])
+
+    @mock.patch("snowplow_tracker.AsyncEmitter.send_events")
+    def test_async_emitter_block(self, mok_send_events: Any) -> None:
+        sender = BlockingSender()
+        mok_send_events.side_effect = sender
+
+        ae = AsyncEmitter("0.0.0.0", batch_size=1, max_queue_size=1)
+        ae.input({"a": "aa"})
+        self.assertTrue(sender.in_flight.wait(5))
+        ae.input({"b": "bb"})
+
+        producer = threading.Thread(target=ae.input, args=[{"c": "cc"}])
+        producer.start()
+        producer.join(0.5)
+        self.assertTrue(producer.is_alive())
+        self.assertEqual(ae.overflow_stats["block"], {"batches": 1, "events": 1})
+
+        sender.release.set()
+        producer.join(5)
+        ae.sync_flush()
+        self.assertEqual(sender.sent, [[{"a": "aa"}], [{"b": "bb"}], [{"c": "cc"}]])
+
+    @mock.patch("snowplow_tracker.AsyncEmitter.send_events")
+    def test_async_emitter_spill(self, mok_send_events: Any) -> None:
+        sender = BlockingSender()
+        mok_send_events.side_effect = sender
+
+        with tempfile.TemporaryDirectory() as spill_directory:
+            ae = AsyncEmitter(
+                "0.0.0.0",
+                batch_size=1,
+                max_queue_size=1,
+                queue_overflow_policy="spill",
+                spill_directory=spill_directory,
+            )
+            ae.input({"a": "aa"})
+            self.assertTrue(sender.in_flight.wait(5))
+            ae.input({"b": "bb"})
+            ae.input({"c": "cc"})
+            ae.input({"d": "dd"})
+
+            self.assertEqual(ae.overflow_stats["spill"], {"batches": 2, "events": 2})
+            self.assertEqual(len(os.listdir(spill_directory)), 2)
+
+            sender.release.set()
+            ae.sync_flush()
+            self.assertEqual(
+                sender.sent,
+                [[{"a": "aa"}], [{"b": "bb"}], [{"c": "cc"}], [{"d": "dd"}]],
+            )
+            self.assertEqual(os.listdir(spill_directory), [])
+
+    def test_async_emitter_spill_requires_directory(self) -> None:
+        with self.assertRaises(ValueError):
+            AsyncEmitter("0.0.0.0", max_queue_size=1, queue_overflow_policy="spill")
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_async_emitter_max_in_flight(self, mok_http_post: Any) -> None:
+        lock = threading.Lock()
+        release = threading.Event()
+        in_flight = [0]
+        peak = [0]
+
+        def slow_collector(*args: Any) -> int:
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            release.wait(5)
+            with lock:
+                in_flight[0] -= 1
+            return 200
+
+        mok_http_post.side_effect = slow_collector
+
+        ae = AsyncEmitter("0.0.0.0", batch_size=1, thread_count=4, max_in_flight=2)
+        for i in range(6):
+            ae.input({"n": str(i)})
+        time.sleep(0.5)
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(ae.get_limiter(ae.endpoint).in_flight, 2)
+
+        release.set()
+        ae.sync_flush()
+        self.assertEqual(mok_http_post.call_count, 6)
+        self.assertEqual(ae.get_limiter(ae.endpoint).in_flight, 0)
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_async_emitter_adaptive_concurrency(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_response_failure_retry
+
+        ae = AsyncEmitter(
+            "0.0.0.0", batch_size=1, max_in_flight=8, adaptive_concurrency=True
+        )
+        ae.http_post("data")
+        ae.http_post("data")
+        self.assertEqual(ae.get_limiter(ae.endpoint).limit, 2)
+
+        mok_http_post.side_effect = mocked_http_response_success
+        ae.http_post("data")
+        self.assertEqual(ae.get_limiter(ae.endpoint).limit, 3)
+
+    @mock.patch("snowplow_tracker.transports.RequestsTransport.post")
+    def test_async_emitter_open_circuit_breaker_keeps_limit(
+        self, mok_post_request: Any
+    ) -> None:
+        mok_post_request.return_value = CollectorResponse(503)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30)
+
+        ae = AsyncEmitter(
+            "0.0.0.0",
+            max_in_flight=8,
+            adaptive_concurrency=True,
+            circuit_breaker=breaker,
+        )
+        self.assertEqual(ae.http_post("data"), 503)
+        self.assertEqual(ae.get_limiter(ae.endpoint).limit, 4)
+
+        for i in range(5):
+            self.assertEqual(ae.http_post("data"), -1)
+        self.assertEqual(mok_post_request.call_count, 1)
+        self.assertEqual(ae.get_limiter(ae.endpoint).limit, 4)
+
+    def test_async_emitter_max_in_flight_get_concurrency(self) -> None:
+        ae = AsyncEmitter("0.0.0.0", method="get", get_concurrency=4)
+        self.assertEqual(ae.max_in_flight, 4)
+        ae = AsyncEmitter("0.0.0.0", method="get", get_concurrency=4, max_in_flight=2)
+        self.assertEqual(ae.max_in_flight, 2)
+
+    def test_concurrency_limiter_fixed(self) -> None:
+        limiter = ConcurrencyLimiter(max_limit=4)
+        limiter.acquire()
+        limiter.release(500, 0.1)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_concurrency_limiter_adaptive(self) -> None:
+        limiter = ConcurrencyLimiter(
+            max_limit=4, adaptive=True, latency_threshold_seconds=1.0
+        )
+        for status_code in [503, -1, 429]:
+            limiter.acquire()
+            limiter.release(status_code, 0.1)
+        self.assertEqual(limiter.limit, 1)
+
+        # slow successes and client errors leave the limit unchanged
+        limiter.acquire()
+        limiter.release(200, 2.0)
+        limiter.acquire()
+        limiter.release(400, 0.1)
+        self.assertEqual(limiter.limit, 1)
+
+        for i in range(5):
+            limiter.acquire()
+            limiter.release(200, 0.1)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_concurrency_limiter_blocks(self) -> None:
+        limiter = ConcurrencyLimiter(max_limit=1)
+        limiter.acquire()
+        waiter = threading.Thread(target=limiter.acquire)
+        waiter.start()
+        waiter.join(0.2)
+        self.assertTrue(waiter.is_alive())
+
+        limiter.release(200, 0.1)
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(limiter.in_flight, 1)
+
+    def test_circuit_breaker_opens_and_closes(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=0.05)
+        breaker.record(503, 0.1)
+        breaker.record(200, 0.1)
+        breaker.record(-1, 0.1)
+        self.assertEqual(breaker.state, "closed")
+
+        breaker.record(429, 0.1)
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow_request())
+        self.assertGreater(breaker.time_until_half_open(), 0)
+
+        time.sleep(0.06)
+        # a single probe request is let through
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, "half_open")
+        self.assertFalse(breaker.allow_request())
+
+        breaker.record(200, 0.1)
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow_request())
+
+    def test_circuit_breaker_failed_probe(self) -> None:
+        breaker = CircuitBreaker(
+            failure_threshold=1,
+            reset_timeout_seconds=0.05,
+            max_reset_timeout_seconds=0.08,
+            slow_request_seconds=1.0,
+        )
+        # slow requests count as failed
+        breaker.record(200, 2.0)
+        self.assertEqual(breaker.state, "open")
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        breaker.record(500, 0.1)
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(breaker.reset_timeout_seconds, 0.08)
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_circuit_breaker_stops_requests(self, mok_post_request: Any) -> None:
+        mok_post_request.side_effect = ConnectTimeout
+        e = Emitter(
+            "0.0.0.0",
+            batch_size=10,
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=1, reset_timeout_seconds=30
+            ),
+        )
+        e.input({"a": "aa"})
+        e.flush()
+        e._cancel_retry_timer()
+        self.assertEqual(mok_post_request.call_count, 1)
+        # the retry is scheduled when the breaker lets a probe request through
+        self.assertGreater(e.retry_delay, 29)
+
+        e.flush()
+        e._cancel_retry_timer()
+        self.assertEqual(mok_post_request.call_count, 1)
+        self.assertEqual(e.event_store.size(), 1)
+
+    def test_collector_response_retry_after(self) -> None:
+        self.assertEqual(CollectorResponse.parse_retry_after("120"), 120.0)
+        self.assertIsNone(CollectorResponse.parse_retry_after("soon"))
+        self.assertIsNone(CollectorResponse.parse_retry_after(None))
+        self.assertEqual(
+            CollectorResponse.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0
+        )
+        future = time.strftime(
+            "%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 100)
+        )
+        self.assertAlmostEqual(
+            CollectorResponse.parse_retry_after(future), 100, delta=2  # type: ignore
+        )
+
+        self.assertEqual(CollectorResponse(429, {"Retry-After": "5"}).retry_after, 5.0)
+        self.assertIsNone(CollectorResponse(500, {"Retry-After": "5"}).retry_after)
+        self.assertEqual(CollectorResponse(503), 503)
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_retry_after(self, mok_post_request: Any) -> None:
+        mok_post_request.return_value = mock.Mock(
+            status_code=429, headers={"Retry-After": "30"}
+        )
+        e = Emitter("0.0.0.0", batch_size=10)
+        e.input({"a": "aa"})
+        e.flush()
+        e._cancel_retry_timer()
+        self.assertEqual(e.retry_delay, 30)
+
+        # the delay is capped by max_retry_delay_seconds
+        e = Emitter("0.0.0.0", batch_size=10, max_retry_delay_seconds=10)
+        e.input({"a": "aa"})
+        e.flush()
+        e._cancel_retry_timer()
+        self.assertEqual(e.retry_delay, 10)
+
+    def test_retry_backoff(self) -> None:
+        for i in range(20):
+            self.assertLessEqual(Emitter.next_retry_delay("full_jitter", 0, 1, 60), 1)
+            self.assertLessEqual(Emitter.next_retry_delay("full_jitter", 0, 4, 60), 8)
+            self.assertLessEqual(
+                Emitter.next_retry_delay("full_jitter", 0, 100, 60), 60
+            )
+            delay = Emitter.next_retry_delay("decorrelated_jitter", 10, 2, 60)
+            self.assertGreaterEqual(delay, 1)
+            self.assertLessEqual(delay, 30)
+            self.assertLessEqual(
+                Emitter.next_retry_delay("decorrelated_jitter", 50, 5, 60), 60
+            )
+
+        e = Emitter("0.0.0.0", retry_backoff="full_jitter")
+        e._set_retry_delay()
+        e._set_retry_delay()
+        self.assertEqual(e.retry_attempts, 2)
+        self.assertLessEqual(e.retry_delay, 2)
+        e._reset_retry_delay()
+        self.assertEqual(e.retry_attempts, 0)
+
+        with self.assertRaises(ValueError):
+            Emitter("0.0.0.0", retry_backoff="linear")  # type: ignore
+
+    @mock.patch("snowplow_tracker.Emitter._set_retry_timer")
+    @mock.patch("snowplow_tracker.Emitter.next_retry_delay")
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_concurrent_flush_retry_delay(
+        self, mok_http_post: Any, mok_next_retry_delay: Any, mok_retry_timer: Any
+    ) -> None:
+        mok_http_post.side_effect = mocked_http_response_failure_retry
+
+        def slow_next_retry_delay(
+            backoff: Any, retry_delay: float, retry_attempts: int, max_delay: float
+        ) -> float:
+            time.sleep(0.01)
+            return retry_delay + 1
+
+        mok_next_retry_delay.side_effect = slow_next_retry_delay
+
+        e = Emitter("0.0.0.0", batch_size=100)
+        threads = [
+            threading.Thread(target=e.send_events, args=([{"a": str(i)}],))
+            for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Each failed flush sees the delay and attempts of the previous one
+        self.assertEqual(e.retry_attempts, 8)
+        self.assertEqual(e.retry_delay, 8)
+        self.assertEqual(
+            sorted(c[0][2] for c in mok_next_retry_delay.call_args_list),
+            list(range(1, 9)),
+        )
+        self.assertEqual(e.event_store.size(), 8)
+
     # Unicode
     @mock.patch("snowplow_tracker.AsyncEmitter.flush")
     def test_input_unicode_get(self, mok_flush: Any) -> None:
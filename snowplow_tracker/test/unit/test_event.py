@@ -17,7 +17,7 @@
 
 import json
 import unittest
-from snowplow_tracker.events import Event
+from snowplow_tracker.events import Event, SelfDescribing
 from snowplow_tracker.subject import Subject
 from snowplow_tracker.self_describing_json import SelfDescribingJson
 
@@ -70,3 +70,44 @@ class TestEvent(unittest.TestCase):
         actual_context = json.loads(payload.nv_pairs["co"])
 
         self.assertDictEqual(actual_context, expected_context)
+
+    def test_build_payload_does_not_modify_event(self):
+        context = SelfDescribingJson("test.context.schema", {"user": "tester"})
+        event = Event(
+            dict_={"e": "pv"},
+            context=[context],
+            true_timestamp=1399021242030,
+            event_subject=Subject().set_user_id("user"),
+        )
+
+        first = event.build_payload(encode_base64=True, json_encoder=None)
+        first.add("eid", "1")
+        second = event.build_payload(
+            encode_base64=False,
+            json_encoder=None,
+            subject=Subject().set_lang("en"),
+        )
+
+        self.assertEqual(event.payload.nv_pairs, {"e": "pv"})
+        self.assertIsNot(first, second)
+        self.assertIn("cx", first.nv_pairs)
+        self.assertNotIn("eid", second.nv_pairs)
+        self.assertNotIn("cx", second.nv_pairs)
+        self.assertEqual(second.nv_pairs["lang"], "en")
+        self.assertEqual(second.nv_pairs["uid"], "user")
+
+    def test_build_self_describing_payload_twice(self):
+        event = SelfDescribing(
+            SelfDescribingJson("test.event.schema", {"name": "test"})
+        )
+
+        encoded = event.build_payload(encode_base64=True, json_encoder=None)
+        not_encoded = event.build_payload(encode_base64=False, json_encoder=None)
+
+        self.assertEqual(event.payload.nv_pairs, {"e": "ue"})
+        self.assertEqual(set(encoded.nv_pairs), {"e", "ue_px"})
+        self.assertEqual(set(not_encoded.nv_pairs), {"e", "ue_pr"})
+        self.assertEqual(
+            json.loads(not_encoded.nv_pairs["ue_pr"])["data"],
+            {"schema": "test.event.schema", "data": {"name": "test"}},
+        )
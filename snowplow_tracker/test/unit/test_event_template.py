@@ -0,0 +1,105 @@
+# """
+#     test_event_template.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import json
+import unittest
+import unittest.mock as mock
+from typing import Any
+
+from freezegun import freeze_time
+
+from snowplow_tracker.event_template import EventTemplate
+from snowplow_tracker.events import SelfDescribing, StructuredEvent
+from snowplow_tracker.self_describing_json import SelfDescribingJson
+from snowplow_tracker.subject import Subject
+from snowplow_tracker.tracker import Tracker
+
+_TEST_UUID = "5628c4c6-3f8a-43f8-a09f-6ff68f68dfb6"
+CONTEXT = SelfDescribingJson("iglu:com.acme/user/jsonschema/1-0-0", {"id": "u1"})
+
+
+class TestEventTemplate(unittest.TestCase):
+    def setUp(self) -> None:
+        self.emitter = mock.Mock()
+        self.tracker = Tracker(
+            "namespace",
+            self.emitter,
+            subject=Subject().set_user_id("user"),
+            app_id="app",
+        )
+
+    @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
+    @mock.patch("snowplow_tracker.Tracker.get_uuid")
+    def test_same_payload_as_track(self, mok_uuid: Any) -> None:
+        mok_uuid.return_value = _TEST_UUID
+        event = StructuredEvent(category="shop", action="view", context=[CONTEXT])
+
+        template = self.tracker.template(event)
+        self.assertIsInstance(template, EventTemplate)
+        self.assertEqual(template.track(), _TEST_UUID)
+
+        self.tracker.track(event)
+        from_template = self.emitter.input.call_args_list[0][0][0]
+        from_track = self.emitter.input.call_args_list[1][0][0]
+        self.assertEqual(from_template, from_track)
+        self.assertEqual(from_template["cx"], from_track["cx"])
+        self.assertEqual(from_template["uid"], "user")
+        self.assertEqual(from_template["aid"], "app")
+        self.assertEqual(from_template["dtm"], 1618790401000)
+
+    def test_variable_fields(self) -> None:
+        template = self.tracker.template(
+            StructuredEvent(category="shop", action="view", label="default")
+        )
+
+        first = template.build_payload({"se_la": "first", "se_va": 2})
+        second = template.build_payload(true_timestamp=1000)
+
+        self.assertEqual(first["se_la"], "first")
+        self.assertEqual(first["se_va"], 2)
+        self.assertEqual(second["se_la"], "default")
+        self.assertEqual(second["ttm"], 1000)
+        self.assertNotIn("ttm", first)
+        self.assertNotEqual(first["eid"], second["eid"])
+        self.assertEqual(template.nv_pairs["se_la"], "default")
+        self.assertNotIn("eid", template.nv_pairs)
+
+    def test_self_describing_event_json(self) -> None:
+        tracker = Tracker("namespace", self.emitter, encode_base64=False)
+        template = tracker.template(
+            SelfDescribing(
+                SelfDescribingJson("iglu:com.acme/click/jsonschema/1-0-0", {})
+            )
+        )
+
+        nv_pairs = template.build_payload(
+            event_json=SelfDescribingJson(
+                "iglu:com.acme/click/jsonschema/1-0-0", {"target": "button"}
+            )
+        )
+        self.assertEqual(
+            json.loads(nv_pairs["ue_pr"])["data"]["data"], {"target": "button"}
+        )
+        self.assertEqual(json.loads(template.nv_pairs["ue_pr"])["data"]["data"], {})
+
+    def test_emitters_added_later(self) -> None:
+        template = self.tracker.template(StructuredEvent(category="c", action="a"))
+        other = mock.Mock()
+        self.tracker.add_emitter(other)
+
+        event_id = template.track()
+        self.assertEqual(other.input.call_args[0][0]["eid"], event_id)
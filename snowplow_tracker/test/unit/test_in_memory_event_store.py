@@ -17,6 +17,7 @@
 
 import unittest
 from snowplow_tracker.event_store import InMemoryEventStore
+from snowplow_tracker.payload import SerializedPayload
 import logging
 
 # logging
@@ -104,3 +105,167 @@ class TestInMemoryEventStore(unittest.TestCase):
         event_store.add_event(nvPairs)
 
         self.assertEqual(event_store.get_events_batch(), batch)
+
+    def test_keeps_serialized_events(self):
+        event_store = InMemoryEventStore(logger)
+        event = SerializedPayload({"n0": "v0"})
+
+        event_store.add_event(event)
+        event_store.add_event({"n1": "v1"})
+
+        batch = event_store.get_events_batch()
+        self.assertIs(batch[0], event)
+        self.assertEqual(batch, [{"n0": "v0"}, {"n1": "v1"}])
+
+        event_store.cleanup(batch, True)
+        event_store.cleanup(batch, True)
+        self.assertEqual(event_store.event_buffer, batch)
+        self.assertIs(event_store.event_buffer[0], event)
+
+    def test_retry_events_already_buffered(self):
+        event_store = InMemoryEventStore(logger)
+        nvPair1 = {"eid": "1", "n0": "v0"}
+        nvPair2 = {"n1": "v1"}
+
+        event_store.add_event(nvPair1)
+        event_store.add_event(nvPair2)
+        event_store.cleanup([{"eid": "1", "n0": "v0"}, nvPair2], True)
+        self.assertEqual(event_store.size(), 2)
+
+        event_store.cleanup([{"eid": "2"}, {"n1": "v1"}], True)
+        self.assertEqual(event_store.size(), 4)
+
+        event_store.get_events_batch()
+        event_store.cleanup([nvPair1, nvPair2], True)
+        self.assertEqual(event_store.event_buffer, [nvPair1, nvPair2])
+
+    def test_get_events_batch_size(self):
+        event_store = InMemoryEventStore(logger, buffer_capacity=3)
+
+        for i in range(3):
+            event_store.add_event({"n": i})
+        self.assertEqual(event_store.get_events_batch(2), [{"n": 0}, {"n": 1}])
+
+        # the ring buffer wraps around
+        event_store.add_event({"n": 3})
+        event_store.add_event({"n": 4})
+        self.assertEqual(event_store.event_buffer, [{"n": 2}, {"n": 3}, {"n": 4}])
+        self.assertEqual(
+            event_store.get_events_batch(10), [{"n": 2}, {"n": 3}, {"n": 4}]
+        )
+        self.assertEqual(event_store.size(), 0)
+
+    def test_drop_newest_stats(self):
+        event_store = InMemoryEventStore(logger, buffer_capacity=1)
+
+        self.assertTrue(event_store.add_event({"n0": "v0"}))
+        self.assertFalse(event_store.add_event({"n1": "v1"}))
+        self.assertEqual(event_store.overflow_stats, {"dropped": 1, "evicted": 0})
+
+    def test_drop_oldest(self):
+        event_store = InMemoryEventStore(
+            logger, buffer_capacity=2, overflow_policy="drop_oldest"
+        )
+
+        for i in range(4):
+            self.assertTrue(event_store.add_event({"eid": str(i)}))
+        self.assertEqual(event_store.event_buffer, [{"eid": "2"}, {"eid": "3"}])
+        self.assertEqual(event_store.overflow_stats, {"dropped": 0, "evicted": 2})
+
+        # evicted events are no longer considered buffered
+        event_store.cleanup([{"eid": "0"}], True)
+        self.assertEqual(event_store.event_buffer, [{"eid": "3"}, {"eid": "0"}])
+
+    def test_priority(self):
+        event_store = InMemoryEventStore(
+            logger,
+            buffer_capacity=3,
+            overflow_policy="priority",
+            event_priorities={"tr": 2, "se": 1},
+        )
+        event_store.add_event({"e": "pv", "n": 0})
+        event_store.add_event({"e": "se", "n": 1})
+        event_store.add_event({"e": "pv", "n": 2})
+
+        self.assertTrue(event_store.add_event({"e": "se", "n": 3}))
+        self.assertTrue(event_store.add_event({"e": "tr", "n": 4}))
+        self.assertEqual(
+            [e["n"] for e in event_store.event_buffer],  # type: ignore
+            [1, 3, 4],
+        )
+        self.assertFalse(event_store.add_event({"e": "se", "n": 5}))
+        self.assertEqual(event_store.overflow_stats, {"dropped": 1, "evicted": 2})
+
+    def test_priority_full_buffer(self):
+        priorities = {"tr": 2, "se": 1}
+        event_store = InMemoryEventStore(
+            logger,
+            buffer_capacity=5,
+            overflow_policy="priority",
+            event_priorities=priorities,
+        )
+        # evicts the oldest event with the lowest priority, like a scan of the buffer would
+        expected = []
+        types = ["pv", "se", "tr", "se", "pv", "tr", "pv", "se"]
+        for n in range(200):
+            event = {"e": types[(n * 7 + n // 3) % len(types)], "n": n}
+            priority = priorities.get(event["e"], 0)
+            added = event_store.add_event(event)
+            if len(expected) < 5:
+                expected.append(event)
+                self.assertTrue(added)
+            else:
+                lowest = min(expected, key=lambda e: priorities.get(e["e"], 0))
+                self.assertEqual(
+                    added, priorities.get(lowest["e"], 0) < priority, msg=n
+                )
+                if added:
+                    expected.remove(lowest)
+                    expected.append(event)
+            if n % 11 == 0:
+                self.assertEqual(event_store.get_events_batch(2), expected[:2])
+                expected = expected[2:]
+            self.assertEqual(event_store.event_buffer, expected)
+            self.assertEqual(event_store.size(), len(expected))
+        self.assertLessEqual(event_store.span, event_store.ring_size)
+
+    def test_lease_disjoint_batches(self):
+        event_store = InMemoryEventStore(logger)
+        for i in range(5):
+            event_store.add_event({"eid": str(i)})
+
+        first_id, first = event_store.lease_batch(2)
+        second_id, second = event_store.lease_batch()
+        self.assertNotEqual(first_id, second_id)
+        self.assertEqual(first, [{"eid": "0"}, {"eid": "1"}])
+        self.assertEqual(second, [{"eid": "2"}, {"eid": "3"}, {"eid": "4"}])
+        self.assertEqual(event_store.size(), 0)
+
+        _, empty = event_store.lease_batch()
+        self.assertEqual(empty, [])
+        self.assertEqual(len(event_store.leases), 2)
+
+    def test_ack_and_nack(self):
+        event_store = InMemoryEventStore(logger)
+        for i in range(3):
+            event_store.add_event({"eid": str(i)})
+        batch_id, batch = event_store.lease_batch()
+
+        event_store.ack(batch_id, batch[:1])
+        self.assertIn(batch_id, event_store.leases)
+        event_store.nack(batch_id, batch[2:])
+        self.assertEqual(event_store.event_buffer, [{"eid": "2"}])
+
+        # the rest of the lease is returned to the buffer
+        event_store.nack(batch_id)
+        self.assertEqual(event_store.event_buffer, [{"eid": "2"}, {"eid": "1"}])
+        self.assertEqual(event_store.leases, {})
+
+        # unknown or released batch ids are ignored
+        event_store.ack(batch_id)
+        event_store.nack("unknown")
+        self.assertEqual(event_store.size(), 2)
+
+    def test_overflow_policy_not_supported(self):
+        with self.assertRaises(ValueError):
+            InMemoryEventStore(logger, overflow_policy="drop_random")  # type: ignore
@@ -0,0 +1,154 @@
+# """
+#     test_multi_collector_emitter.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import unittest
+import unittest.mock as mock
+from typing import Any, Dict, List
+
+from requests import ConnectTimeout
+
+from snowplow_tracker.multi_collector_emitter import MultiCollectorEmitter
+
+A = "http://a/com.snowplowanalytics.snowplow/tp2"
+B = "http://b/com.snowplowanalytics.snowplow/tp2"
+
+
+def collector(responses: Dict[str, Any], calls: List[str]) -> Any:
+    def post(uri: str, **kwargs: Any) -> Any:
+        calls.append(uri)
+        response = responses[uri]
+        if isinstance(response, Exception):
+            raise response
+        return mock.Mock(status_code=response, headers={})
+
+    return post
+
+
+class TestMultiCollectorEmitter(unittest.TestCase):
+    def test_init(self) -> None:
+        e = MultiCollectorEmitter(["a", "https://b:8080"], method="get")
+        self.assertEqual(
+            [c.uri for c in e.collectors], ["http://a/i", "https://b:8080/i"]
+        )
+        self.assertEqual(e.strategy, "round_robin")
+
+        with self.assertRaises(ValueError):
+            MultiCollectorEmitter([])
+        with self.assertRaises(ValueError):
+            MultiCollectorEmitter(["a"], strategy="random")  # type: ignore
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_round_robin(self, mok_post_request: Any) -> None:
+        calls: List[str] = []
+        mok_post_request.side_effect = collector({A: 200, B: 200}, calls)
+
+        e = MultiCollectorEmitter(["a", "b"])
+        for i in range(3):
+            self.assertEqual(e.http_post("data"), 200)
+        self.assertEqual(calls, [A, B, A])
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_failover(self, mok_post_request: Any) -> None:
+        calls: List[str] = []
+        mok_post_request.side_effect = collector({A: ConnectTimeout(), B: 200}, calls)
+
+        e = MultiCollectorEmitter(["a", "b"], failure_threshold=2)
+        self.assertEqual(e.http_post("data"), 200)
+        self.assertEqual(e.http_post("data"), 200)
+        self.assertEqual(e.http_post("data"), 200)
+        self.assertEqual(calls, [A, B, B, A, B])
+
+        # A is left out after two consecutive failures
+        self.assertFalse(e.collectors[0].is_healthy())
+        self.assertEqual(e.collectors[0].failures, 2)
+        self.assertEqual(e.collectors[1].requests, 3)
+        e.http_post("data")
+        self.assertEqual(calls[5:], [B])
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_logs_endpoint_of_each_request(self, mok_post_request: Any) -> None:
+        calls: List[str] = []
+        mok_post_request.side_effect = collector({A: ConnectTimeout(), B: 200}, calls)
+
+        e = MultiCollectorEmitter(["a", "b"])
+        self.assertEqual(e.endpoint, A)
+        self.assertEqual([c.uri for c in e.collectors], [A, B])
+        with self.assertLogs("snowplow_tracker.emitters", "INFO") as logs:
+            e.http_post("data")
+        sending = [line for line in logs.output if "Sending POST request" in line]
+        self.assertEqual(len(sending), 2)
+        self.assertIn(A, sending[0])
+        self.assertIn(B, sending[1])
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_client_error_does_not_fail_over(self, mok_post_request: Any) -> None:
+        calls: List[str] = []
+        mok_post_request.side_effect = collector({A: 400, B: 200}, calls)
+
+        e = MultiCollectorEmitter(["a", "b"])
+        self.assertEqual(e.http_post("data"), 400)
+        self.assertEqual(calls, [A])
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_all_endpoints_unavailable(self, mok_post_request: Any) -> None:
+        calls: List[str] = []
+        mok_post_request.side_effect = collector({A: 503, B: 503}, calls)
+
+        e = MultiCollectorEmitter(
+            ["a", "b"], batch_size=10, failure_threshold=1, reset_timeout_seconds=30
+        )
+        e.send_events([{"a": "aa"}])
+        e._cancel_retry_timer()
+
+        self.assertEqual(calls, [A, B])
+        self.assertEqual(e.event_store.size(), 1)
+        # the retry waits until an endpoint can be probed
+        self.assertGreater(e.retry_delay, 29)
+
+    @mock.patch("snowplow_tracker.emitters.requests.Session.post")
+    def test_least_in_flight(self, mok_post_request: Any) -> None:
+        calls: List[str] = []
+        mok_post_request.side_effect = collector({A: 200, B: 200}, calls)
+
+        e = MultiCollectorEmitter(
+            ["a", "b"], strategy="least_in_flight", max_in_flight=4
+        )
+        e.get_limiter(A).in_flight = 2
+        e.get_limiter(B).in_flight = 1
+        e.http_post("data")
+        e.http_post("data")
+        self.assertEqual(calls, [B, B])
+
+    @mock.patch("snowplow_tracker.multi_collector_emitter.random.choices")
+    def test_latency_weighted(self, mok_choices: Any) -> None:
+        mok_choices.side_effect = lambda collectors, weights: [collectors[0]]
+
+        e = MultiCollectorEmitter(["a", "b", "c"], strategy="latency_weighted")
+        e.collectors[0].latency = 0.5
+        e.collectors[1].latency = 0.1
+        e.next_collector = 0
+
+        ordered = e._ordered_collectors()
+        weights = mok_choices.call_args[1]["weights"]
+        # c has no latency yet and is weighted like the fastest endpoint
+        self.assertAlmostEqual(weights[0], 2)
+        self.assertAlmostEqual(weights[1], 10)
+        self.assertAlmostEqual(weights[2], 10)
+        self.assertEqual(
+            [c.uri[7] for c in ordered],
+            ["a", "b", "c"],
+        )
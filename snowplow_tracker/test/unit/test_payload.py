@@ -160,3 +160,18 @@ class TestPayload(unittest.TestCase):
     def test_subject_get(self) -> None:
         p = payload.Payload({"name1": "val1"})
         self.assertDictEqual(p.get(), p.nv_pairs)
+
+    def test_serialized_payload(self) -> None:
+        p = payload.SerializedPayload({"name1": "val1", "name2": "ć"})
+        self.assertDictEqual(p, {"name1": "val1", "name2": "ć"})
+        self.assertEqual(json.loads(p.encoded), p)
+
+    def test_serialized_payload_without_stm(self) -> None:
+        p = payload.SerializedPayload({"name1": "val1", "stm": "1618358402000"})
+        self.assertEqual(json.loads(p.encoded), {"name1": "val1"})
+
+    def test_serialized_payload_decode(self) -> None:
+        p = payload.SerializedPayload({"name1": "val1", "name2": "ć"})
+        decoded = payload.SerializedPayload.decode(p.encoded)
+        self.assertDictEqual(decoded, p)
+        self.assertIs(decoded.encoded, p.encoded)
@@ -0,0 +1,124 @@
+# """
+#     test_retry_budget.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock as mock
+from typing import Any
+
+from snowplow_tracker.emitters import Emitter
+from snowplow_tracker.payload import SerializedPayload
+from snowplow_tracker.retry_budget import FileDeadLetterSink, RetryBudget
+
+
+class TestRetryBudget(unittest.TestCase):
+    def test_max_attempts(self) -> None:
+        dead_letter = mock.Mock()
+        budget = RetryBudget(max_attempts=2, dead_letter=dead_letter)
+        events = [{"eid": "1"}, {"eid": "2"}]
+
+        self.assertEqual(budget.expire(events), (events, []))
+        self.assertEqual(budget.expire(events[:1]), ([], events[:1]))
+        dead_letter.assert_called_once_with(events[:1])
+
+        self.assertEqual(budget.expire(events[1:]), ([], events[1:]))
+        self.assertEqual(budget.expired_count, 2)
+        self.assertEqual(len(budget.attempts), 0)
+
+    @mock.patch("snowplow_tracker.retry_budget.time.monotonic")
+    def test_max_age(self, mok_monotonic: Any) -> None:
+        budget = RetryBudget(max_age_seconds=30)
+        events = [{"eid": "1"}]
+
+        mok_monotonic.return_value = 100.0
+        self.assertEqual(budget.expire(events), (events, []))
+        mok_monotonic.return_value = 129.0
+        self.assertEqual(budget.expire(events), (events, []))
+        mok_monotonic.return_value = 130.0
+        self.assertEqual(budget.expire(events), ([], events))
+
+    def test_forget_sent_events(self) -> None:
+        budget = RetryBudget(max_attempts=2)
+        event = {"eid": "1"}
+
+        budget.expire([event])
+        budget.forget([event])
+        self.assertEqual(budget.expire([event]), ([event], []))
+
+    def test_max_tracked_events(self) -> None:
+        budget = RetryBudget(max_attempts=2, max_tracked_events=2)
+
+        budget.expire([{"eid": "1"}, {"eid": "2"}, {"eid": "3"}])
+        self.assertEqual(list(budget.attempts), ["2", "3"])
+
+    def test_dead_letter_error_retries_events(self) -> None:
+        dead_letter = mock.Mock(side_effect=[IOError("disk full"), None])
+        budget = RetryBudget(max_attempts=2, dead_letter=dead_letter)
+        events = [{"eid": "1"}, {"eid": "2"}]
+
+        budget.expire(events)
+        self.assertEqual(budget.expire(events), (events, []))
+        self.assertEqual(budget.expired_count, 0)
+
+        # the events do not get a new budget when the dead-letter sink fails
+        self.assertEqual(budget.expire(events), ([], events))
+        self.assertEqual(dead_letter.call_count, 2)
+        self.assertEqual(budget.expired_count, 2)
+        self.assertEqual(len(budget.attempts), 0)
+
+    def test_invalid_limits(self) -> None:
+        with self.assertRaises(ValueError):
+            RetryBudget(max_attempts=0)
+        with self.assertRaises(ValueError):
+            RetryBudget(max_age_seconds=-1)
+
+    def test_file_dead_letter_sink(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dead", "events.jsonl")
+            sink = FileDeadLetterSink(path)
+
+            sink([{"eid": "1"}, SerializedPayload({"eid": "2"})])
+            sink([{"eid": "3"}])
+
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(lines, [{"eid": "1"}, {"eid": "2"}, {"eid": "3"}])
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_emitter_expires_events(self, mok_http_post: Any) -> None:
+        mok_http_post.return_value = 503
+        dead_letter = mock.Mock()
+
+        e = Emitter(
+            "0.0.0.0",
+            batch_size=10,
+            retry_budget=RetryBudget(max_attempts=2, dead_letter=dead_letter),
+        )
+        e.input({"eid": "1"})
+        e.flush()
+        e._cancel_retry_timer()
+        self.assertEqual(e.event_store.size(), 1)
+        dead_letter.assert_not_called()
+
+        e.input({"eid": "2"})
+        e.flush()
+        e._cancel_retry_timer()
+        dead_letter.assert_called_once_with([{"eid": "1", "stm": mock.ANY}])
+        self.assertEqual(e.event_store.event_buffer, [{"eid": "2", "stm": mock.ANY}])
+        self.assertEqual(e.event_store.leases, {})
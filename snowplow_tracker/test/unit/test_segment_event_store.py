@@ -0,0 +1,262 @@
+# """
+#     test_segment_event_store.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import json
+import os
+import logging
+import tempfile
+import threading
+import unittest
+import unittest.mock as mock
+from typing import Any, List
+
+from snowplow_tracker.emitters import AsyncEmitter, Emitter
+from snowplow_tracker.payload import SerializedPayload
+from snowplow_tracker.segment_event_store import (
+    RECORD_HEADER,
+    SegmentFileEventStore,
+)
+
+# logging
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestSegmentFileEventStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "segments")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def segment_files(self) -> List[str]:
+        return sorted(
+            name for name in os.listdir(self.path) if name.endswith(".segment")
+        )
+
+    def test_add_and_get_events(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path)
+        serialized = SerializedPayload({"n0": "v0"})
+
+        event_store.add_event(serialized)
+        event_store.add_event({"n1": 1})
+        self.assertEqual(event_store.size(), 2)
+
+        batch = event_store.get_events_batch()
+        self.assertEqual(batch, [{"n0": "v0"}, {"n1": 1}])
+        self.assertEqual(batch[0].encoded, serialized.encoded)
+        self.assertEqual(event_store.size(), 0)
+        event_store.close()
+
+    def test_retry_events(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path)
+        event_store.add_event({"n0": "v0"})
+
+        batch = event_store.get_events_batch()
+        event_store.add_event({"n1": "v1"})
+        event_store.cleanup(batch, True)
+        event_store.cleanup([{"n2": "v2"}], True)
+
+        self.assertEqual(
+            event_store.get_events_batch(),
+            [{"n1": "v1"}, {"n0": "v0"}, {"n2": "v2"}],
+        )
+        event_store.close()
+
+    def test_retry_events_are_not_decoded_again(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path)
+        event_store.add_event({"n0": "v0"})
+        batch = event_store.get_events_batch()
+        event_store.cleanup(batch, True)
+
+        with mock.patch.object(SerializedPayload, "decode") as mok_decode:
+            retried = event_store.get_events_batch()
+        mok_decode.assert_not_called()
+        self.assertIs(retried[0], batch[0])
+        event_store.close()
+
+    def test_roll_and_delete_acked_segments(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path, segment_size=78)
+        for i in range(6):
+            event_store.add_event({"n": "v" * 20 + str(i)})
+        self.assertEqual(len(self.segment_files()), 3)
+
+        batch = event_store.get_events_batch()
+        event_store.cleanup(batch[:3], False)
+        # the first segment is deleted, the second still has an event in flight
+        self.assertEqual(len(self.segment_files()), 2)
+
+        event_store.cleanup(batch[3:], False)
+        # the active segment is kept until the next one is started
+        self.assertEqual(self.segment_files(), ["%020d.segment" % 2])
+
+        event_store.add_event({"n": "v" * 50})
+        self.assertEqual(self.segment_files(), ["%020d.segment" % 3])
+        event_store.close()
+
+    def test_large_event(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path, segment_size=70)
+        event = {"n": "v" * 200}
+
+        event_store.add_event(event)
+        self.assertEqual(event_store.get_events_batch(), [event])
+        event_store.close()
+
+    def test_recover_torn_record(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path)
+        for i in range(3):
+            event_store.add_event({"n": i})
+        # the process stops after writing the header of a record but not its data
+        active = event_store.active
+        assert active is not None
+        RECORD_HEADER.pack_into(active.map, active.end, 50, 1234)
+        event_store.close()
+
+        event_store = SegmentFileEventStore(logger, self.path)
+        self.assertEqual(event_store.size(), 3)
+        event_store.add_event({"n": 3})
+        self.assertEqual(
+            event_store.get_events_batch(), [{"n": 0}, {"n": 1}, {"n": 2}, {"n": 3}]
+        )
+        event_store.close()
+
+        event_store = SegmentFileEventStore(logger, self.path)
+        self.assertEqual(event_store.size(), 4)
+        event_store.close()
+
+    def test_lease_batch_drops_undecodable_record(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path)
+        event_store.add_event({"n": 0})
+        active = event_store.active
+        assert active is not None
+        event_store.buffer.append((active.number, active.append(b"{not json")))
+        event_store.add_event({"n": 1})
+
+        batch_id, batch = event_store.lease_batch()
+        self.assertEqual(batch, [{"n": 0}, {"n": 1}])
+        self.assertEqual(event_store.size(), 0)
+        event_store.ack(batch_id)
+        event_store.close()
+
+        # the undecodable record was acknowledged with the batch
+        event_store = SegmentFileEventStore(logger, self.path)
+        self.assertEqual(event_store.size(), 0)
+        event_store.close()
+
+    def test_recover_unacked_events(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path, segment_size=70)
+        for i in range(4):
+            event_store.add_event({"n": "v" * 20 + str(i)})
+        batch = event_store.get_events_batch()
+        event_store.cleanup([batch[0], batch[2]], False)
+        event_store.add_event({"n": "new"})
+        # the process stops with two events in flight
+        event_store.close()
+
+        event_store = SegmentFileEventStore(logger, self.path, segment_size=70)
+        self.assertEqual(event_store.size(), 3)
+        self.assertEqual(
+            event_store.get_events_batch(), [batch[1], batch[3], {"n": "new"}]
+        )
+        event_store.close()
+
+    def test_lease_ack_and_nack(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path)
+        for i in range(4):
+            event_store.add_event({"n": i})
+
+        first_id, first = event_store.lease_batch(2)
+        second_id, second = event_store.lease_batch()
+        self.assertNotEqual(first_id, second_id)
+        self.assertEqual(first, [{"n": 0}, {"n": 1}])
+        self.assertEqual(second, [{"n": 2}, {"n": 3}])
+
+        event_store.ack(first_id, first[:1])
+        event_store.nack(first_id)
+        event_store.ack(second_id)
+        self.assertEqual(event_store.leases, {})
+        self.assertEqual(event_store.size(), 1)
+        event_store.close()
+
+        event_store = SegmentFileEventStore(logger, self.path)
+        self.assertEqual(event_store.get_events_batch(), [{"n": 1}])
+        event_store.close()
+
+    def test_drop_new_events_buffer_full(self) -> None:
+        event_store = SegmentFileEventStore(logger, self.path, buffer_capacity=2)
+
+        self.assertTrue(event_store.add_event({"n0": "v0"}))
+        self.assertTrue(event_store.add_event({"n1": "v1"}))
+        self.assertFalse(event_store.add_event({"n2": "v2"}))
+        self.assertEqual(event_store.size(), 2)
+        event_store.close()
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_emitter_retry(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = [503, 200]
+        event_store = SegmentFileEventStore(logger, self.path)
+
+        e = Emitter("0.0.0.0", batch_size=2, event_store=event_store)
+        e.input({"a": "aa"})
+        e.input({"b": "bb"})
+        e.retry_timer.cancel()
+        self.assertEqual(event_store.size(), 2)
+
+        e.flush()
+        sent = json.loads(mok_http_post.call_args[0][0])
+        self.assertEqual(sent["data"][0]["a"], "aa")
+        self.assertEqual(sent["data"][1]["b"], "bb")
+        self.assertEqual(event_store.size(), 0)
+        event_store.close()
+
+        event_store = SegmentFileEventStore(logger, self.path)
+        self.assertEqual(event_store.size(), 0)
+        event_store.close()
+
+    @mock.patch("snowplow_tracker.AsyncEmitter.send_events")
+    def test_async_emitter_drop_newest(self, mok_send_events: Any) -> None:
+        in_flight = threading.Event()
+        release = threading.Event()
+
+        def send_events(*args: Any) -> None:
+            in_flight.set()
+            release.wait(5)
+
+        mok_send_events.side_effect = send_events
+        event_store = SegmentFileEventStore(logger, self.path)
+
+        ae = AsyncEmitter(
+            "0.0.0.0",
+            batch_size=1,
+            max_queue_size=1,
+            queue_overflow_policy="drop_newest",
+            event_store=event_store,
+        )
+        ae.input({"a": "aa"})
+        self.assertTrue(in_flight.wait(5))
+        ae.input({"b": "bb"})
+        ae.input({"c": "cc"})
+        release.set()
+        ae.sync_flush()
+
+        # the dropped batch is acknowledged instead of staying leased
+        event_store.close()
+        event_store = SegmentFileEventStore(logger, self.path)
+        self.assertEqual(event_store.get_events_batch(), [{"a": "aa"}, {"b": "bb"}])
+        event_store.close()
@@ -0,0 +1,180 @@
+# """
+#     test_self_describing_json.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import base64
+import copy
+import json
+import pickle
+import unittest
+from datetime import date
+
+from snowplow_tracker.events import Event, SelfDescribing
+from snowplow_tracker.constants import UNSTRUCT_EVENT_SCHEMA
+from snowplow_tracker.self_describing_json import (
+    SelfDescribingJson,
+    FrozenSelfDescribingJson,
+)
+
+USER_SCHEMA = "iglu:com.acme/user/jsonschema/1-0-0"
+CLICK_SCHEMA = "iglu:com.acme/click/jsonschema/1-0-0"
+
+
+class TestFrozenSelfDescribingJson(unittest.TestCase):
+    def test_immutable(self) -> None:
+        data = {"id": "u1", "roles": ["admin"]}
+        entity = FrozenSelfDescribingJson(USER_SCHEMA, data)
+        data["roles"].append("editor")
+
+        self.assertEqual(entity.data, {"id": "u1", "roles": ["admin"]})
+        with self.assertRaises(AttributeError):
+            entity.schema = CLICK_SCHEMA
+        with self.assertRaises(AttributeError):
+            entity.data = {}
+        with self.assertRaises(AttributeError):
+            del entity.data
+        with self.assertRaises(ValueError):
+            FrozenSelfDescribingJson("", {})
+
+    def test_encodings_ignore_changes_to_original_data(self) -> None:
+        data = {"id": "u1", "roles": ["admin"], "address": {"city": "Paris"}}
+        expected = FrozenSelfDescribingJson(USER_SCHEMA, copy.deepcopy(data))
+        entity = FrozenSelfDescribingJson(USER_SCHEMA, data)
+        hash(entity)
+
+        # the encodings are built after the original data was changed
+        data["id"] = "u2"
+        data["roles"].append("editor")
+        data["address"]["city"] = "Lyon"
+
+        self.assertEqual(entity.to_string(), expected.to_string())
+        self.assertEqual(entity.to_base64(), expected.to_base64())
+        self.assertEqual(
+            entity.envelope(CLICK_SCHEMA).to_string(),
+            expected.envelope(CLICK_SCHEMA).to_string(),
+        )
+        self.assertEqual(entity, expected)
+        self.assertEqual(hash(entity), hash(expected))
+
+    def test_encodings_ignore_changes_to_returned_data(self) -> None:
+        entity = FrozenSelfDescribingJson(USER_SCHEMA, {"id": "u1", "roles": ["admin"]})
+        string = entity.to_string()
+        hashed = hash(entity)
+
+        entity.data["id"] = "u2"
+        entity.data["roles"].append("editor")
+        entity.to_json()["data"]["id"] = "u3"
+
+        self.assertEqual(entity.data, {"id": "u1", "roles": ["admin"]})
+        self.assertEqual(entity.to_string(), string)
+        self.assertEqual(
+            entity.envelope(CLICK_SCHEMA).to_json()["data"], entity.to_json()
+        )
+        self.assertEqual(hash(entity), hashed)
+        self.assertEqual(
+            entity,
+            FrozenSelfDescribingJson(USER_SCHEMA, {"id": "u1", "roles": ["admin"]}),
+        )
+
+    def test_cached_encodings(self) -> None:
+        entity = FrozenSelfDescribingJson(USER_SCHEMA, {"name": "Zoë"})
+
+        self.assertIs(entity.to_string(), entity.to_string())
+        self.assertEqual(json.loads(entity.to_string()), entity.to_json())
+        self.assertEqual(
+            base64.urlsafe_b64decode(entity.to_base64()).decode("utf-8"),
+            entity.to_string(),
+        )
+        self.assertIs(entity.envelope(CLICK_SCHEMA), entity.envelope(CLICK_SCHEMA))
+        self.assertEqual(
+            entity.envelope(CLICK_SCHEMA).to_json(),
+            {"schema": CLICK_SCHEMA, "data": entity.to_json()},
+        )
+
+    def test_hash_and_equality(self) -> None:
+        first = FrozenSelfDescribingJson(USER_SCHEMA, {"a": 1, "b": [1, 2]})
+        second = FrozenSelfDescribingJson(USER_SCHEMA, {"b": [1, 2], "a": 1.0})
+        other = FrozenSelfDescribingJson(CLICK_SCHEMA, {"a": 1, "b": [1, 2]})
+
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertNotEqual(first, other)
+        self.assertEqual(len({first, second, other}), 2)
+        self.assertNotEqual(first, SelfDescribingJson(USER_SCHEMA, first.data))
+
+    def test_copy_and_pickle(self) -> None:
+        entity = FrozenSelfDescribingJson(USER_SCHEMA, {"id": "u1"})
+
+        self.assertIs(copy.copy(entity), entity)
+        self.assertIs(copy.deepcopy(entity), entity)
+        self.assertEqual(pickle.loads(pickle.dumps(entity)), entity)
+
+    def test_json_encoder(self) -> None:
+        entity = FrozenSelfDescribingJson(
+            USER_SCHEMA, {"day": date(2021, 4, 19)}, json_encoder=str
+        )
+        self.assertEqual(json.loads(entity.to_string())["data"]["day"], "2021-04-19")
+
+    def test_tracker_json_encoder(self) -> None:
+        entity = FrozenSelfDescribingJson(USER_SCHEMA, {"day": date(2021, 4, 19)})
+        with self.assertRaises(TypeError):
+            entity.to_string()
+
+        event = SelfDescribing(entity, context=[entity])
+        nv_pairs = event.build_payload(False, json_encoder=str).nv_pairs
+        self.assertEqual(
+            json.loads(nv_pairs["ue_pr"])["data"]["data"]["day"], "2021-04-19"
+        )
+        self.assertEqual(
+            json.loads(nv_pairs["co"])["data"][0]["data"]["day"], "2021-04-19"
+        )
+        self.assertEqual(
+            event.build_payload(True, json_encoder=str).nv_pairs["ue_px"],
+            entity.envelope(UNSTRUCT_EVENT_SCHEMA).to_base64(str),
+        )
+
+        # the entity's own json_encoder is used instead of the tracker's
+        own = FrozenSelfDescribingJson(
+            USER_SCHEMA, {"day": date(2021, 4, 19)}, json_encoder=lambda o: "own"
+        )
+        self.assertEqual(json.loads(own.to_string(str))["data"]["day"], "own")
+
+    def test_same_payload_as_self_describing_json(self) -> None:
+        def build(cls: type, encode_base64: bool) -> dict:
+            event = SelfDescribing(
+                cls(CLICK_SCHEMA, {"target": "button", "label": "Zoë"}),
+                context=[
+                    cls(USER_SCHEMA, {"id": "u1"}),
+                    cls(USER_SCHEMA, {"id": "u2"}),
+                ],
+            )
+            return event.build_payload(encode_base64, None).nv_pairs
+
+        for encode_base64 in (True, False):
+            self.assertEqual(
+                build(FrozenSelfDescribingJson, encode_base64),
+                build(SelfDescribingJson, encode_base64),
+            )
+
+    def test_mixed_contexts(self) -> None:
+        contexts = [
+            FrozenSelfDescribingJson(USER_SCHEMA, {"id": "u1"}),
+            SelfDescribingJson(USER_SCHEMA, {"id": "u2"}),
+        ]
+        co = Event(context=contexts).build_payload(False, None).nv_pairs["co"]
+        self.assertEqual(
+            [c["data"]["id"] for c in json.loads(co)["data"]], ["u1", "u2"]
+        )
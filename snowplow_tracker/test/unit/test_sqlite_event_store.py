@@ -0,0 +1,233 @@
+# """
+#     test_sqlite_event_store.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import json
+import os
+import logging
+import tempfile
+import threading
+import unittest
+import unittest.mock as mock
+from typing import Any
+
+from snowplow_tracker.emitters import AsyncEmitter, Emitter
+from snowplow_tracker.payload import SerializedPayload
+from snowplow_tracker.sqlite_event_store import SQLiteEventStore
+
+# logging
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestSQLiteEventStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "events.db")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_init(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path)
+        self.assertEqual(event_store.buffer_capacity, 10000)
+        self.assertEqual(event_store.size(), 0)
+        self.assertEqual(
+            event_store.connection.execute("PRAGMA journal_mode").fetchone()[0], "wal"
+        )
+        event_store.close()
+
+    def test_add_and_get_events(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path)
+        serialized = SerializedPayload({"n0": "v0"})
+
+        event_store.add_event(serialized)
+        event_store.add_event({"n1": 1})
+        self.assertEqual(event_store.size(), 2)
+
+        batch = event_store.get_events_batch()
+        self.assertEqual(batch, [{"n0": "v0"}, {"n1": 1}])
+        self.assertEqual(batch[0].encoded, serialized.encoded)
+        self.assertEqual(event_store.size(), 0)
+        event_store.close()
+
+    def test_leased_events_are_not_returned_again(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path)
+        event_store.add_event({"n0": "v0"})
+
+        batch = event_store.get_events_batch()
+        event_store.add_event({"n1": "v1"})
+        self.assertEqual(event_store.get_events_batch(), [{"n1": "v1"}])
+
+        event_store.cleanup(batch, True)
+        self.assertEqual(event_store.size(), 1)
+        self.assertEqual(event_store.get_events_batch(), batch)
+        event_store.close()
+
+    def test_retry_events_are_not_decoded_again(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path)
+        event_store.add_event({"n0": "v0"})
+        batch = event_store.get_events_batch()
+        event_store.cleanup(batch, True)
+
+        with mock.patch.object(SerializedPayload, "decode") as mok_decode:
+            retried = event_store.get_events_batch()
+        mok_decode.assert_not_called()
+        self.assertIs(retried[0], batch[0])
+        event_store.close()
+
+    def test_remove_success_events(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path)
+        event_store.add_event({"n0": "v0"})
+        event_store.add_event({"n1": "v1"})
+
+        event_store.cleanup(event_store.get_events_batch(), False)
+        event_store.close()
+
+        event_store = SQLiteEventStore(logger, self.path)
+        self.assertEqual(event_store.size(), 0)
+        self.assertEqual(event_store.get_events_batch(), [])
+        event_store.close()
+
+    def test_retry_events_not_from_store(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path)
+
+        event_store.cleanup([{"n0": "v0"}], True)
+        self.assertEqual(event_store.get_events_batch(), [{"n0": "v0"}])
+        event_store.close()
+
+    def test_recover_leased_events(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path)
+        event_store.add_event({"n0": "v0"})
+        event_store.add_event({"n1": "v1"})
+        event_store.get_events_batch()
+        # the process stops before the events are sent
+        event_store.connection.close()
+
+        event_store = SQLiteEventStore(logger, self.path)
+        self.assertEqual(event_store.size(), 2)
+        self.assertEqual(event_store.get_events_batch(), [{"n0": "v0"}, {"n1": "v1"}])
+        event_store.close()
+
+    def test_insert_batch_size(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path, insert_batch_size=3)
+
+        def rows() -> int:
+            return event_store.connection.execute(
+                "SELECT COUNT(*) FROM events"
+            ).fetchone()[0]
+
+        event_store.add_event({"n0": "v0"})
+        event_store.add_event({"n1": "v1"})
+        self.assertEqual(rows(), 0)
+        self.assertEqual(event_store.size(), 2)
+
+        event_store.add_event({"n2": "v2"})
+        self.assertEqual(rows(), 3)
+
+        event_store.add_event({"n3": "v3"})
+        event_store.close()
+        event_store = SQLiteEventStore(logger, self.path)
+        self.assertEqual(event_store.size(), 4)
+        event_store.close()
+
+    def test_lease_ack_and_nack(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path)
+        for i in range(4):
+            event_store.add_event({"n": i})
+
+        first_id, first = event_store.lease_batch(2)
+        second_id, second = event_store.lease_batch()
+        self.assertNotEqual(first_id, second_id)
+        self.assertEqual(first, [{"n": 0}, {"n": 1}])
+        self.assertEqual(second, [{"n": 2}, {"n": 3}])
+
+        event_store.ack(first_id, first[:1])
+        event_store.nack(first_id)
+        event_store.ack(second_id)
+        self.assertEqual(event_store.leases, {})
+        self.assertEqual(event_store.size(), 1)
+        self.assertEqual(
+            event_store.connection.execute("SELECT COUNT(*) FROM events").fetchone()[0],
+            1,
+        )
+        self.assertEqual(event_store.get_events_batch(), [{"n": 1}])
+        event_store.close()
+
+    def test_drop_new_events_buffer_full(self) -> None:
+        event_store = SQLiteEventStore(logger, self.path, buffer_capacity=2)
+
+        self.assertTrue(event_store.add_event({"n0": "v0"}))
+        self.assertTrue(event_store.add_event({"n1": "v1"}))
+        self.assertFalse(event_store.add_event({"n2": "v2"}))
+        self.assertEqual(event_store.size(), 2)
+        event_store.close()
+
+    @mock.patch("snowplow_tracker.Emitter.http_post")
+    def test_emitter_retry(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = [503, 200]
+        event_store = SQLiteEventStore(logger, self.path)
+
+        e = Emitter("0.0.0.0", batch_size=2, event_store=event_store)
+        e.input({"a": "aa"})
+        e.input({"b": "bb"})
+        e.retry_timer.cancel()
+        self.assertEqual(event_store.size(), 2)
+
+        e.flush()
+        sent = json.loads(mok_http_post.call_args[0][0])
+        self.assertEqual(sent["data"][0]["a"], "aa")
+        self.assertEqual(sent["data"][1]["b"], "bb")
+        self.assertEqual(event_store.size(), 0)
+        self.assertEqual(
+            event_store.connection.execute("SELECT COUNT(*) FROM events").fetchone()[0],
+            0,
+        )
+        event_store.close()
+
+    @mock.patch("snowplow_tracker.AsyncEmitter.send_events")
+    def test_async_emitter_drop_newest(self, mok_send_events: Any) -> None:
+        in_flight = threading.Event()
+        release = threading.Event()
+
+        def send_events(*args: Any) -> None:
+            in_flight.set()
+            release.wait(5)
+
+        mok_send_events.side_effect = send_events
+        event_store = SQLiteEventStore(logger, self.path)
+
+        ae = AsyncEmitter(
+            "0.0.0.0",
+            batch_size=1,
+            max_queue_size=1,
+            queue_overflow_policy="drop_newest",
+            event_store=event_store,
+        )
+        ae.input({"a": "aa"})
+        self.assertTrue(in_flight.wait(5))
+        ae.input({"b": "bb"})
+        ae.input({"c": "cc"})
+        release.set()
+        ae.sync_flush()
+
+        # the dropped batch is deleted instead of staying leased
+        rows = event_store.connection.execute("SELECT payload FROM events").fetchall()
+        self.assertEqual(
+            [json.loads(row[0]) for row in rows], [{"a": "aa"}, {"b": "bb"}]
+        )
+        event_store.close()
@@ -21,7 +21,7 @@ import unittest
 import unittest.mock as mock
 
 from freezegun import freeze_time
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 from snowplow_tracker.contracts import disable_contracts, enable_contracts
 from snowplow_tracker.tracker import Tracker
@@ -30,6 +30,7 @@ from snowplow_tracker.subject import Subject
 from snowplow_tracker.payload import Payload
 from snowplow_tracker.self_describing_json import SelfDescribingJson
 from snowplow_tracker.events import Event, SelfDescribing, ScreenView
+from snowplow_tracker.typing import EmitterProtocol, PayloadDict
 
 UNSTRUCT_SCHEMA = "iglu:com.snowplowanalytics.snowplow/unstruct_event/jsonschema/1-0-0"
 CONTEXT_SCHEMA = "iglu:com.snowplowanalytics.snowplow/contexts/jsonschema/1-0-1"
@@ -48,6 +49,7 @@ SCREEN_VIEW_SCHEMA = "iglu:com.snowplowanalytics.snowplow/screen_view/jsonschema
 
 # helpers
 _TEST_UUID = "5628c4c6-3f8a-43f8-a09f-6ff68f68dfb6"
+UUID_PATTERN = r"[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}\Z"
 geoSchema = "iglu:com.snowplowanalytics.snowplow/geolocation_context/jsonschema/1-0-0"
 geoData = {"latitude": -23.2, "longitude": 43.0}
 movSchema = "iglu:com.acme_company/movie_poster/jsonschema/2-1-1"
@@ -242,6 +244,75 @@ class TestTracker(unittest.TestCase):
         e2.input.assert_called_once_with(mok_payload)
         e3.input.assert_called_once_with(mok_payload)
 
+    def test_track_event_twice(self) -> None:
+        mokEmitter = self.create_patch("snowplow_tracker.Emitter")
+        e = mokEmitter()
+
+        t = Tracker("namespace", e)
+        event = ScreenView(name="screen", id_="1")
+        first_id = t.track(event)
+        second_id = t.track(event)
+
+        first = e.input.call_args_list[0][0][0]
+        second = e.input.call_args_list[1][0][0]
+        self.assertIsNot(first, second)
+        self.assertEqual(first["eid"], first_id)
+        self.assertEqual(second["eid"], second_id)
+        self.assertNotEqual(first_id, second_id)
+        self.assertEqual(event.payload.nv_pairs, {})
+
+    @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
+    def test_track_many(self) -> None:
+        mokEmitter = self.create_patch("snowplow_tracker.Emitter")
+        e1 = mokEmitter()
+        e2 = mock.Mock(spec=["input"])
+
+        t = Tracker("namespace", [e1, e2], app_id="app")
+        event = ScreenView(name="screen", id_="1")
+        event_ids = t.track_many(
+            [event, event, ScreenView(name="other", id_="2")], chunk_size=2
+        )
+
+        self.assertEqual(len(set(event_ids)), 3)
+        for event_id in event_ids:
+            self.assertIsNotNone(re.match(UUID_PATTERN, event_id))
+
+        self.assertEqual(e1.input_many.call_count, 2)
+        payloads = e1.input_many.call_args_list[0][0][0]
+        payloads += e1.input_many.call_args_list[1][0][0]
+        self.assertEqual([p["eid"] for p in payloads], event_ids)
+        for p in payloads:
+            self.assertEqual(p["dtm"], 1618790401000)
+            self.assertEqual(p["tna"], "namespace")
+            self.assertEqual(p["aid"], "app")
+        self.assertEqual(e2.input.call_count, 3)
+        self.assertEqual(e2.input.call_args_list[2][0][0], payloads[2])
+
+    def test_track_many_emitter_protocol_subclass(self) -> None:
+        class ListEmitter(EmitterProtocol):
+            def __init__(self) -> None:
+                self.events: List[PayloadDict] = []
+
+            def input(self, payload: PayloadDict) -> None:
+                self.events.append(payload)
+
+        e = ListEmitter()
+        t = Tracker("namespace", e)
+        event_ids = t.track_many([ScreenView(name="screen", id_="1")] * 3)
+        self.assertEqual([p["eid"] for p in e.events], event_ids)
+
+    def test_track_many_invalid_chunk_size(self) -> None:
+        mokEmitter = self.create_patch("snowplow_tracker.Emitter")
+        t = Tracker("namespace", mokEmitter())
+        with self.assertRaises(ValueError):
+            t.track_many([], chunk_size=0)
+
+    def test_get_uuids(self) -> None:
+        uuids = Tracker.get_uuids(3)
+        self.assertEqual(len(set(uuids)), 3)
+        for u in uuids:
+            self.assertIsNotNone(re.match(UUID_PATTERN, u))
+
     @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
     @mock.patch("snowplow_tracker.Tracker.get_uuid")
     def test_complete_payload(self, mok_uuid: Any) -> None:
@@ -0,0 +1,208 @@
+# """
+#     test_transports.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import json
+import socket
+import threading
+import unittest
+import unittest.mock as mock
+from typing import Dict, List, Tuple
+
+from requests import ConnectTimeout
+
+from snowplow_tracker.emitters import Emitter, AsyncEmitter
+from snowplow_tracker.transports import (
+    CollectorResponse,
+    HTTP2Transport,
+    RequestsTransport,
+    TransportError,
+)
+
+_H2_OPT = True
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import httpx
+except ImportError:
+    _H2_OPT = False
+
+
+class H2Collector(object):
+    """
+    Stand-in collector that speaks HTTP/2 without TLS and answers every request with 200
+    """
+
+    def __init__(self) -> None:
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.endpoint = "127.0.0.1:%d" % self.sock.getsockname()[1]
+        self.connections = 0
+        self.requests: List[Tuple[Dict[str, str], bytes]] = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self) -> None:
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with self.lock:
+                self.connections += 1
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn: socket.socket) -> None:
+        h2conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        h2conn.initiate_connection()
+        conn.sendall(h2conn.data_to_send())
+        streams: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        with conn:
+            while True:
+                data = conn.recv(65535)
+                if not data:
+                    return
+                for event in h2conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        streams[event.stream_id] = (dict(event.headers), bytearray())
+                    elif isinstance(event, h2.events.DataReceived):
+                        streams[event.stream_id][1].extend(event.data)
+                        h2conn.acknowledge_received_data(
+                            event.flow_controlled_length, event.stream_id
+                        )
+                    elif isinstance(event, h2.events.StreamEnded):
+                        headers, body = streams.pop(event.stream_id)
+                        with self.lock:
+                            self.requests.append((headers, bytes(body)))
+                        h2conn.send_headers(
+                            event.stream_id,
+                            [(":status", "200"), ("content-length", "0")],
+                            end_stream=True,
+                        )
+                conn.sendall(h2conn.data_to_send())
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class TestRequestsTransport(unittest.TestCase):
+    def test_post(self) -> None:
+        transport = RequestsTransport()
+        with mock.patch.object(transport.session, "post") as mok_post:
+            mok_post.return_value = mock.Mock(
+                status_code=503, headers={"Retry-After": "3"}
+            )
+            response = transport.post("https://0.0.0.0", "{}", {}, 5.0)
+
+        self.assertIsInstance(response, CollectorResponse)
+        self.assertEqual(response, 503)
+        self.assertEqual(response.retry_after, 3.0)
+        mok_post.assert_called_once_with(
+            "https://0.0.0.0", data="{}", headers={}, timeout=5.0
+        )
+
+    def test_request_error(self) -> None:
+        transport = RequestsTransport()
+        with mock.patch.object(transport.session, "get") as mok_get:
+            mok_get.side_effect = ConnectTimeout
+            with self.assertRaises(TransportError):
+                transport.get("https://0.0.0.0", {"e": "pv"}, None)
+
+    def test_emitter_transport(self) -> None:
+        transport = mock.Mock()
+        transport.post.return_value = CollectorResponse(200)
+        transport.get.side_effect = TransportError("connection refused")
+        e = Emitter("0.0.0.0", transport=transport, request_timeout=(1.0, 2.0))
+
+        self.assertEqual(e.http_post("{}"), 200)
+        transport.post.assert_called_once_with(
+            "https://0.0.0.0/com.snowplowanalytics.snowplow/tp2",
+            data="{}",
+            headers={"Content-Type": "application/json; charset=utf-8"},
+            timeout=(1.0, 2.0),
+        )
+        self.assertEqual(e.http_get({"e": "pv"}), -1)
+
+
+@unittest.skipUnless(_H2_OPT, "httpx and h2 are not installed")
+class TestHTTP2Transport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.collector = H2Collector()
+        self.transport = HTTP2Transport(
+            httpx.Client(
+                http1=False, http2=True, limits=httpx.Limits(max_connections=1)
+            )
+        )
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.collector.close()
+
+    def test_post(self) -> None:
+        e = Emitter(
+            self.collector.endpoint,
+            protocol="http",
+            batch_size=2,
+            transport=self.transport,
+        )
+        e.input({"e": "pv", "url": "/a"})
+        e.input({"e": "pv", "url": "/b"})
+
+        self.assertEqual(len(self.collector.requests), 1)
+        headers, body = self.collector.requests[0]
+        self.assertEqual(headers[":method"], "POST")
+        self.assertEqual(headers[":path"], "/com.snowplowanalytics.snowplow/tp2")
+        data = json.loads(body)["data"]
+        self.assertEqual([event["url"] for event in data], ["/a", "/b"])
+        self.assertEqual(e.event_store.size(), 0)
+
+    def test_get(self) -> None:
+        e = Emitter(
+            self.collector.endpoint,
+            protocol="http",
+            method="get",
+            transport=self.transport,
+        )
+        self.assertEqual(e.http_get({"e": "pv", "tv": 1}), 200)
+
+        headers, _ = self.collector.requests[0]
+        self.assertEqual(headers[":method"], "GET")
+        self.assertEqual(headers[":path"], "/i?e=pv&tv=1")
+
+    def test_multiplexed_requests(self) -> None:
+        e = AsyncEmitter(
+            self.collector.endpoint,
+            protocol="http",
+            batch_size=1,
+            thread_count=4,
+            transport=self.transport,
+        )
+        for i in range(20):
+            e.input({"e": "pv", "url": "/%d" % i})
+        e.sync_flush()
+
+        self.assertEqual(len(self.collector.requests), 20)
+        self.assertEqual(self.collector.connections, 1)
+
+    def test_timeout(self) -> None:
+        timeout = HTTP2Transport.as_httpx_timeout((1.0, 2.0))
+        self.assertEqual(timeout.connect, 1.0)
+        self.assertEqual(timeout.read, 2.0)
+        self.assertEqual(HTTP2Transport.as_httpx_timeout(None).read, None)
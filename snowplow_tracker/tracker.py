@@ -15,13 +15,16 @@
 #     language governing permissions and limitations there under.
 # """
 
+import os
 import time
 import uuid
-from typing import Any, Optional, Union, List, Dict, Sequence
+from typing import Any, Optional, Union, List, Dict, Sequence, Iterable
 from warnings import warn
 
 from snowplow_tracker import payload, SelfDescribingJson
 from snowplow_tracker.subject import Subject
+from snowplow_tracker.event_template import EventTemplate
+from snowplow_tracker.context_cache import ContextCache
 from snowplow_tracker.contracts import non_empty_string, one_of, non_empty, form_element
 from snowplow_tracker.constants import (
     VERSION,
@@ -41,6 +44,7 @@ from snowplow_tracker.events import (
 from snowplow_tracker.typing import (
     JsonEncoderFunction,
     EmitterProtocol,
+    PayloadDictList,
     FORM_NODE_NAMES,
     FORM_TYPES,
     FormNodeName,
@@ -62,6 +66,7 @@ class Tracker:
         app_id: Optional[str] = None,
         encode_base64: bool = DEFAULT_ENCODE_BASE64,
         json_encoder: Optional[JsonEncoderFunction] = None,
+        context_cache: Optional[ContextCache] = None,
     ) -> None:
         """
         :param namespace:        Identifier for the Tracker instance
@@ -76,6 +81,8 @@ class Tracker:
         :type  encode_base64:    bool
         :param json_encoder:     Custom JSON serializer that gets called on non-serializable object
         :type  json_encoder:     function | None
+        :param context_cache:    Cache reusing the encoded context envelope of events sharing context objects
+        :type  context_cache:    ContextCache | None
         """
         if subject is None:
             subject = Subject()
@@ -89,6 +96,7 @@ class Tracker:
         self.subject: Optional[Subject] = subject
         self.encode_base64 = encode_base64
         self.json_encoder = json_encoder
+        self.context_cache = context_cache
 
         self.standard_nv_pairs = {"tv": VERSION, "tna": namespace, "aid": app_id}
         self.timer = None
@@ -103,6 +111,21 @@ class Tracker:
         """
         return str(uuid.uuid4())
 
+    @staticmethod
+    def get_uuids(count: int) -> List[str]:
+        """
+        Generates the transaction IDs of several events from a single read of random bytes
+
+        :param count:     The number of IDs
+        :type  count:     int
+        :rtype:           list(string)
+        """
+        random_bytes = os.urandom(16 * count)
+        return [
+            str(uuid.UUID(bytes=random_bytes[i : i + 16], version=4))
+            for i in range(0, 16 * count, 16)
+        ]
+
     @staticmethod
     def get_timestamp(tstamp: Optional[float] = None) -> int:
         """
@@ -147,6 +170,72 @@ class Tracker:
 
         return None
 
+    def track_many(self, events: Iterable[Event], chunk_size: int = 1000) -> List[str]:
+        """
+        Send the payloads of many events to the emitters. Returns the tracked event IDs.
+        The events are processed in chunks: the event IDs and the timestamp are generated
+        once for each chunk and each emitter receives the payloads of a chunk at once.
+
+        :param  events:          Events
+        :type   events:          iterable(events.Event)
+        :param  chunk_size:      The number of events in a chunk. Default 1000.
+        :type   chunk_size:      int
+        :rtype:                  list(string)
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        event_ids: List[str] = []
+        chunk: List[Event] = []
+        for event in events:
+            chunk.append(event)
+            if len(chunk) >= chunk_size:
+                event_ids += self._track_chunk(chunk)
+                chunk = []
+        if len(chunk) > 0:
+            event_ids += self._track_chunk(chunk)
+        return event_ids
+
+    def _track_chunk(self, events: List[Event]) -> List[str]:
+        """
+        :param  events:          Events
+        :type   events:          list(events.Event)
+        :rtype:                  list(string)
+        """
+        event_ids = Tracker.get_uuids(len(events))
+        timestamp = Tracker.get_timestamp()
+        payloads: PayloadDictList = []
+        for event, event_id in zip(events, event_ids):
+            payload = event.build_payload(
+                encode_base64=self.encode_base64,
+                json_encoder=self.json_encoder,
+                subject=self.subject,
+                context_cache=self.context_cache,
+            )
+            payload.add("eid", event_id)
+            payload.add("dtm", timestamp)
+            payload.add_dict(self.standard_nv_pairs)
+            payloads.append(payload.nv_pairs)
+
+        for emitter in self.emitters:
+            if hasattr(emitter, "input_many"):
+                emitter.input_many(payloads)
+            else:
+                for nv_pairs in payloads:
+                    emitter.input(nv_pairs)
+        return event_ids
+
+    def template(self, event: Event) -> EventTemplate:
+        """
+        Compiles an event into a template whose static payload fields are built once.
+        Track the template for each event with only the fields that vary.
+
+        :param  event:           The prototype event
+        :type   event:           events.Event
+        :rtype:                  EventTemplate
+        """
+        return EventTemplate(self, event)
+
     def complete_payload(
         self,
         event: Event,
@@ -155,6 +244,7 @@ class Tracker:
             encode_base64=self.encode_base64,
             json_encoder=self.json_encoder,
             subject=self.subject,
+            context_cache=self.context_cache,
         )
 
         payload.add("eid", Tracker.get_uuid())
@@ -17,6 +17,7 @@
 
 from typing import Optional
 from snowplow_tracker.typing import JsonEncoderFunction
+from snowplow_tracker.context_cache import ContextCache
 
 
 class TrackerConfiguration(object):
@@ -24,6 +25,7 @@ class TrackerConfiguration(object):
         self,
         encode_base64: bool = True,
         json_encoder: Optional[JsonEncoderFunction] = None,
+        context_cache: Optional[ContextCache] = None,
     ) -> None:
         """
         Configuration for additional tracker configuration options.
@@ -31,10 +33,13 @@ class TrackerConfiguration(object):
         :type  encode_base64:     bool
         :param json_encoder:      Custom JSON serializer that gets called on non-serializable object.
         :type  json_encoder:      function | None
+        :param context_cache:     Cache reusing the encoded context envelope of events sharing context objects.
+        :type  context_cache:     ContextCache | None
         """
 
         self.encode_base64 = encode_base64
         self.json_encoder = json_encoder
+        self.context_cache = context_cache
 
     @property
     def encode_base64(self) -> bool:
@@ -58,3 +63,14 @@ class TrackerConfiguration(object):
     @json_encoder.setter
     def json_encoder(self, value: Optional[JsonEncoderFunction]):
         self._json_encoder = value
+
+    @property
+    def context_cache(self) -> Optional[ContextCache]:
+        """
+        Cache reusing the encoded context envelope of events sharing context objects. Default is no cache.
+        """
+        return self._context_cache
+
+    @context_cache.setter
+    def context_cache(self, value: Optional[ContextCache]):
+        self._context_cache = value
@@ -0,0 +1,299 @@
+# """
+#     transports.py
+
+#     Copyright (c) 2013-2023 Snowplow Analytics Ltd. All rights reserved.
+
+#     This program is licensed to you under the Apache License Version 2.0,
+#     and you may not use this file except in compliance with the Apache License
+#     Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+#     http://www.apache.org/licenses/LICENSE-2.0.
+
+#     Unless required by applicable law or agreed to in writing,
+#     software distributed under the Apache License Version 2.0 is distributed on
+#     an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+#     express or implied. See the Apache License Version 2.0 for the specific
+#     language governing permissions and limitations there under.
+# """
+
+import socket
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+from typing_extensions import Protocol
+
+import requests
+
+from snowplow_tracker.typing import PayloadDict
+
+_HTTPX_OPT = True
+try:
+    import httpx
+except ImportError:
+    _HTTPX_OPT = False
+
+SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+RequestTimeout = Optional[Union[float, Tuple[float, float]]]
+
+
+class TransportError(Exception):
+    """
+    Raised by a transport when a request could not be sent or no response was received
+    """
+
+
+class KeepAliveHTTPAdapter(requests.adapters.HTTPAdapter):
+    """
+    HTTPAdapter whose connections send small requests without delay (TCP_NODELAY)
+    and detect dropped idle connections with TCP keep-alive probes (SO_KEEPALIVE)
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["socket_options"] = SOCKET_OPTIONS
+        super(KeepAliveHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+
+
+class CollectorResponse(int):
+    """
+    The status code of a collector response, with the response headers
+    """
+
+    headers: Mapping[str, str]
+
+    def __new__(
+        cls, status_code: int, headers: Optional[Mapping[str, str]] = None
+    ) -> "CollectorResponse":
+        response = super(CollectorResponse, cls).__new__(cls, status_code)
+        response.headers = {} if headers is None else headers
+        return response
+
+    @property
+    def retry_after(self) -> Optional[float]:
+        """
+        The number of seconds to wait before retrying, from the Retry-After header
+        of a 429 or 503 response. None if there is no valid header.
+        """
+        if self not in (429, 503):
+            return None
+        return CollectorResponse.parse_retry_after(self.headers.get("Retry-After"))
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parses a Retry-After header, either a number of seconds or an HTTP date
+
+        :param  value:  The header value
+        :type   value:  string | None
+        :rtype: float | None
+        """
+        if value is None:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class Transport(Protocol):
+    """
+    Sends the HTTP requests of an emitter to the collector.
+    A transport must be safe to use from several threads at once.
+    """
+
+    def post(
+        self,
+        url: str,
+        data: Union[str, bytes],
+        headers: Dict[str, str],
+        timeout: RequestTimeout,
+    ) -> CollectorResponse:
+        """
+        Sends a POST request and returns the response status code and headers.
+        Raises TransportError if the request fails.
+
+        :param  url:    The collector URI
+        :type   url:    string
+        :param  data:   The request body
+        :type   data:   string | bytes
+        :param  headers:    The request headers
+        :type   headers:    dict(string:string)
+        :param  timeout:    The request timeout, either a float or a (connect timeout, read timeout) tuple
+        :type   timeout:    float | tuple | None
+        :rtype: CollectorResponse
+        """
+        ...
+
+    def get(
+        self, url: str, params: PayloadDict, timeout: RequestTimeout
+    ) -> CollectorResponse:
+        """
+        Sends a GET request and returns the response status code and headers.
+        Raises TransportError if the request fails.
+
+        :param  url:    The collector URI
+        :type   url:    string
+        :param  params: The query string parameters
+        :type   params: dict(string:\\*)
+        :param  timeout:    The request timeout, either a float or a (connect timeout, read timeout) tuple
+        :type   timeout:    float | tuple | None
+        :rtype: CollectorResponse
+        """
+        ...
+
+    def close(self) -> None:
+        """
+        Closes the connections of the transport
+        """
+        ...
+
+
+class RequestsTransport(Transport):
+    """
+    Transport that sends HTTP/1.1 requests with a requests.Session.
+    Connections to the collector are kept open and reused between requests.
+    """
+
+    def __init__(
+        self, session: Optional[requests.Session] = None, pool_size: int = 1
+    ) -> None:
+        """
+        :param  session:    The session used for the requests. If not set, the transport creates
+                            one that keeps up to pool_size connections open to each collector host.
+        :type   session:    requests.Session | None
+        :param  pool_size:  The maximum number of connections to a host kept open by the created session
+        :type   pool_size:  int
+        """
+        if session is None:
+            session = RequestsTransport.create_session(pool_size)
+        self.session = session
+
+    @staticmethod
+    def create_session(pool_size: int) -> requests.Session:
+        """
+        Creates a session that keeps up to pool_size connections open to each collector host
+
+        :param  pool_size:  The maximum number of connections to a host
+        :type   pool_size:  int
+        :rtype: requests.Session
+        """
+        session = requests.Session()
+        adapter = KeepAliveHTTPAdapter(pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def post(
+        self,
+        url: str,
+        data: Union[str, bytes],
+        headers: Dict[str, str],
+        timeout: RequestTimeout,
+    ) -> CollectorResponse:
+        try:
+            r = self.session.post(url, data=data, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            raise TransportError(e) from e
+        return CollectorResponse(r.status_code, r.headers)
+
+    def get(
+        self, url: str, params: PayloadDict, timeout: RequestTimeout
+    ) -> CollectorResponse:
+        try:
+            r = self.session.get(url, params=params, timeout=timeout)
+        except requests.RequestException as e:
+            raise TransportError(e) from e
+        return CollectorResponse(r.status_code, r.headers)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class HTTP2Transport(Transport):
+    """
+    Transport that sends requests over HTTP/2 with an httpx.Client.
+    Concurrent requests to a collector are multiplexed as streams on one connection
+    instead of each using a connection from a pool.
+    Requires httpx with HTTP/2 support: `pip install snowplow-tracker[http2]`
+    """
+
+    def __init__(
+        self, client: Optional["httpx.Client"] = None, max_connections: int = 1
+    ) -> None:
+        """
+        :param  client: The client used for the requests. If not set, the transport creates one
+                        that negotiates HTTP/2 with HTTPS collectors. For an HTTP collector that
+                        supports HTTP/2 without upgrade, pass httpx.Client(http1=False, http2=True).
+        :type   client: httpx.Client | None
+        :param  max_connections:    The maximum number of connections kept open by the created client
+        :type   max_connections:    int
+        """
+        if not _HTTPX_OPT:
+            raise RuntimeError(
+                "HTTP2Transport is not available. To use: `pip install snowplow-tracker[http2]`"
+            )
+        if client is None:
+            client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            )
+        self.client = client
+
+    @staticmethod
+    def as_httpx_timeout(timeout: RequestTimeout) -> "httpx.Timeout":
+        """
+        Converts a request timeout to an httpx.Timeout
+
+        :param  timeout:    A float or a (connect timeout, read timeout) tuple
+        :type   timeout:    float | tuple | None
+        :rtype: httpx.Timeout
+        """
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    def post(
+        self,
+        url: str,
+        data: Union[str, bytes],
+        headers: Dict[str, str],
+        timeout: RequestTimeout,
+    ) -> CollectorResponse:
+        try:
+            r = self.client.post(
+                url,
+                content=data,
+                headers=headers,
+                timeout=HTTP2Transport.as_httpx_timeout(timeout),
+            )
+        except httpx.HTTPError as e:
+            raise TransportError(e) from e
+        return CollectorResponse(r.status_code, r.headers)
+
+    def get(
+        self, url: str, params: PayloadDict, timeout: RequestTimeout
+    ) -> CollectorResponse:
+        try:
+            r = self.client.get(
+                url,
+                params={k: str(v) for k, v in params.items()},
+                timeout=HTTP2Transport.as_httpx_timeout(timeout),
+            )
+        except httpx.HTTPError as e:
+            raise TransportError(e) from e
+        return CollectorResponse(r.status_code, r.headers)
+
+    def close(self) -> None:
+        self.client.close()
@@ -15,7 +15,7 @@
 #     language governing permissions and limitations there under.
 # """
 
-from typing import Dict, List, Callable, Any, Optional, Union, Tuple
+from typing import Dict, List, Callable, Any, Optional, Union, Tuple, Awaitable
 from typing_extensions import Protocol, Literal
 
 PayloadDict = Dict[str, Any]
@@ -56,8 +56,14 @@ FormClasses = Union[List[str], Tuple[str, Any]]
 # emitters
 HttpProtocol = Literal["http", "https"]
 Method = Literal["get", "post"]
+QueueOverflowPolicy = Literal["block", "drop_newest", "drop_oldest", "spill"]
+Compression = Literal["gzip", "deflate"]
+RetryBackoff = Literal["exponential", "full_jitter", "decorrelated_jitter"]
+LoadBalancingStrategy = Literal["round_robin", "least_in_flight", "latency_weighted"]
+EventStoreOverflowPolicy = Literal["drop_newest", "drop_oldest", "priority"]
 SuccessCallback = Callable[[PayloadDictList], None]
 FailureCallback = Callable[[int, PayloadDictList], None]
+DeadLetterSink = Callable[[PayloadDictList], None]
 
 # subject
 SUPPORTED_PLATFORMS = {"pc", "tv", "mob", "cnsl", "iot", "web", "srv", "app"}
@@ -67,8 +73,14 @@ SupportedPlatform = Literal["pc", "tv", "mob", "cnsl", "iot", "web", "srv", "app
 class EmitterProtocol(Protocol):
     def input(self, payload: PayloadDict) -> None: ...
 
-    def flush(self) -> None: ...
+    # Emitters subclassing the protocol without their own input_many input the events one by one
+    def input_many(self, payloads: PayloadDictList) -> None:
+        for payload in payloads:
+            self.input(payload)
+
+    # Emitters running in an event loop return an awaitable from flush and sync_flush
+    def flush(self) -> Optional[Awaitable[None]]: ...
 
     def async_flush(self) -> None: ...
 
-    def sync_flush(self) -> None: ...
+    def sync_flush(self) -> Optional[Awaitable[None]]: ...